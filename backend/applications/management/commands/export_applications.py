@@ -0,0 +1,33 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from applications.exports import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, export_queryset, stream_export
+
+
+class Command(BaseCommand):
+    help = 'Stream applications to a CSV or NDJSON file without loading them all into memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--program', type=int, help='Only export applications for this program id')
+        parser.add_argument('--status', help='Only export applications in this status')
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv', dest='export_format')
+        parser.add_argument('--output', help='File to write to (defaults to stdout)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        queryset = export_queryset(program_id=options['program'], status=options['status'])
+        lines = stream_export(options['export_format'], queryset, chunk_size=options['chunk_size'])
+
+        output = open(options['output'], 'w', newline='', encoding='utf-8') if options['output'] else sys.stdout
+        count = -1 if options['export_format'] == 'csv' else 0  # CSV header is not a row
+        try:
+            for line in lines:
+                output.write(line)
+                count += 1
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+        if options['output']:
+            self.stdout.write(self.style.SUCCESS(f'Exported {count} applications to {options["output"]}'))
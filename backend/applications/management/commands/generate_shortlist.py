@@ -0,0 +1,47 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from applications import merit
+from programs.models import Program
+
+
+class Command(BaseCommand):
+    help = 'Rank a program\'s applicants by merit and optionally shortlist the top intake_capacity x factor'
+
+    def add_arguments(self, parser):
+        parser.add_argument('program_id', type=int)
+        parser.add_argument('--factor', type=float, help='Override the program\'s shortlist_factor')
+        parser.add_argument('--top', type=int, default=20, help='How many ranked rows to print')
+        parser.add_argument('--apply', action='store_true', help='Move the shortlist to "shortlisted"')
+        parser.add_argument('--user', help='Username recorded in the status history (required with --apply)')
+
+    def handle(self, *args, **options):
+        try:
+            program = Program.objects.get(pk=options['program_id'])
+        except Program.DoesNotExist:
+            raise CommandError(f'Program {options["program_id"]} does not exist')
+
+        changed_by = None
+        if options['apply']:
+            if not options['user']:
+                raise CommandError('--user is required with --apply')
+            try:
+                changed_by = get_user_model().objects.get(username=options['user'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f'User "{options["user"]}" does not exist')
+
+        started = time.perf_counter()
+        ranking = merit.rank_program(program, factor=options['factor'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'Ranked {len(ranking.ids)} applications for {program.code} in {elapsed * 1000:.1f} ms; '
+            f'shortlist size {ranking.shortlist_size}'
+        )
+        for position, (pk, score) in enumerate(zip(ranking.ids[:options['top']], ranking.scores), start=1):
+            self.stdout.write(f'{position:>6}  {score:7.3f}  {pk}')
+
+        if changed_by is not None:
+            changed = merit.apply_shortlist(ranking, changed_by)
+            self.stdout.write(self.style.SUCCESS(f'Shortlisted {len(changed)} applications'))
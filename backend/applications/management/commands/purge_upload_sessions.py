@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from applications.models import DocumentUploadSession
+
+
+class Command(BaseCommand):
+    help = 'Delete chunked upload sessions (and their partial files) that have been idle too long'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help='Idle time after which a session is abandoned')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        stale = DocumentUploadSession.objects.filter(updated_at__lt=cutoff)
+        count = 0
+        for session in stale.iterator():
+            session.discard()
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f'Purged {count} abandoned upload sessions'))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from applications.models import Application
+from programs.models import Program
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized document completeness columns on applications'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--program', type=int, help='Only rebuild applications for this program id')
+
+    def handle(self, *args, **options):
+        programs = Program.objects.order_by('pk')
+        if options['program']:
+            programs = programs.filter(pk=options['program'])
+
+        total = 0
+        # One UPDATE per program keeps each transaction short on large tables
+        for program_id in programs.values_list('pk', flat=True):
+            with transaction.atomic():
+                total += Application.objects.filter(program_id=program_id).refresh_document_counts()
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt document counts for {total} applications'))
@@ -0,0 +1,86 @@
+"""Merit ranking and shortlist generation.
+
+All candidates of a program are loaded as column arrays and ranked with
+NumPy in one pass: composite score descending, then earlier date of birth,
+then earlier submission. Rows missing an academic percentage (no
+graduation for undergraduates, for instance) are scored on the
+percentages they have, with the remaining weights rescaled.
+"""
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+from .models import Application
+
+# Applications that are in the running for a shortlist
+MERIT_POOL_STATUSES = ['submitted', 'under_review', 'shortlisted']
+
+_NAT_SORT_LAST = np.iinfo(np.int64).max
+
+
+class MeritRanking(NamedTuple):
+    ids: list             # application ids, best first
+    scores: np.ndarray    # composite scores aligned with ids
+    shortlist_size: int
+
+    @property
+    def shortlist(self):
+        return self.ids[:self.shortlist_size]
+
+
+def program_weights(program):
+    return np.array(
+        [program.merit_weight_tenth, program.merit_weight_twelfth, program.merit_weight_graduation],
+        dtype=np.float64,
+    )
+
+
+def load_pool(program):
+    """Return (ids, percentages[n, 3], date_of_birth, submitted_at) for the program's pool."""
+    rows = list(
+        Application.objects.filter(program=program, status__in=MERIT_POOL_STATUSES).values_list(
+            'id', 'tenth_percentage', 'twelfth_percentage', 'graduation_percentage',
+            'date_of_birth', 'submitted_at',
+        )
+    )
+    if not rows:
+        empty = np.empty(0, dtype=np.int64)
+        return [], np.empty((0, 3)), empty, empty
+
+    ids, tenth, twelfth, graduation, dob, submitted = zip(*rows)
+    # None becomes NaN, which composite_scores() treats as "not provided"
+    percentages = np.array([tenth, twelfth, graduation], dtype=np.float64).T
+    dob_days = np.array(dob, dtype='datetime64[D]').astype(np.int64)
+    submitted_us = np.array(
+        [value.replace(tzinfo=None) if value else None for value in submitted], dtype='datetime64[us]'
+    )
+    submitted_order = np.where(np.isnat(submitted_us), _NAT_SORT_LAST, submitted_us.astype(np.int64))
+    return list(ids), percentages, dob_days, submitted_order
+
+
+def composite_scores(percentages, weights):
+    """Weighted mean of the provided percentages for every row."""
+    provided = ~np.isnan(percentages)
+    weighted = np.where(provided, percentages, 0.0) @ weights
+    total_weight = provided.astype(np.float64) @ weights
+    return np.divide(weighted, total_weight, out=np.zeros_like(weighted), where=total_weight > 0)
+
+
+def rank_order(scores, dob_days, submitted_order):
+    """Indices that sort candidates best first (np.lexsort uses the last key as primary)."""
+    return np.lexsort((submitted_order, dob_days, -scores))
+
+
+def rank_program(program, factor=None):
+    factor = program.shortlist_factor if factor is None else factor
+    ids, percentages, dob_days, submitted_order = load_pool(program)
+    scores = composite_scores(percentages, program_weights(program))
+    order = rank_order(scores, dob_days, submitted_order)
+    shortlist_size = min(len(ids), math.ceil(program.intake_capacity * factor))
+    return MeritRanking([ids[i] for i in order], scores[order], shortlist_size)
+
+
+def apply_shortlist(ranking, changed_by, reason='Shortlisted by merit ranking'):
+    """Move the shortlisted candidates to 'shortlisted' with one bulk update."""
+    return Application.objects.filter(pk__in=ranking.shortlist).change_status('shortlisted', changed_by, reason)
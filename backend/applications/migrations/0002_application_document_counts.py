@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:01
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import Exact
+
+
+def backfill_document_counts(apps, schema_editor):
+    Application = apps.get_model('applications', 'Application')
+    ApplicationDocument = apps.get_model('applications', 'ApplicationDocument')
+    RequiredDocument = apps.get_model('programs', 'RequiredDocument')
+
+    satisfied = ApplicationDocument.objects.filter(
+        application=OuterRef('pk'),
+        document_type__program=OuterRef('program'),
+        document_type__is_mandatory=True,
+    ).values('application').annotate(total=Count('pk')).values('total')
+    required = RequiredDocument.objects.filter(
+        program=OuterRef('program'), is_mandatory=True
+    ).values('program').annotate(total=Count('pk')).values('total')
+
+    Application.objects.update(
+        mandatory_documents_uploaded=Coalesce(Subquery(satisfied), 0),
+        documents_complete=Exact(Coalesce(Subquery(satisfied), 0), Coalesce(Subquery(required), 0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0001_initial'),
+        ('programs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='documents_complete',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='mandatory_documents_uploaded',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_document_counts, migrations.RunPython.noop),
+    ]
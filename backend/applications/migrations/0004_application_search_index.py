@@ -0,0 +1,41 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE TABLE applications_application_search ('
+            ' application_id uuid PRIMARY KEY'
+            ' REFERENCES applications_application (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,'
+            ' document tsvector NOT NULL)'
+        )
+        schema_editor.execute(
+            'CREATE INDEX applications_application_search_gin '
+            'ON applications_application_search USING GIN (document)'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE applications_application_fts USING fts5('
+            " application_id UNINDEXED, names, academics, content, tokenize='porter unicode61')"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP TABLE IF EXISTS applications_application_search')
+    elif vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS applications_application_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0003_application_application_created_id_idx'),
+    ]
+
+    operations = [
+        # Populate with `manage.py rebuild_application_search` after migrating
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
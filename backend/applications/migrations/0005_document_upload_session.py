@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:07
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0004_application_search_index'),
+        ('programs', '0003_program_merit_settings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentUploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('original_filename', models.CharField(max_length=255)),
+                ('total_size', models.PositiveBigIntegerField()),
+                ('received_bytes', models.PositiveBigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('application', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to='applications.application')),
+                ('document_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='programs.requireddocument')),
+            ],
+        ),
+    ]
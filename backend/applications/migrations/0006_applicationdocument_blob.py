@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:09
+
+import applications.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0005_document_upload_session'),
+        ('documents', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applicationdocument',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='application_documents', to='documents.documentblob'),
+        ),
+        migrations.AlterField(
+            model_name='applicationdocument',
+            name='file',
+            field=models.FileField(max_length=255, upload_to=applications.models.application_document_path),
+        ),
+    ]
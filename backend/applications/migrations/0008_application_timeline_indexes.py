@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0007_applicationdocument_processing'),
+        ('documents', '0001_initial'),
+        ('programs', '0003_program_merit_settings'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applicationdocument',
+            name='verified_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='applicationdocument',
+            index=models.Index(fields=['application', 'uploaded_at', 'id'], name='document_app_uploaded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='applicationdocument',
+            index=models.Index(fields=['application', 'verified_at', 'id'], name='document_app_verified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='applicationstatushistory',
+            index=models.Index(fields=['application', 'changed_at', 'id'], name='history_app_changed_idx'),
+        ),
+    ]
@@ -1,8 +1,15 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, Exists, OuterRef, Subquery, Value
+from django.db.models.lookups import Exact
+from django.db.models.functions import Coalesce, Concat, Trim
 from django.conf import settings
+from django.utils import timezone
+from documents.models import DocumentBlob
+from programs.catalog import bump_applications_version
 from programs.models import Program, RequiredDocument
 import uuid
 import os
+from collections import Counter
 
 def application_document_path(instance, filename):
     """Generate file path for application documents"""
@@ -10,6 +17,84 @@ def application_document_path(instance, filename):
     filename = f"{uuid.uuid4()}.{ext}"
     return f"applications/{instance.application.user.id}/{instance.application.id}/{filename}"
 
+def document_thumbnail_path(instance, filename):
+    """Previews sit next to the application's documents"""
+    return f"thumbnails/{instance.application_id}/{instance.pk}.jpg"
+
+def remove_file(path):
+    """Remove a stored file if it is still on disk"""
+    if os.path.isfile(path):
+        os.remove(path)
+
+class ApplicationQuerySet(models.QuerySet):
+    def refresh_document_counts(self):
+        """Recompute the denormalized completeness columns in a single UPDATE."""
+        satisfied = ApplicationDocument.objects.filter(
+            application=OuterRef('pk'),
+            document_type__program=OuterRef('program'),
+            document_type__is_mandatory=True,
+        ).values('application').annotate(total=Count('pk')).values('total')
+        required = RequiredDocument.objects.filter(
+            program=OuterRef('program'), is_mandatory=True
+        ).values('program').annotate(total=Count('pk')).values('total')
+
+        return self.update(
+            mandatory_documents_uploaded=Coalesce(Subquery(satisfied), 0),
+            documents_complete=Exact(Coalesce(Subquery(satisfied), 0), Coalesce(Subquery(required), 0)),
+        )
+
+    def fully_verified(self):
+        """Applications with every mandatory document uploaded and verified."""
+        unverified = ApplicationDocument.objects.filter(
+            application=OuterRef('pk'), document_type__is_mandatory=True, verified=False
+        )
+        return self.filter(documents_complete=True).exclude(Exists(unverified))
+
+    def for_listing(self):
+        """Join and annotate what ApplicationListSerializer reads so a page costs one query."""
+        return self.select_related('program__department').annotate(
+            applicant_name=Trim(Concat('user__first_name', Value(' '), 'user__last_name')),
+        )
+
+    def change_status(self, new_status, changed_by, reason=''):
+        """Move every application in the queryset to ``new_status``.
+
+        The rows are locked, rewritten with one ``bulk_update`` and audited with
+        one ``bulk_create`` of history rows, all in a single transaction.
+        Applications already in ``new_status`` are left alone. Returns the list
+        of applications that changed.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            applications = list(
+                self.select_for_update().exclude(status=new_status).only('id', 'status', 'program_id')
+            )
+            history = []
+            seat_deltas = Counter()
+            for application in applications:
+                seat_deltas[application.program_id] += Program.seat_delta(application.status, new_status)
+                history.append(ApplicationStatusHistory(
+                    application=application,
+                    previous_status=application.status,
+                    new_status=new_status,
+                    changed_by=changed_by,
+                    change_reason=reason,
+                ))
+                application.status = new_status
+                application.reviewed_by = changed_by
+                application.review_notes = reason
+                application.updated_at = now
+
+            Application.objects.bulk_update(
+                applications, ['status', 'reviewed_by', 'review_notes', 'updated_at'], batch_size=500
+            )
+            ApplicationStatusHistory.objects.bulk_create(history, batch_size=500)
+            for program_id, delta in seat_deltas.items():
+                Program.objects.filter(pk=program_id).adjust_occupied_seats(delta)
+            if applications:
+                bump_applications_version()
+        return applications
+
 class Application(models.Model):
     APPLICATION_STATUS = [
         ('draft', 'Draft'),
@@ -69,13 +154,23 @@ class Application(models.Model):
         related_name='reviewed_applications'
     )
     review_notes = models.TextField(blank=True)
+
+    # Denormalized document completeness, maintained by refresh_document_counts()
+    mandatory_documents_uploaded = models.PositiveIntegerField(default=0)
+    documents_complete = models.BooleanField(default=False, db_index=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ApplicationQuerySet.as_manager()
+
     class Meta:
         unique_together = ['user', 'program']
         ordering = ['-created_at']
+        indexes = [
+            # Keyset for cursor pagination of application queues
+            models.Index(fields=['created_at', 'id'], name='application_created_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.program.name}"
@@ -87,31 +182,100 @@ class Application(models.Model):
     @property
     def is_complete(self):
         """Check if application has all required documents"""
-        required_docs = self.program.required_documents.filter(is_mandatory=True)
-        uploaded_docs = self.documents.filter(document_type__in=required_docs)
-        return required_docs.count() == uploaded_docs.count()
+        return self.documents_complete
+
+    def refresh_document_counts(self):
+        """Recompute the completeness columns for this application and reload them."""
+        Application.objects.filter(pk=self.pk).refresh_document_counts()
+        self.refresh_from_db(fields=['mandatory_documents_uploaded', 'documents_complete'])
 
 class ApplicationDocument(models.Model):
     application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name='documents')
     document_type = models.ForeignKey(RequiredDocument, on_delete=models.CASCADE)
-    file = models.FileField(upload_to=application_document_path)
+    # Uploads are stored once per distinct content: `file` names the shared
+    # blob's file. Rows from before content addressing have no blob and own
+    # their file outright (see `manage.py dedupe_documents`).
+    file = models.FileField(upload_to=application_document_path, max_length=255)
+    blob = models.ForeignKey(
+        DocumentBlob, on_delete=models.PROTECT, null=True, blank=True, related_name='application_documents'
+    )
     original_filename = models.CharField(max_length=255)
     file_size = models.PositiveIntegerField()  # in bytes
     uploaded_at = models.DateTimeField(auto_now_add=True)
     verified = models.BooleanField(default=False)
     verification_notes = models.TextField(blank=True)
+    verified_at = models.DateTimeField(null=True, blank=True)  # last verification decision
+
+    # Filled in after upload by the background pipeline (documents/pipeline.py)
+    PROCESSING_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processed', 'Processed'),
+        ('rejected', 'Rejected'),
+        ('failed', 'Failed'),
+    ]
+    processing_status = models.CharField(
+        max_length=20, choices=PROCESSING_STATUS_CHOICES, default='pending', db_index=True
+    )
+    detected_content_type = models.CharField(max_length=100, blank=True)
+    page_count = models.PositiveIntegerField(null=True, blank=True)
+    thumbnail = models.FileField(upload_to=document_thumbnail_path, max_length=255, blank=True)
+    processing_error = models.TextField(blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         unique_together = ['application', 'document_type']
+        indexes = [
+            # Per-application streams of the timeline (applications/timeline.py)
+            models.Index(fields=['application', 'uploaded_at', 'id'], name='document_app_uploaded_idx'),
+            models.Index(fields=['application', 'verified_at', 'id'], name='document_app_verified_idx'),
+        ]
 
     def __str__(self):
         return f"{self.application.application_number} - {self.document_type.document_name}"
 
     def delete(self, *args, **kwargs):
-        """Delete file when model instance is deleted"""
-        if self.file and os.path.isfile(self.file.path):
-            os.remove(self.file.path)
-        super().delete(*args, **kwargs)
+        """Delete the row and give up its file.
+
+        A shared blob is released by the post_delete signal (which also covers
+        cascades) and only unlinked with its last reference; a legacy file
+        owned by this row alone, and the preview thumbnail, are removed directly.
+        """
+        paths = [self.thumbnail.path] if self.thumbnail else []
+        if self.file and self.blob_id is None:
+            paths.append(self.file.path)
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            Application.objects.filter(pk=self.application_id).refresh_document_counts()
+            for path in paths:
+                transaction.on_commit(lambda path=path: remove_file(path))
+        return result
+
+class DocumentUploadSession(models.Model):
+    """A resumable upload whose chunks are appended to a temporary file.
+
+    The ApplicationDocument row is only created when the upload completes.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name='upload_sessions')
+    document_type = models.ForeignKey(RequiredDocument, on_delete=models.CASCADE)
+    original_filename = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField()  # in bytes
+    received_bytes = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.original_filename} ({self.received_bytes}/{self.total_size})"
+
+    @property
+    def temp_path(self):
+        return os.path.join(settings.CHUNKED_UPLOAD_DIR, f"{self.id}.part")
+
+    def discard(self):
+        """Delete the session and its partial file."""
+        path = self.temp_path
+        self.delete()
+        remove_file(path)
 
 class ApplicationStatusHistory(models.Model):
     application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name='status_history')
@@ -123,6 +287,9 @@ class ApplicationStatusHistory(models.Model):
 
     class Meta:
         ordering = ['-changed_at']
+        indexes = [
+            models.Index(fields=['application', 'changed_at', 'id'], name='history_app_changed_idx'),
+        ]
 
     def __str__(self):
         return f"{self.application.application_number}: {self.previous_status} → {self.new_status}"
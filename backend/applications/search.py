@@ -0,0 +1,264 @@
+"""Full-text search over application content.
+
+The index lives outside the ORM because each database has its own text
+search machinery:
+
+* PostgreSQL: ``applications_application_search`` holds a weighted
+  ``tsvector`` per application behind a GIN index, queried with
+  ``websearch_to_tsquery`` and ranked with ``ts_rank_cd``.
+* SQLite: ``applications_application_fts`` is an FTS5 table ranked with
+  ``bm25``. Its rowid is derived from the application UUID so updates and
+  deletes are rowid lookups rather than scans.
+
+The tables are created by migration 0004, kept current by the signals in
+``signals.py`` and rebuilt with ``manage.py rebuild_application_search``.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Application
+
+POSTGRES_TABLE = 'applications_application_search'
+SQLITE_TABLE = 'applications_application_fts'
+
+# Indexed text, grouped by weight: applicant names rank above academic
+# details, which rank above the free-text essays.
+NAME_FIELDS = ['user__first_name', 'user__last_name', 'user__username']
+ACADEMIC_FIELDS = ['tenth_board', 'twelfth_board', 'graduation_university', 'graduation_degree']
+CONTENT_FIELDS = ['statement_of_purpose', 'work_experience', 'extracurricular_activities']
+
+INDEX_BATCH_SIZE = 500
+
+
+def _documents(queryset):
+    """Yield (application id, names, academics, content) for every application."""
+    fields = NAME_FIELDS + ACADEMIC_FIELDS + CONTENT_FIELDS
+    name_end = len(NAME_FIELDS)
+    academic_end = name_end + len(ACADEMIC_FIELDS)
+    for row in queryset.values_list('id', *fields).iterator(chunk_size=INDEX_BATCH_SIZE):
+        values = [value or '' for value in row[1:]]
+        yield (
+            row[0],
+            ' '.join(values[:name_end]),
+            ' '.join(values[name_end:academic_end]),
+            '\n'.join(values[academic_end:]),
+        )
+
+
+def _db_id(application_id):
+    return Application._meta.pk.get_db_prep_value(application_id, connection)
+
+
+def _sqlite_rowid(application_id):
+    # 63 bits of the UUID keep the rowid positive and collisions negligible
+    return Application._meta.pk.to_python(application_id).int >> 65
+
+
+class PostgresSearchBackend:
+    def index(self, cursor, documents):
+        for application_id, names, academics, content in documents:
+            cursor.execute(
+                f"""
+                INSERT INTO {POSTGRES_TABLE} (application_id, document)
+                VALUES (%s, setweight(to_tsvector('english', %s), 'A')
+                         || setweight(to_tsvector('english', %s), 'B')
+                         || setweight(to_tsvector('english', %s), 'C'))
+                ON CONFLICT (application_id) DO UPDATE SET document = EXCLUDED.document
+                """,
+                [_db_id(application_id), names, academics, content],
+            )
+
+    def remove(self, cursor, application_ids):
+        cursor.execute(
+            f'DELETE FROM {POSTGRES_TABLE} WHERE application_id = ANY(%s)',
+            [[_db_id(pk) for pk in application_ids]],
+        )
+
+    def clear(self, cursor):
+        cursor.execute(f'TRUNCATE {POSTGRES_TABLE}')
+
+    def count(self, cursor, query):
+        cursor.execute(
+            f"SELECT COUNT(*) FROM {POSTGRES_TABLE} WHERE document @@ websearch_to_tsquery('english', %s)",
+            [query],
+        )
+        return cursor.fetchone()[0]
+
+    def ranked_ids(self, cursor, query, limit, offset):
+        cursor.execute(
+            f"""
+            SELECT application_id, ts_rank_cd(document, q) AS rank
+            FROM {POSTGRES_TABLE}, websearch_to_tsquery('english', %s) AS q
+            WHERE document @@ q
+            ORDER BY rank DESC, application_id
+            LIMIT %s OFFSET %s
+            """,
+            [query, limit, offset],
+        )
+        return cursor.fetchall()
+
+
+class SQLiteSearchBackend:
+    # bm25() column weights: application_id (unindexed), names, academics, content
+    RANK = f'bm25({SQLITE_TABLE}, 0.0, 10.0, 5.0, 1.0)'
+
+    def index(self, cursor, documents):
+        rows = [
+            (_sqlite_rowid(application_id), _db_id(application_id), names, academics, content)
+            for application_id, names, academics, content in documents
+        ]
+        cursor.executemany(f'DELETE FROM {SQLITE_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+        cursor.executemany(
+            f'INSERT INTO {SQLITE_TABLE} (rowid, application_id, names, academics, content) '
+            'VALUES (%s, %s, %s, %s, %s)',
+            rows,
+        )
+
+    def remove(self, cursor, application_ids):
+        cursor.executemany(
+            f'DELETE FROM {SQLITE_TABLE} WHERE rowid = %s',
+            [(_sqlite_rowid(pk),) for pk in application_ids],
+        )
+
+    def clear(self, cursor):
+        cursor.execute(f'DELETE FROM {SQLITE_TABLE}')
+
+    @staticmethod
+    def match_expression(query):
+        """Translate free text into an FTS5 query: quoted phrases stay phrases, words match as prefixes."""
+        terms = []
+        for phrase, word in re.findall(r'"([^"]+)"|(\w+)', query):
+            if phrase:
+                words = re.findall(r'\w+', phrase)
+                if words:
+                    terms.append('"' + ' '.join(words) + '"')
+            else:
+                terms.append(f'"{word}"*')
+        return ' '.join(terms)
+
+    def count(self, cursor, query):
+        expression = self.match_expression(query)
+        if not expression:
+            return 0
+        cursor.execute(f'SELECT COUNT(*) FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH %s', [expression])
+        return cursor.fetchone()[0]
+
+    def ranked_ids(self, cursor, query, limit, offset):
+        expression = self.match_expression(query)
+        if not expression:
+            return []
+        cursor.execute(
+            f"""
+            SELECT application_id, -{self.RANK} AS rank
+            FROM {SQLITE_TABLE}
+            WHERE {SQLITE_TABLE} MATCH %s
+            ORDER BY {self.RANK}
+            LIMIT %s OFFSET %s
+            """,
+            [expression, limit, offset],
+        )
+        return cursor.fetchall()
+
+
+BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SQLiteSearchBackend,
+}
+
+
+def get_backend():
+    backend_class = BACKENDS.get(connection.vendor)
+    return backend_class() if backend_class else None
+
+
+def index_applications(queryset):
+    backend = get_backend()
+    if backend is None:
+        return
+    with connection.cursor() as cursor:
+        backend.index(cursor, _documents(queryset))
+
+
+def remove_applications(application_ids):
+    backend = get_backend()
+    if backend is None or not application_ids:
+        return
+    with connection.cursor() as cursor:
+        backend.remove(cursor, application_ids)
+
+
+def rebuild_index(batch_size=INDEX_BATCH_SIZE):
+    """Drop every indexed document and re-index all applications. Returns the count."""
+    backend = get_backend()
+    if backend is None:
+        return 0
+    total = 0
+    batch = []
+    with connection.cursor() as cursor:
+        backend.clear(cursor)
+        for document in _documents(Application.objects.order_by()):
+            batch.append(document)
+            if len(batch) >= batch_size:
+                backend.index(cursor, batch)
+                total += len(batch)
+                batch = []
+        backend.index(cursor, batch)
+    return total + len(batch)
+
+
+class SearchResults:
+    """Lazily evaluated, rank-ordered search hits usable by Django's Paginator.
+
+    ``count()`` and slicing each run one query against the text index; only
+    the applications on the requested page are then loaded through
+    ``queryset``, with their rank exposed as ``search_rank``.
+    """
+
+    def __init__(self, query, queryset):
+        self.query = query
+        self.queryset = queryset
+        self.backend = get_backend()
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            if self.backend is None:
+                self._count = self._fallback().count()
+            else:
+                with connection.cursor() as cursor:
+                    self._count = self.backend.count(cursor, self.query)
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        offset = key.start or 0
+        limit = (key.stop if key.stop is not None else self.count()) - offset
+        if limit <= 0:
+            return []
+        if self.backend is None:
+            return list(self._fallback()[offset:offset + limit])
+
+        with connection.cursor() as cursor:
+            hits = self.backend.ranked_ids(cursor, self.query, limit, offset)
+        ranks = {Application._meta.pk.to_python(pk): rank for pk, rank in hits}
+        applications = {application.pk: application for application in self.queryset.filter(pk__in=ranks)}
+        results = []
+        for pk, rank in ranks.items():
+            application = applications.get(pk)
+            if application is not None:
+                application.search_rank = rank
+                results.append(application)
+        return results
+
+    def _fallback(self):
+        """Unindexed databases degrade to substring matching on names and essays."""
+        condition = Q()
+        for field in NAME_FIELDS + ACADEMIC_FIELDS + CONTENT_FIELDS:
+            condition |= Q(**{f'{field}__icontains': self.query})
+        return self.queryset.filter(condition)
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from django.urls import reverse
 from django.utils import timezone
 from .models import Application, ApplicationDocument, ApplicationStatusHistory
 from programs.serializers import ProgramListSerializer
@@ -10,14 +11,19 @@ class ApplicationDocumentSerializer(serializers.ModelSerializer):
     )
     document_type_name = serializers.CharField(source='document_type.document_name', read_only=True)
     is_mandatory = serializers.BooleanField(source='document_type.is_mandatory', read_only=True)
+    download_url = serializers.SerializerMethodField()
     
     class Meta:
         model = ApplicationDocument
         fields = [
             'id', 'application', 'document_type', 'document_type_name', 'file', 'original_filename',
-            'file_size', 'uploaded_at', 'verified', 'verification_notes', 'is_mandatory'
+            'file_size', 'uploaded_at', 'verified', 'verification_notes', 'verified_at', 'is_mandatory',
+            'processing_status', 'detected_content_type', 'page_count', 'thumbnail', 'download_url'
+        ]
+        read_only_fields = [
+            'original_filename', 'file_size', 'uploaded_at', 'verified', 'verification_notes', 'verified_at',
+            'processing_status', 'detected_content_type', 'page_count', 'thumbnail'
         ]
-        read_only_fields = ['original_filename', 'file_size', 'uploaded_at', 'verified', 'verification_notes']
 
     def create(self, validated_data):
         # If application was not provided explicitly, try to pull it from context
@@ -27,6 +33,9 @@ class ApplicationDocumentSerializer(serializers.ModelSerializer):
                 validated_data['application'] = application
         return super().create(validated_data)
 
+    def get_download_url(self, obj):
+        return reverse('application-document-download', args=[obj.pk])
+
 class ApplicationStatusHistorySerializer(serializers.ModelSerializer):
     changed_by_name = serializers.CharField(source='changed_by.get_full_name', read_only=True)
     
@@ -58,7 +67,8 @@ class ApplicationSerializer(serializers.ModelSerializer):
         model = Application
         fields = '__all__'
         read_only_fields = [
-            'user', 'submitted_at', 'reviewed_by', 'review_notes', 
+            'user', 'status', 'submitted_at', 'reviewed_by', 'review_notes', 
+            'mandatory_documents_uploaded', 'documents_complete',
             'created_at', 'updated_at'
         ]
 
@@ -94,14 +104,30 @@ class ApplicationSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError("You have already applied for this program")
         return attrs
 
+    def update(self, instance, validated_data):
+        program_changed = validated_data.get('program_id', instance.program_id) != instance.program_id
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        # Write only the submitted fields: a full-row save would also put back
+        # the status this instance was loaded with, undoing a concurrent submit
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        if program_changed:
+            # Completeness is counted against the new program's mandatory documents
+            instance.refresh_document_counts()
+        return instance
+
 class ApplicationListSerializer(serializers.ModelSerializer):
-    """Simplified serializer for application listings"""
+    """Simplified serializer for application listings.
+
+    Expects the annotated queryset built by ``ApplicationListView`` so that no
+    field triggers a query of its own.
+    """
     program_name = serializers.CharField(source='program.name', read_only=True)
     department_name = serializers.CharField(source='program.department.name', read_only=True)
-    program = serializers.IntegerField(source='program.id', read_only=True)
-    user_name = serializers.CharField(source='user.get_full_name', read_only=True)
+    program = serializers.IntegerField(source='program_id', read_only=True)
+    user_name = serializers.CharField(source='applicant_name', read_only=True)
     application_number = serializers.ReadOnlyField()
-    is_complete = serializers.ReadOnlyField()
+    is_complete = serializers.BooleanField(source='documents_complete', read_only=True)
     
     class Meta:
         model = Application
@@ -112,3 +138,11 @@ class ApplicationListSerializer(serializers.ModelSerializer):
             # academic highlights for tables
             'tenth_percentage', 'twelfth_percentage'
         ]
+
+
+class ApplicationSearchSerializer(ApplicationListSerializer):
+    """Application listing row with its full-text search rank"""
+    search_rank = serializers.FloatField(read_only=True, default=None)
+
+    class Meta(ApplicationListSerializer.Meta):
+        fields = ApplicationListSerializer.Meta.fields + ['search_rank']
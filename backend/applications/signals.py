@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from documents.models import DocumentBlob
+from programs.catalog import bump_applications_version
+from programs.models import Program, RequiredDocument
+from . import search
+from .models import Application, ApplicationDocument
+
+# User fields that feed the application search index
+SEARCHABLE_USER_FIELDS = {'first_name', 'last_name', 'username'}
+
+
+@receiver(post_save, sender=Application)
+def initialize_document_counts(sender, instance, created, raw=False, **kwargs):
+    """A new application may already be complete if its program requires nothing."""
+    if created and not raw:
+        Application.objects.filter(pk=instance.pk).refresh_document_counts()
+
+
+@receiver(post_save, sender=Application)
+def claim_seat(sender, instance, created, raw=False, **kwargs):
+    """Applications normally start as drafts, but one created in a seat-holding status takes a seat."""
+    if created and not raw:
+        Program.objects.filter(pk=instance.program_id).adjust_occupied_seats(
+            Program.seat_delta(None, instance.status)
+        )
+
+
+@receiver(post_delete, sender=Application)
+def release_seat(sender, instance, **kwargs):
+    """Deleting a seat-holding application gives its seat back."""
+    Program.objects.filter(pk=instance.program_id).adjust_occupied_seats(
+        Program.seat_delta(instance.status, None)
+    )
+
+
+@receiver(post_save, sender=RequiredDocument)
+@receiver(post_delete, sender=RequiredDocument)
+def refresh_program_document_counts(sender, instance, raw=False, **kwargs):
+    """Mandatory flags moved, so every application of the program is re-evaluated."""
+    if not raw:
+        Application.objects.filter(program_id=instance.program_id).refresh_document_counts()
+
+
+@receiver(post_save, sender=Application)
+def index_application(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_applications(Application.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Application)
+def unindex_application(sender, instance, **kwargs):
+    search.remove_applications([instance.pk])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def reindex_user_applications(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Applicant names are indexed, so renaming a user re-indexes their applications."""
+    if created or raw:
+        return
+    if update_fields is not None and not SEARCHABLE_USER_FIELDS.intersection(update_fields):
+        return
+    search.index_applications(Application.objects.filter(user=instance))
+
+
+@receiver(post_delete, sender=ApplicationDocument)
+def release_document_blob(sender, instance, **kwargs):
+    """Runs for explicit deletes and cascades alike, so blob reference counts stay exact."""
+    if instance.blob_id:
+        DocumentBlob.objects.release(instance.blob_id)
+
+
+@receiver(post_save, sender=Application)
+@receiver(post_delete, sender=Application)
+def invalidate_application_rollups(sender, **kwargs):
+    """Cached per-department application counts are stale after any application change."""
+    bump_applications_version()
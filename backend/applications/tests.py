@@ -1,3 +1,613 @@
-from django.test import TestCase
+import hashlib
+import json
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from authentication.models import User
+from messaging.models import Conversation, Message
+from programs.models import Department, Program, RequiredDocument
+from .models import Application, ApplicationDocument, ApplicationStatusHistory, DocumentUploadSession
+from .serializers import ApplicationSerializer
+
+TEST_MEDIA_ROOT = '/tmp/college_portal_test_media'
+
+
+class ApplicationTestMixin:
+    """Shared fixtures for the application API tests."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Computer Science', code='CS')
+        now = timezone.now()
+        cls.program = Program.objects.create(
+            name='B.Tech Computer Science',
+            code='BTCS',
+            department=cls.department,
+            program_type='undergraduate',
+            duration_years=4,
+            duration_semesters=8,
+            description='Undergraduate programme',
+            intake_capacity=60,
+            fees_per_semester=50000,
+            min_percentage=60,
+            eligibility_criteria='12th with PCM',
+            application_start_date=now - timedelta(days=10),
+            application_end_date=now + timedelta(days=10),
+        )
+        cls.marksheet = RequiredDocument.objects.create(program=cls.program, document_name='12th Marksheet')
+        cls.photo = RequiredDocument.objects.create(program=cls.program, document_name='Photograph')
+        RequiredDocument.objects.create(program=cls.program, document_name='Resume', is_mandatory=False)
+        cls.officer = User.objects.create_user(
+            username='officer', role='admission_officer'
+        )
+
+    def create_application(self, index, **kwargs):
+        user = User.objects.create_user(
+            username=f'applicant{index}', first_name='Applicant', last_name=str(index)
+        )
+        fields = {
+            'user': user,
+            'program': self.program,
+            'date_of_birth': date(2005, 1, 1),
+            'gender': 'female',
+            'permanent_address': 'Somewhere',
+            'emergency_contact_name': 'Parent',
+            'emergency_contact_phone': '9999999999',
+            'emergency_contact_relation': 'Mother',
+            'tenth_percentage': 90,
+            'tenth_board': 'CBSE',
+            'tenth_year': 2021,
+        }
+        fields.update(kwargs)
+        return Application.objects.create(**fields)
+
+    def attach_document(self, application, document_type):
+        document = ApplicationDocument.objects.create(
+            application=application,
+            document_type=document_type,
+            file=SimpleUploadedFile('doc.pdf', b'%PDF-1.4'),
+            original_filename='doc.pdf',
+            file_size=8,
+        )
+        application.refresh_document_counts()
+        return document
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT)
+class ApplicationListQueryTests(ApplicationTestMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.officer)
+
+    def seed(self, count):
+        applications = [self.create_application(i) for i in range(count)]
+        for application in applications[::2]:
+            self.attach_document(application, self.marksheet)
+            self.attach_document(application, self.photo)
+        return applications
+
+    def test_query_count_is_independent_of_page_size(self):
+        self.seed(3)
+        with self.assertNumQueries(2):  # COUNT for the paginator + the page itself
+            response = self.client.get(reverse('application-list'))
+        self.assertEqual(len(response.data['results']), 3)
+
+        for i in range(3, 25):
+            self.create_application(i)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('application-list'))
+        self.assertEqual(len(response.data['results']), 20)
+
+    def test_cursor_pagination_skips_count_and_walks_all_rows(self):
+        applications = self.seed(25)
+        seen = []
+        url = reverse('application-list') + '?pagination=cursor'
+        while url:
+            with self.assertNumQueries(1):  # no COUNT(*), no OFFSET scan
+                response = self.client.get(url)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(sorted(seen), sorted(str(a.id) for a in applications))
+
+    def test_annotated_fields_match_model(self):
+        applications = self.seed(4)
+        response = self.client.get(reverse('application-list'))
+        rows = {row['id']: row for row in response.data['results']}
+        for application in applications:
+            row = rows[str(application.id)]
+            self.assertEqual(row['is_complete'], application.is_complete)
+            self.assertEqual(row['user_name'], application.user.get_full_name())
+            self.assertEqual(row['department_name'], self.department.name)
+            self.assertEqual(row['program'], self.program.id)
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT)
+class DocumentCountTests(ApplicationTestMixin, TestCase):
+    def setUp(self):
+        self.application = self.create_application(1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.application.user)
+
+    def upload(self, document_type):
+        return self.client.post(reverse('document-upload'), {
+            'application': str(self.application.id),
+            'document_type': document_type.id,
+            'file': SimpleUploadedFile('doc.pdf', b'%PDF-1.4', content_type='application/pdf'),
+        }, format='multipart')
+
+    def test_upload_and_delete_maintain_counts(self):
+        self.assertEqual(self.upload(self.marksheet).status_code, 201)
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.mandatory_documents_uploaded, 1)
+        self.assertFalse(self.application.is_complete)
+
+        self.assertEqual(self.upload(self.photo).status_code, 201)
+        self.application.refresh_from_db()
+        self.assertTrue(self.application.is_complete)
+
+        self.application.documents.get(document_type=self.photo).delete()
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.mandatory_documents_uploaded, 1)
+        self.assertFalse(self.application.is_complete)
+
+    def test_mandatory_flag_change_refreshes_program(self):
+        self.attach_document(self.application, self.marksheet)
+        self.photo.is_mandatory = False
+        self.photo.save()
+        self.application.refresh_from_db()
+        self.assertTrue(self.application.is_complete)
+
+    def test_changing_program_refreshes_counts(self):
+        self.attach_document(self.application, self.marksheet)
+        self.attach_document(self.application, self.photo)
+        self.application.refresh_from_db()
+        self.assertTrue(self.application.is_complete)
+
+        other = Program.objects.create(
+            name='B.Sc Mathematics', code='BSM', department=self.department, program_type='undergraduate',
+            duration_years=3, duration_semesters=6, description='Undergraduate programme', intake_capacity=30,
+            fees_per_semester=30000, min_percentage=50, eligibility_criteria='12th',
+            application_start_date=self.program.application_start_date,
+            application_end_date=self.program.application_end_date,
+        )
+        RequiredDocument.objects.create(program=other, document_name='Transfer Certificate')
+        response = self.client.patch(
+            reverse('application-detail', args=[self.application.id]), {'program_id': other.id}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.program_id, other.id)
+        self.assertEqual(self.application.mandatory_documents_uploaded, 0)
+        self.assertFalse(self.application.is_complete)
+        response = self.client.patch(reverse('application-submit', args=[self.application.id]))
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT)
+class ApplicationDetailQueryTests(ApplicationTestMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.officer)
+
+    def grow(self, application, documents, history):
+        for index in range(documents):
+            document_type = RequiredDocument.objects.create(program=self.program, document_name=f'Extra {index}')
+            self.attach_document(application, document_type)
+        for index in range(history):
+            ApplicationStatusHistory.objects.create(
+                application=application,
+                previous_status='draft',
+                new_status='submitted',
+                changed_by=self.officer,
+            )
+
+    def test_query_count_is_constant_as_documents_and_history_grow(self):
+        # application + user + program + department, documents, history
+        small = self.create_application(1, status='submitted')
+        self.grow(small, documents=1, history=1)
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('application-detail', args=[small.id]))
+        self.assertEqual(len(response.data['documents']), 1)
+
+        large = self.create_application(2, status='submitted')
+        self.grow(large, documents=15, history=30)
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('application-detail', args=[large.id]))
+        self.assertEqual(len(response.data['documents']), 15)
+        self.assertEqual(len(response.data['status_history']), 30)
+        self.assertEqual(response.data['program']['available_seats'], self.program.intake_capacity - 2)
+        self.assertEqual(response.data['status_history'][0]['changed_by_name'], self.officer.get_full_name())
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT)
+class BulkStatusUpdateTests(ApplicationTestMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.officer)
+
+    def test_bulk_update_reports_per_id_outcomes(self):
+        pending = [self.create_application(i, status='submitted') for i in range(3)]
+        already = self.create_application(3, status='shortlisted')
+        missing = '00000000-0000-0000-0000-000000000000'
+
+        response = self.client.post(reverse('application-status-bulk-update'), {
+            'ids': [str(a.id) for a in pending] + [str(already.id), missing, 'not-a-uuid'],
+            'status': 'shortlisted',
+            'reason': 'Merit list round 1',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], 3)
+        outcomes = {row['id']: row['outcome'] for row in response.data['results']}
+        self.assertEqual(outcomes[str(already.id)], 'unchanged')
+        self.assertEqual(outcomes[missing], 'not_found')
+        self.assertEqual(outcomes['not-a-uuid'], 'invalid')
+        for application in pending:
+            self.assertEqual(outcomes[str(application.id)], 'updated')
+            application.refresh_from_db()
+            self.assertEqual(application.status, 'shortlisted')
+            self.assertEqual(application.reviewed_by, self.officer)
+        self.assertEqual(ApplicationStatusHistory.objects.filter(new_status='shortlisted').count(), 3)
+
+    def test_applicants_cannot_bulk_update(self):
+        application = self.create_application(1)
+        self.client.force_authenticate(application.user)
+        response = self.client.post(reverse('application-status-bulk-update'), {
+            'ids': [str(application.id)], 'status': 'admitted',
+        }, format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_bulk_document_verification(self):
+        complete, partial = self.create_application(1), self.create_application(2)
+        documents = [
+            self.attach_document(complete, self.marksheet),
+            self.attach_document(complete, self.photo),
+            self.attach_document(partial, self.marksheet),
+        ]
+        entries = [{'id': document.id, 'verified': True} for document in documents]
+        entries += [{'id': 999999, 'verified': True}, {'id': documents[0].id}, {'id': 'x', 'verified': True}]
+        entries[0] = {'id': documents[0].id, 'verified': 'false', 'notes': 'Blurry'}
+
+        with self.assertNumQueries(6):
+            response = self.client.post(reverse('document-verify-bulk'), {'documents': entries}, format='json')
+        outcomes = {row['id']: row['outcome'] for row in response.data['results']}
+        self.assertEqual(outcomes, {
+            str(documents[0].id): 'invalid', str(documents[1].id): 'updated', str(documents[2].id): 'updated',
+            '999999': 'not_found', 'x': 'invalid',
+        })
+        self.assertEqual(response.data['fully_verified'], [])
+
+        response = self.client.post(reverse('document-verify-bulk'), {'documents': [
+            {'id': documents[0].id, 'verified': True}, {'id': documents[1].id, 'verified': True},
+        ]}, format='json')
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(response.data['fully_verified'], [str(complete.id)])
+        self.assertEqual(list(Application.objects.fully_verified()), [complete])
+
+
+class ApplicationExportTests(ApplicationTestMixin, TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_streams_csv_and_ndjson(self):
+        applications = [self.create_application(i) for i in range(3)]
+
+        response = self.client.get(reverse('application-export', args=['csv']), {'program': self.program.id})
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['id', 'program_code', 'program_name'])
+        self.assertEqual(len(lines), len(applications) + 1)
+
+        response = self.client.get(reverse('application-export', args=['ndjson']))
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual({row['id'] for row in rows}, {str(a.id) for a in applications})
+
+    def test_officers_cannot_export(self):
+        self.client.force_authenticate(self.officer)
+        response = self.client.get(reverse('application-export', args=['csv']))
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT)
+class SeatAccountingTests(ApplicationTestMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.officer)
+
+    def complete(self, application):
+        self.attach_document(application, self.marksheet)
+        self.attach_document(application, self.photo)
+
+    def test_stale_program_saves_keep_the_counter(self):
+        stale = Program.objects.get(pk=self.program.pk)
+        self.assertTrue(Program.objects.filter(pk=self.program.pk).reserve_seat())
+        stale.name = 'B.Tech CSE'
+        stale.save()
+        self.program.refresh_from_db()
+        self.assertEqual((self.program.name, self.program.occupied_seats), ('B.Tech CSE', 1))
+
+        # The admin edit view saves through the serializer
+        self.client.force_authenticate(User.objects.create_user(username='admin', role='admin'))
+        response = self.client.patch(
+            reverse('program-update', args=[self.program.pk]), {'intake_capacity': 70}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.program.refresh_from_db()
+        self.assertEqual((self.program.intake_capacity, self.program.occupied_seats), (70, 1))
+
+    def test_transitions_move_the_counter(self):
+        application = self.create_application(1)
+        self.complete(application)
+        self.client.force_authenticate(application.user)
+        self.client.patch(reverse('application-submit', args=[application.id]))
+        self.program.refresh_from_db()
+        self.assertEqual(self.program.occupied_seats, 1)
+
+        self.client.force_authenticate(self.officer)
+        self.client.post(reverse('application-status-update', args=[application.id]), {'status': 'rejected'})
+        self.program.refresh_from_db()
+        self.assertEqual(self.program.occupied_seats, 0)
+
+        self.client.post(reverse('application-status-bulk-update'), {
+            'ids': [str(application.id)], 'status': 'waitlisted',
+        }, format='json')
+        self.client.post(reverse('application-status-bulk-update'), {
+            'ids': [str(application.id)], 'status': 'admitted',
+        }, format='json')
+        self.program.refresh_from_db()
+        self.assertEqual(self.program.occupied_seats, 1)
+
+    def test_submission_is_refused_when_full(self):
+        Program.objects.filter(pk=self.program.pk).update(intake_capacity=1)
+        first, second = self.create_application(1), self.create_application(2)
+        self.complete(first)
+        self.complete(second)
+
+        self.client.force_authenticate(first.user)
+        self.assertEqual(self.client.patch(reverse('application-submit', args=[first.id])).status_code, 200)
+        self.client.force_authenticate(second.user)
+        response = self.client.patch(reverse('application-submit', args=[second.id]))
+        self.assertEqual(response.status_code, 400)
+        second.refresh_from_db()
+        self.assertEqual(second.status, 'draft')
+        self.program.refresh_from_db()
+        self.assertEqual(self.program.occupied_seats, 1)
+
+    def test_submit_is_a_single_conditional_update(self):
+        application = self.create_application(1)
+        self.client.force_authenticate(application.user)
+        url = reverse('application-submit', args=[application.id])
+        self.assertEqual(self.client.patch(url).status_code, 400)  # documents missing
+
+        self.complete(application)
+        # savepoint, UPDATE application, UPDATE program, INSERT history, release
+        with self.assertNumQueries(5):
+            self.assertEqual(self.client.patch(url).status_code, 200)
+        response = self.client.patch(url)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(ApplicationStatusHistory.objects.filter(application=application).count(), 1)
+        self.program.refresh_from_db()
+        self.assertEqual(self.program.occupied_seats, 1)
+
+    def test_edits_cannot_undo_a_submit(self):
+        application = self.create_application(1, twelfth_percentage=70)
+        self.complete(application)
+        self.client.force_authenticate(application.user)
+        url = reverse('application-detail', args=[application.id])
+        stale = Application.objects.get(pk=application.pk)
+        self.assertEqual(self.client.patch(reverse('application-submit', args=[application.id])).status_code, 200)
+
+        # An edit that loaded the row before the submit writes only its own fields
+        serializer = ApplicationSerializer(stale, data={'twelfth_percentage': 75}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+        application.refresh_from_db()
+        self.assertEqual((application.status, application.twelfth_percentage), ('submitted', 75))
+
+        # and once submitted the applicant can no longer edit it at all
+        response = self.client.patch(url, {'twelfth_percentage': 80}, format='json')
+        self.assertEqual(response.status_code, 400)
+        application.refresh_from_db()
+        self.assertEqual(application.twelfth_percentage, 75)
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT)
+class ApplicationSearchTests(ApplicationTestMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.officer)
+
+    def search(self, query):
+        return self.client.get(reverse('application-search'), {'q': query})
+
+    def test_ranked_search_tracks_saves_and_deletes(self):
+        essay = self.create_application(1, statement_of_purpose='I want to study robotics and control systems.')
+        named = self.create_application(2)
+        named.user.first_name = 'Robotics'
+        named.user.save()
+        self.create_application(3, statement_of_purpose='Interested in databases.')
+
+        response = self.search('robotics')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data['results']], [str(named.id), str(essay.id)])
+        self.assertEqual(response.data['count'], 2)
+
+        self.assertEqual(self.search('"control systems"').data['count'], 1)
+        self.assertEqual(self.search('"systems control"').data['count'], 0)
+
+        essay.statement_of_purpose = 'Changed my mind.'
+        essay.save()
+        named.delete()
+        self.assertEqual(self.search('robotics').data['count'], 0)
+
+    def test_applicants_cannot_search(self):
+        application = self.create_application(1)
+        self.client.force_authenticate(application.user)
+        self.assertEqual(self.search('anything').status_code, 403)
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT)
+class MeritRankingTests(ApplicationTestMixin, TestCase):
+    def test_scores_and_tie_breaks(self):
+        from . import merit
+
+        Program.objects.filter(pk=self.program.pk).update(intake_capacity=2, shortlist_factor=1.0)
+        self.program.refresh_from_db()
+        now = timezone.now()
+        best = self.create_application(1, status='submitted', tenth_percentage=95, twelfth_percentage=95)
+        # Same score as `older`, but younger, so it ranks after it
+        younger = self.create_application(
+            2, status='submitted', tenth_percentage=80, twelfth_percentage=80, date_of_birth=date(2006, 1, 1)
+        )
+        older = self.create_application(
+            3, status='submitted', tenth_percentage=80, twelfth_percentage=80, date_of_birth=date(2004, 1, 1),
+            submitted_at=now,
+        )
+        # Missing twelfth marks: scored on tenth alone
+        partial = self.create_application(4, status='submitted', tenth_percentage=85)
+        self.create_application(5, tenth_percentage=100)  # draft, not in the pool
+
+        ranking = merit.rank_program(self.program)
+        self.assertEqual(ranking.ids, [best.id, partial.id, older.id, younger.id])
+        self.assertAlmostEqual(ranking.scores[1], 85.0)
+        self.assertEqual(ranking.shortlist, [best.id, partial.id])
+
+        merit.apply_shortlist(ranking, self.officer)
+        self.assertEqual(
+            set(Application.objects.filter(status='shortlisted').values_list('pk', flat=True)),
+            {best.id, partial.id},
+        )
+
+    def test_preview_rejects_invalid_limit_and_factor(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='admin', role='admin'))
+        url = reverse('application-merit-ranking', args=[self.program.pk])
+        for limit in (0, -1):
+            self.assertEqual(self.client.get(url, {'limit': limit}).status_code, 400)
+        for factor in ('-1', 'inf', 'nan'):
+            self.assertEqual(self.client.get(url, {'factor': factor}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'limit': 1, 'factor': 2}).status_code, 200)
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT, CHUNKED_UPLOAD_DIR='/tmp/college_portal_test_uploads')
+class ChunkedUploadTests(ApplicationTestMixin, TestCase):
+    def setUp(self):
+        self.application = self.create_application(1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.application.user)
+
+    def start(self, size, filename='scan.pdf'):
+        return self.client.post(reverse('document-upload-start'), {
+            'application': str(self.application.id),
+            'document_type': self.marksheet.id,
+            'filename': filename,
+            'size': size,
+        }, format='json')
+
+    def put_chunk(self, session_id, offset, data):
+        return self.client.generic(
+            'PUT', reverse('document-upload-chunk', args=[session_id]) + f'?offset={offset}',
+            data, content_type='application/octet-stream',
+        )
+
+    def test_resumable_upload_creates_document_on_completion(self):
+        payload = b'%PDF-1.4 ' + b'x' * 3000
+        session_id = self.start(len(payload)).data['id']
+
+        self.assertEqual(self.put_chunk(session_id, 0, payload[:1000]).data['received_bytes'], 1000)
+        # A retried chunk at a stale offset is told where to resume
+        response = self.put_chunk(session_id, 0, payload[:1000])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['received_bytes'], 1000)
+        self.assertFalse(ApplicationDocument.objects.exists())
+
+        self.put_chunk(session_id, 1000, payload[1000:])
+        response = self.client.post(
+            reverse('document-upload-complete', args=[session_id]),
+            {'sha256': hashlib.sha256(payload).hexdigest()}, format='json',
+        )
+        self.assertEqual(response.status_code, 201)
+        document = ApplicationDocument.objects.get()
+        self.assertEqual(document.file_size, len(payload))
+        with document.file.open('rb') as handle:
+            self.assertEqual(handle.read(), payload)
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.mandatory_documents_uploaded, 1)
+
+    def test_a_complete_that_lost_the_race_gets_409(self):
+        payload = b'%PDF-1.4 raced'
+        session_id = self.start(len(payload)).data['id']
+        self.put_chunk(session_id, 0, payload)
+        session = DocumentUploadSession.objects.get(pk=session_id)
+        # The other complete committed between this one's lookup and its row lock
+        with mock.patch('applications.upload_views._get_session', side_effect=[session, None]):
+            response = self.client.post(reverse('document-upload-complete', args=[session_id]), format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(ApplicationDocument.objects.exists())
+
+    def test_limits_are_enforced(self):
+        self.assertEqual(self.start(100, filename='scan.exe').status_code, 400)
+        self.assertEqual(self.start(6 * 1024 * 1024).status_code, 413)
+
+        session_id = self.start(10).data['id']
+        self.assertEqual(self.put_chunk(session_id, 0, b'x' * 11).status_code, 413)
+        self.assertEqual(self.client.get(reverse('document-upload-session', args=[session_id])).data['received_bytes'], 0)
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT)
+class ApplicationTimelineTests(ApplicationTestMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.officer)
+
+    def test_pages_merge_all_sources_newest_first(self):
+        application = self.create_application(1)
+        base = timezone.now() - timedelta(days=1)
+        marksheet = self.attach_document(application, self.marksheet)
+        photo = self.attach_document(application, self.photo)
+        ApplicationDocument.objects.filter(pk=marksheet.pk).update(uploaded_at=base, verified_at=base, verified=True)
+        ApplicationDocument.objects.filter(pk=photo.pk).update(uploaded_at=base + timedelta(minutes=5))
+        for minutes in (1, 7):
+            history = ApplicationStatusHistory.objects.create(
+                application=application, previous_status='draft', new_status='submitted', changed_by=self.officer,
+            )
+            ApplicationStatusHistory.objects.filter(pk=history.pk).update(changed_at=base + timedelta(minutes=minutes))
+        for officer_index in range(2):
+            officer = self.officer if officer_index == 0 else User.objects.create_user(
+                username='officer2', role='admission_officer'
+            )
+            conversation = Conversation.objects.create(officer=officer, applicant=application.user, application=application)
+            for minutes in (2 + officer_index, 6):  # same-second ties across conversations
+                message = Message.objects.create(conversation=conversation, sender=officer, content='Hello')
+                Message.objects.filter(pk=message.pk).update(sent_at=base + timedelta(minutes=minutes))
+
+        seen = []
+        url = reverse('application-timeline', args=[application.id]) + '?page_size=3'
+        while url:
+            with self.assertNumQueries(7):  # application, conversation ids, 3 sources + 2 conversations
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual(len(seen), 9)
+        self.assertEqual([event['timestamp'] for event in seen], sorted((e['timestamp'] for e in seen), reverse=True))
+        self.assertEqual(seen[-1]['type'], 'document_uploaded')  # the verification wins the tie at `base`
+        self.assertEqual(seen[-2]['type'], 'document_verified')
+        self.assertEqual(sum(event['type'] == 'message' for event in seen), 4)
+
+    def test_other_applicants_cannot_read_timeline(self):
+        application = self.create_application(1)
+        self.client.force_authenticate(self.create_application(2).user)
+        response = self.client.get(reverse('application-timeline', args=[application.id]))
+        self.assertEqual(response.status_code, 404)
+        self.client.force_authenticate(application.user)
+        self.assertEqual(self.client.get(reverse('application-timeline', args=[application.id]) + '?cursor=bogus').status_code, 400)
@@ -0,0 +1,169 @@
+"""Chronological activity feed for one application.
+
+Each source (status history, document uploads, document verifications and
+the messages of every related conversation) is read newest-first from its
+own (application, timestamp, id) index, limited to one page plus one row,
+and the sorted streams are merged lazily with ``heapq.merge``. Pages are
+keyset-paginated on (timestamp, source rank, id), so nothing is counted,
+offset or sorted in Python beyond the rows of the page being served.
+"""
+import base64
+import binascii
+import heapq
+import json
+from itertools import islice
+from typing import NamedTuple
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from messaging.models import Conversation, Message
+from .models import ApplicationDocument, ApplicationStatusHistory
+
+# Ties on the timestamp are broken by source rank, then by row id
+STATUS, UPLOAD, VERIFICATION, MESSAGE = range(4)
+
+
+class TimelineEvent(NamedTuple):
+    timestamp: object
+    rank: int
+    id: int
+    data: dict
+
+    @property
+    def key(self):
+        return (self.timestamp, self.rank, self.id)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(event):
+    raw = json.dumps([event.timestamp.isoformat(), event.rank, event.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        timestamp, rank, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        timestamp = parse_datetime(timestamp)
+        if timestamp is None:
+            raise ValueError(cursor)
+        return timestamp, int(rank), int(pk)
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError) as exc:
+        raise InvalidCursor('Invalid cursor') from exc
+
+
+def _before(time_field, rank, cursor):
+    """Rows of source ``rank`` whose (time, rank, id) sorts below the cursor."""
+    if cursor is None:
+        return Q()
+    timestamp, cursor_rank, cursor_id = cursor
+    if rank < cursor_rank:
+        return Q(**{f'{time_field}__lte': timestamp})
+    if rank > cursor_rank:
+        return Q(**{f'{time_field}__lt': timestamp})
+    return Q(**{f'{time_field}__lt': timestamp}) | Q(**{time_field: timestamp, 'id__lt': cursor_id})
+
+
+def _full_name(row, prefix):
+    name = f"{row[prefix + 'first_name']} {row[prefix + 'last_name']}".strip()
+    return name or row[prefix + 'username']
+
+
+def _status_event(row):
+    return {
+        'type': 'status_changed',
+        'previous_status': row['previous_status'],
+        'new_status': row['new_status'],
+        'reason': row['change_reason'],
+        'actor': _full_name(row, 'changed_by__'),
+    }
+
+
+def _upload_event(row):
+    return {
+        'type': 'document_uploaded',
+        'document_id': row['id'],
+        'document_type': row['document_type__document_name'],
+        'filename': row['original_filename'],
+        'file_size': row['file_size'],
+    }
+
+
+def _verification_event(row):
+    return {
+        'type': 'document_verified' if row['verified'] else 'document_rejected',
+        'document_id': row['id'],
+        'document_type': row['document_type__document_name'],
+        'notes': row['verification_notes'],
+    }
+
+
+def _message_event(row):
+    return {
+        'type': 'message',
+        'conversation_id': row['conversation_id'],
+        'sender_id': row['sender_id'],
+        'sender': _full_name(row, 'sender__'),
+        'content': row['content'],
+    }
+
+
+_USER_FIELDS = ('first_name', 'last_name', 'username')
+
+
+def _sources(application):
+    """(rank, time field, queryset, formatter) for every stream of the application."""
+    documents = ApplicationDocument.objects.filter(application=application)
+    document_fields = ('id', 'document_type__document_name')
+    yield (
+        STATUS, 'changed_at',
+        ApplicationStatusHistory.objects.filter(application=application).values(
+            'id', 'changed_at', 'previous_status', 'new_status', 'change_reason',
+            *(f'changed_by__{field}' for field in _USER_FIELDS),
+        ),
+        _status_event,
+    )
+    yield (
+        UPLOAD, 'uploaded_at',
+        documents.values(*document_fields, 'uploaded_at', 'original_filename', 'file_size'),
+        _upload_event,
+    )
+    yield (
+        VERIFICATION, 'verified_at',
+        documents.filter(verified_at__isnull=False).values(
+            *document_fields, 'verified_at', 'verified', 'verification_notes'
+        ),
+        _verification_event,
+    )
+    # One stream per conversation so each is a range scan on (conversation, sent_at, id)
+    for conversation_id in Conversation.objects.filter(application=application).values_list('id', flat=True):
+        yield (
+            MESSAGE, 'sent_at',
+            Message.objects.filter(conversation_id=conversation_id).values(
+                'id', 'sent_at', 'conversation_id', 'sender_id', 'content',
+                *(f'sender__{field}' for field in _USER_FIELDS),
+            ),
+            _message_event,
+        )
+
+
+def _stream(rank, time_field, queryset, formatter, cursor, limit):
+    rows = queryset.filter(_before(time_field, rank, cursor)).order_by(f'-{time_field}', '-id')[:limit]
+    for row in rows:
+        yield TimelineEvent(row[time_field], rank, row['id'], formatter(row))
+
+
+def timeline_page(application, cursor=None, page_size=20):
+    """Return (events, next cursor or None) for one page, newest first."""
+    position = decode_cursor(cursor) if cursor else None
+    streams = [
+        _stream(rank, time_field, queryset, formatter, position, page_size + 1)
+        for rank, time_field, queryset, formatter in _sources(application)
+    ]
+    merged = heapq.merge(*streams, key=lambda event: event.key, reverse=True)
+    events = list(islice(merged, page_size + 1))
+    next_cursor = encode_cursor(events[page_size - 1]) if len(events) > page_size else None
+    return events[:page_size], next_cursor
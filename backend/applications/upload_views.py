@@ -0,0 +1,253 @@
+"""Chunked, resumable document uploads.
+
+Protocol:
+    POST   documents/uploads/                      {application, document_type, filename, size}
+    GET    documents/uploads/<id>/                 -> progress, for resuming
+    PUT    documents/uploads/<id>/chunk/?offset=N  raw bytes appended at N
+    POST   documents/uploads/<id>/complete/        {sha256 (optional)} -> ApplicationDocument
+    DELETE documents/uploads/<id>/                 abort
+
+Chunk bodies are streamed from the request straight into a temporary file,
+never through ``request.body`` or ``request.FILES``, so the 5 MB in-memory
+upload limits do not apply and memory use stays at one read buffer.
+"""
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from documents import pipeline
+from documents.models import DocumentBlob
+from programs.models import RequiredDocument
+from .models import Application, ApplicationDocument, DocumentUploadSession
+from .serializers import ApplicationDocumentSerializer
+
+READ_BLOCK_SIZE = 64 * 1024
+
+
+class _CompletedUpload(File):
+    """Lets FileSystemStorage move the finished temp file into place instead of copying it."""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+    @property
+    def size(self):
+        return os.path.getsize(self.file.name)
+
+
+def _max_bytes(document_type):
+    return document_type.max_file_size_mb * 1024 * 1024
+
+
+def _allowed_formats(document_type):
+    return [fmt.strip().lower().lstrip('.') for fmt in document_type.allowed_formats.split(',') if fmt.strip()]
+
+
+def _session_payload(session):
+    return {
+        'id': str(session.id),
+        'application': str(session.application_id),
+        'document_type': session.document_type_id,
+        'filename': session.original_filename,
+        'total_size': session.total_size,
+        'received_bytes': session.received_bytes,
+        'chunk_size': settings.CHUNKED_UPLOAD_CHUNK_SIZE,
+        'max_chunk_size': settings.CHUNKED_UPLOAD_MAX_CHUNK_SIZE,
+    }
+
+
+def _get_session(request, pk, lock=False):
+    sessions = DocumentUploadSession.objects.select_related('application', 'document_type')
+    if lock:
+        # Chunk writes and completion of one session run one at a time
+        sessions = sessions.select_for_update(of=('self',))
+    try:
+        return sessions.get(pk=pk, application__user=request.user)
+    except DocumentUploadSession.DoesNotExist:
+        return None
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(READ_BLOCK_SIZE * 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def start_upload(request):
+    """Open an upload session after checking type, format and declared size."""
+    application_id = request.data.get('application')
+    document_type_id = request.data.get('document_type')
+    filename = os.path.basename(str(request.data.get('filename', '')))
+    try:
+        size = int(request.data.get('size'))
+    except (TypeError, ValueError):
+        return Response({'size': ['The total file size in bytes is required.']}, status=400)
+
+    if not application_id:
+        return Response({'application': ['This field is required.']}, status=400)
+    if not document_type_id:
+        return Response({'document_type': ['This field is required.']}, status=400)
+    if not filename:
+        return Response({'filename': ['This field is required.']}, status=400)
+
+    try:
+        application = Application.objects.get(id=application_id, user=request.user)
+    except (Application.DoesNotExist, ValueError, TypeError):
+        return Response({'error': 'Application not found'}, status=404)
+    if application.status != 'draft':
+        return Response({'error': 'Documents cannot be uploaded after submission'}, status=400)
+
+    try:
+        document_type = RequiredDocument.objects.get(id=document_type_id, program_id=application.program_id)
+    except (RequiredDocument.DoesNotExist, ValueError, TypeError):
+        return Response({'document_type': ['Invalid document type for this program.']}, status=400)
+
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension not in _allowed_formats(document_type):
+        return Response(
+            {'filename': [f'Allowed formats: {document_type.allowed_formats}']}, status=400
+        )
+    if size <= 0 or size > _max_bytes(document_type):
+        return Response(
+            {'size': [f'File must be between 1 byte and {document_type.max_file_size_mb} MB.']},
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE if size > 0 else 400,
+        )
+    if ApplicationDocument.objects.filter(application=application, document_type=document_type).exists():
+        return Response({'error': 'This document has already been uploaded'}, status=400)
+
+    session = DocumentUploadSession.objects.create(
+        application=application,
+        document_type=document_type,
+        original_filename=filename,
+        total_size=size,
+    )
+    os.makedirs(settings.CHUNKED_UPLOAD_DIR, exist_ok=True)
+    open(session.temp_path, 'wb').close()
+    return Response(_session_payload(session), status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([permissions.IsAuthenticated])
+def upload_session(request, pk):
+    """Report progress of an upload (to resume it) or abort it."""
+    session = _get_session(request, pk)
+    if session is None:
+        return Response({'error': 'Upload not found'}, status=404)
+    if request.method == 'DELETE':
+        session.discard()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response(_session_payload(session))
+
+
+@api_view(['PUT'])
+@permission_classes([permissions.IsAuthenticated])
+@transaction.atomic
+def upload_chunk(request, pk):
+    """Append the raw request body at ``?offset=``, which must equal the bytes received so far."""
+    session = _get_session(request, pk, lock=True)
+    if session is None:
+        return Response({'error': 'Upload not found'}, status=404)
+
+    try:
+        offset = int(request.query_params.get('offset', session.received_bytes))
+    except ValueError:
+        return Response({'offset': ['Must be an integer.']}, status=400)
+    if offset != session.received_bytes:
+        # The client lost track (e.g. a dropped connection); tell it where to resume
+        return Response(
+            {'error': 'Unexpected offset', 'received_bytes': session.received_bytes},
+            status=status.HTTP_409_CONFLICT,
+        )
+
+    max_chunk = settings.CHUNKED_UPLOAD_MAX_CHUNK_SIZE
+    limit = session.total_size
+    written = 0
+
+    with open(session.temp_path, 'r+b') as handle:
+        handle.seek(offset)
+        handle.truncate()  # drop any tail left behind by an interrupted chunk
+        while True:
+            block = request.stream.read(READ_BLOCK_SIZE) if request.stream else b''
+            if not block:
+                break
+            written += len(block)
+            if written > max_chunk or offset + written > limit:
+                handle.truncate(offset)
+                return Response(
+                    {'error': 'Chunk exceeds the declared file size or the maximum chunk size',
+                     'received_bytes': offset},
+                    status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                )
+            handle.write(block)
+
+    # Only advance if no concurrent request already moved the session on
+    # (the row lock rules that out where the database supports it)
+    updated = DocumentUploadSession.objects.filter(pk=session.pk, received_bytes=offset).update(
+        received_bytes=offset + written, updated_at=timezone.now()
+    )
+    if not updated:
+        session.refresh_from_db(fields=['received_bytes'])
+        return Response(
+            {'error': 'Concurrent chunk upload', 'received_bytes': session.received_bytes},
+            status=status.HTTP_409_CONFLICT,
+        )
+    return Response({'received_bytes': offset + written, 'total_size': session.total_size})
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+@transaction.atomic
+def complete_upload(request, pk):
+    """Turn a fully received upload into an ApplicationDocument."""
+    if _get_session(request, pk) is None:
+        return Response({'error': 'Upload not found'}, status=404)
+    # A completed upload's session is deleted, so of two concurrent completes
+    # the one that waited for the lock finds nothing
+    session = _get_session(request, pk, lock=True)
+    if session is None:
+        return Response({'error': 'Upload already completed'}, status=status.HTTP_409_CONFLICT)
+    if session.received_bytes != session.total_size:
+        return Response(
+            {'error': 'Upload is incomplete', 'received_bytes': session.received_bytes},
+            status=400,
+        )
+    if session.application.status != 'draft':
+        return Response({'error': 'Documents cannot be uploaded after submission'}, status=400)
+
+    # Hashed from the assembled file: chunks may have been served by
+    # different workers, and no per-session state outlives a request
+    sha256 = _file_sha256(session.temp_path)
+    expected = request.data.get('sha256')
+    if expected and expected.lower() != sha256:
+        return Response({'error': 'Checksum mismatch', 'sha256': sha256}, status=400)
+
+    with transaction.atomic():
+        with open(session.temp_path, 'rb') as handle:
+            content = _CompletedUpload(handle, name=session.original_filename)
+            blob = DocumentBlob.objects.store(content, sha256=sha256)
+        document = ApplicationDocument.objects.create(
+            application=session.application,
+            document_type=session.document_type,
+            file=blob.file.name,
+            blob=blob,
+            original_filename=session.original_filename,
+            file_size=session.total_size,
+        )
+        session.application.refresh_document_counts()
+        session.discard()
+        pipeline.schedule(document)
+
+    data = ApplicationDocumentSerializer(document, context={'request': request}).data
+    data['sha256'] = sha256
+    return Response(data, status=status.HTTP_201_CREATED)
@@ -1,13 +1,23 @@
 from django.urls import path
-from . import views
+from . import views, upload_views
 
 urlpatterns = [
     path('', views.ApplicationListView.as_view(), name='application-list'),
+    path('search/', views.ApplicationSearchView.as_view(), name='application-search'),
     path('create/', views.ApplicationCreateView.as_view(), name='application-create'),
     path('<uuid:pk>/', views.ApplicationDetailView.as_view(), name='application-detail'),
     path('<uuid:pk>/submit/', views.ApplicationSubmitView.as_view(), name='application-submit'),
     path('<uuid:pk>/status/', views.update_application_status, name='application-status-update'),
+    path('<uuid:pk>/timeline/', views.application_timeline, name='application-timeline'),
+    path('status/bulk/', views.bulk_update_application_status, name='application-status-bulk-update'),
+    path('merit/<int:program_id>/', views.merit_ranking, name='application-merit-ranking'),
+    path('export/<str:export_format>/', views.export_applications, name='application-export'),
     path('documents/upload/', views.DocumentUploadView.as_view(), name='document-upload'),
+    path('documents/uploads/', upload_views.start_upload, name='document-upload-start'),
+    path('documents/uploads/<uuid:pk>/', upload_views.upload_session, name='document-upload-session'),
+    path('documents/uploads/<uuid:pk>/chunk/', upload_views.upload_chunk, name='document-upload-chunk'),
+    path('documents/uploads/<uuid:pk>/complete/', upload_views.complete_upload, name='document-upload-complete'),
      path('documents/<int:pk>/verify/', views.verify_document, name='document-verify'),
+    path('documents/verify/bulk/', views.bulk_verify_documents, name='document-verify-bulk'),
     path('has-applied/<int:program_id>/', views.has_applied, name='application-has-applied'),
 ]
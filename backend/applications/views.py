@@ -1,24 +1,63 @@
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.utils.urls import replace_query_param
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import Prefetch, Subquery
 import logging
+import math
+import uuid
+from college_portal.pagination import CursorPaginationMixin
+from documents import pipeline
+from documents.models import DocumentBlob
+from programs.models import Program
+from . import merit, timeline
+from .exports import EXPORT_FORMATS, export_queryset, stream_export
 from .models import Application, ApplicationDocument, ApplicationStatusHistory
-from .serializers import ApplicationSerializer, ApplicationListSerializer, ApplicationDocumentSerializer
+from .search import SearchResults
+from .serializers import (
+    ApplicationSerializer, ApplicationListSerializer, ApplicationDocumentSerializer, ApplicationSearchSerializer
+)
 
-class ApplicationListView(generics.ListAPIView):
+class ApplicationListView(CursorPaginationMixin, generics.ListAPIView):
     serializer_class = ApplicationListSerializer
     permission_classes = [permissions.IsAuthenticated]
+    filterset_fields = ['status', 'program', 'documents_complete']
     
     def get_queryset(self):
         user = self.request.user
         if user.role == 'applicant':
-            return Application.objects.filter(user=user)
+            queryset = Application.objects.filter(user=user)
         elif user.role in ['admin', 'admission_officer']:
-            return Application.objects.all()
-        return Application.objects.none()
+            queryset = Application.objects.all()
+        else:
+            return Application.objects.none()
+
+        # Everything the list serializer reads is computed in the page query itself
+        # so the cost of a page does not grow with the number of rows on it.
+        return queryset.for_listing()
+
+class ApplicationSearchView(generics.ListAPIView):
+    """Ranked full-text search over applications (Admin/Officer only).
+    Query: ?q=<text>; quoted phrases are matched as phrases.
+    """
+    serializer_class = ApplicationSearchSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = []
+
+    def get_queryset(self):
+        if self.request.user.role not in ['admin', 'admission_officer']:
+            from rest_framework.exceptions import PermissionDenied
+            raise PermissionDenied("Only admission staff can search applications")
+        query = self.request.query_params.get('q', '').strip()
+        if not query:
+            from rest_framework.exceptions import ValidationError
+            raise ValidationError({'q': ['A search query is required.']})
+        return SearchResults(query, Application.objects.for_listing())
 
 class ApplicationCreateView(generics.CreateAPIView):
     queryset = Application.objects.all()
@@ -38,50 +77,78 @@ class ApplicationDetailView(generics.RetrieveUpdateAPIView):
     def get_queryset(self):
         user = self.request.user
         if user.role == 'applicant':
-            return Application.objects.filter(user=user)
+            queryset = Application.objects.filter(user=user)
         elif user.role in ['admin', 'admission_officer']:
-            return Application.objects.all()
-        return Application.objects.none()
+            queryset = Application.objects.all()
+        else:
+            return Application.objects.none()
+
+        # One query per relation regardless of how many documents or history
+        # rows the application has.
+        return queryset.select_related('user', 'program__department').prefetch_related(
+            Prefetch('documents', queryset=ApplicationDocument.objects.select_related('document_type')),
+            Prefetch('status_history', queryset=ApplicationStatusHistory.objects.select_related('changed_by')),
+        )
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            # Holding the row lock orders the edit against a submit: either the
+            # submit committed first and the edit is refused, or it waits
+            if self.request.user.role == 'applicant' and not Application.objects.select_for_update().filter(
+                pk=serializer.instance.pk, status='draft'
+            ).exists():
+                raise ValidationError({'status': ['Only draft applications can be edited.']})
+            serializer.save()
 
 class ApplicationSubmitView(generics.UpdateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def patch(self, request, pk):
-        try:
-            application = Application.objects.get(pk=pk, user=request.user)
-            
-            if application.status != 'draft':
-                return Response(
-                    {'error': 'Application has already been submitted'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            if not application.is_complete:
-                return Response(
-                    {'error': 'Please upload all required documents before submitting'}, 
-                    status=status.HTTP_400_BAD_REQUEST
+        now = timezone.now()
+        with transaction.atomic():
+            # Check and transition in one statement: of two concurrent submits
+            # only one matches status='draft', the other updates nothing.
+            submitted = Application.objects.filter(
+                pk=pk, user=request.user, status='draft', documents_complete=True
+            ).update(status='submitted', submitted_at=now, updated_at=now)
+
+            if submitted:
+                program = Program.objects.filter(
+                    pk=Subquery(Application.objects.filter(pk=pk).values('program_id')[:1])
                 )
-            
-            with transaction.atomic():
-                # Update application status
-                old_status = application.status
-                application.status = 'submitted'
-                application.submitted_at = timezone.now()
-                application.save()
-                
-                # Create status history
+                if not program.reserve_seat():
+                    transaction.set_rollback(True)
+                    return Response(
+                        {'error': 'No seats available for this program'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
                 ApplicationStatusHistory.objects.create(
-                    application=application,
-                    previous_status=old_status,
+                    application_id=pk,
+                    previous_status='draft',
                     new_status='submitted',
                     changed_by=request.user,
                     change_reason='Application submitted by applicant'
                 )
-            
-            return Response({'message': 'Application submitted successfully'})
-            
-        except Application.DoesNotExist:
+                return Response({'message': 'Application submitted successfully'})
+
+        # Nothing matched; one read tells the client why
+        current = Application.objects.filter(pk=pk, user=request.user).values('status', 'documents_complete').first()
+        if current is None:
             return Response({'error': 'Application not found'}, status=404)
+        if current['status'] != 'draft':
+            return Response(
+                {'error': 'Application has already been submitted'},
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response(
+            {'error': 'Please upload all required documents before submitting'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+def _parse_verified(value):
+    if isinstance(value, str):
+        return value.lower() in ['true', '1', 'yes']
+    return value
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
@@ -97,18 +164,16 @@ def verify_document(request, pk: int):
     except ApplicationDocument.DoesNotExist:
         return Response({'error': 'Document not found'}, status=404)
 
-    verified = request.data.get('verified')
+    verified = _parse_verified(request.data.get('verified'))
     notes = request.data.get('notes', '')
 
-    if isinstance(verified, str):
-        verified = verified.lower() in ['true', '1', 'yes']
-
     if verified is None:
         return Response({'verified': ['This field is required.']}, status=status.HTTP_400_BAD_REQUEST)
 
     doc.verified = bool(verified)
     doc.verification_notes = notes
-    doc.save(update_fields=['verified', 'verification_notes'])
+    doc.verified_at = timezone.now()
+    doc.save(update_fields=['verified', 'verification_notes', 'verified_at'])
 
     # Return updated document data
     serializer = ApplicationDocumentSerializer(doc, context={'request': request})
@@ -189,11 +254,19 @@ class DocumentUploadView(generics.CreateAPIView):
                 # In case of unexpected state; let serializer raise if required FK missing
                 application = None
 
-        serializer.save(
-            application=application,
-            original_filename=file_obj.name,
-            file_size=file_obj.size
-        )
+        with transaction.atomic():
+            blob = DocumentBlob.objects.store(file_obj)
+            document = serializer.save(
+                application=application,
+                file=blob.file.name,
+                blob=blob,
+                original_filename=file_obj.name,
+                file_size=file_obj.size
+            )
+            if application is not None:
+                application.refresh_document_counts()
+            # Type checks, page count and thumbnails run after commit, off the request path
+            pipeline.schedule(document)
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
@@ -206,7 +279,6 @@ def update_application_status(request, pk):
         )
     
     try:
-        application = Application.objects.get(pk=pk)
         new_status = request.data.get('status')
         reason = request.data.get('reason', '')
         
@@ -214,11 +286,16 @@ def update_application_status(request, pk):
             return Response({'error': 'Invalid status'}, status=400)
         
         with transaction.atomic():
+            application = Application.objects.select_for_update().get(pk=pk)
             old_status = application.status
             application.status = new_status
             application.reviewed_by = request.user
             application.review_notes = reason
             application.save()
+
+            Program.objects.filter(pk=application.program_id).adjust_occupied_seats(
+                Program.seat_delta(old_status, new_status)
+            )
             
             # Create status history
             ApplicationStatusHistory.objects.create(
@@ -233,3 +310,223 @@ def update_application_status(request, pk):
         
     except Application.DoesNotExist:
         return Response({'error': 'Application not found'}, status=404)
+
+
+TIMELINE_PAGE_SIZE = 20
+TIMELINE_MAX_PAGE_SIZE = 100
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def application_timeline(request, pk):
+    """Status changes, document uploads/verifications and messages of one application, newest first.
+    Query params: ?cursor=<next cursor from the previous page>&page_size=<n>
+    """
+    applications = Application.objects.all()
+    if request.user.role not in ['admin', 'admission_officer']:
+        applications = applications.filter(user=request.user)
+    application = applications.filter(pk=pk).only('pk').first()
+    if application is None:
+        return Response({'error': 'Application not found'}, status=404)
+
+    try:
+        page_size = min(max(int(request.query_params.get('page_size', TIMELINE_PAGE_SIZE)), 1), TIMELINE_MAX_PAGE_SIZE)
+    except ValueError:
+        return Response({'page_size': ['Must be an integer.']}, status=400)
+    try:
+        events, next_cursor = timeline.timeline_page(application, request.query_params.get('cursor'), page_size)
+    except timeline.InvalidCursor:
+        return Response({'cursor': ['Invalid cursor.']}, status=400)
+
+    return Response({
+        'next': replace_query_param(request.build_absolute_uri(), 'cursor', next_cursor) if next_cursor else None,
+        'results': [
+            {'id': event.id, 'timestamp': event.timestamp, **event.data} for event in events
+        ],
+    })
+
+
+BULK_STATUS_LIMIT = 1000
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_update_application_status(request):
+    """Move many applications to one status (Admin/Officer only).
+    Expected payload: { "ids": [uuid, ...], "status": "shortlisted", "reason": "optional text" }
+    """
+    if request.user.role not in ['admin', 'admission_officer']:
+        return Response(
+            {'error': 'Permission denied'}, 
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    ids = request.data.get('ids')
+    new_status = request.data.get('status')
+    reason = request.data.get('reason', '')
+
+    if not isinstance(ids, list) or not ids:
+        return Response({'ids': ['A non-empty list of application ids is required.']}, status=400)
+    if len(ids) > BULK_STATUS_LIMIT:
+        return Response({'ids': [f'At most {BULK_STATUS_LIMIT} applications per request.']}, status=400)
+    if new_status not in dict(Application.APPLICATION_STATUS):
+        return Response({'error': 'Invalid status'}, status=400)
+
+    outcomes = {}
+    valid_ids = []
+    for raw_id in ids:
+        try:
+            valid_ids.append(uuid.UUID(str(raw_id)))
+            outcomes[str(valid_ids[-1])] = 'not_found'
+        except ValueError:
+            outcomes[str(raw_id)] = 'invalid'
+
+    applications = Application.objects.filter(pk__in=valid_ids)
+    with transaction.atomic():
+        for pk in applications.values_list('pk', flat=True):
+            outcomes[str(pk)] = 'unchanged'
+        changed = applications.change_status(new_status, request.user, reason)
+    for application in changed:
+        outcomes[str(application.pk)] = 'updated'
+
+    return Response({
+        'updated': len(changed),
+        'results': [{'id': pk, 'outcome': outcome} for pk, outcome in outcomes.items()],
+    })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def export_applications(request, export_format):
+    """Stream applications as CSV or NDJSON (Admin only).
+    Optional query params: ?program=<id>&status=<status>
+    """
+    if request.user.role != 'admin':
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    if export_format not in EXPORT_FORMATS:
+        return Response({'error': 'Unsupported export format'}, status=400)
+
+    program_id = request.query_params.get('program')
+    if program_id is not None and not program_id.isdigit():
+        return Response({'program': ['A valid program id is required.']}, status=400)
+
+    queryset = export_queryset(program_id=program_id, status=request.query_params.get('status'))
+    response = StreamingHttpResponse(
+        stream_export(export_format, queryset),
+        content_type=EXPORT_FORMATS[export_format],
+    )
+    suffix = f'-program-{program_id}' if program_id else ''
+    response['Content-Disposition'] = f'attachment; filename="applications{suffix}.{export_format}"'
+    return response
+
+
+BULK_VERIFY_LIMIT = 1000
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_verify_documents(request):
+    """Verify or reject many documents at once (Admin/Officer only).
+    Expected payload: { "documents": [{"id": 1, "verified": true, "notes": "optional text"}, ...] }
+    """
+    if request.user.role not in ['admin', 'admission_officer']:
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+    entries = request.data.get('documents')
+    if not isinstance(entries, list) or not entries:
+        return Response({'documents': ['A non-empty list of documents is required.']}, status=400)
+    if len(entries) > BULK_VERIFY_LIMIT:
+        return Response({'documents': [f'At most {BULK_VERIFY_LIMIT} documents per request.']}, status=400)
+
+    outcomes = {}
+    decisions = {}  # id -> (verified, notes); a repeated id keeps its last entry
+    for entry in entries:
+        raw_id = entry.get('id') if isinstance(entry, dict) else entry
+        verified = _parse_verified(entry.get('verified')) if isinstance(entry, dict) else None
+        notes = entry.get('notes', '') if isinstance(entry, dict) else ''
+        try:
+            pk = int(raw_id)
+        except (TypeError, ValueError):
+            outcomes[str(raw_id)] = 'invalid'
+            continue
+        if verified is None or not isinstance(notes, str):
+            outcomes[str(pk)] = 'invalid'
+            decisions.pop(pk, None)
+            continue
+        decisions[pk] = (bool(verified), notes)
+        outcomes[str(pk)] = 'not_found'
+
+    with transaction.atomic():
+        documents = list(
+            ApplicationDocument.objects.select_for_update()
+            .filter(pk__in=decisions)
+            .only('id', 'application_id', 'verified', 'verification_notes')
+        )
+        now = timezone.now()
+        application_ids = {document.application_id for document in documents}
+        applications = Application.objects.filter(pk__in=application_ids)
+        already_verified = set(applications.fully_verified().values_list('pk', flat=True))
+
+        changed = []
+        for document in documents:
+            verified, notes = decisions[document.pk]
+            if (document.verified, document.verification_notes) == (verified, notes):
+                outcomes[str(document.pk)] = 'unchanged'
+                continue
+            document.verified, document.verification_notes = verified, notes
+            document.verified_at = now
+            changed.append(document)
+            outcomes[str(document.pk)] = 'updated'
+        ApplicationDocument.objects.bulk_update(changed, ['verified', 'verification_notes', 'verified_at'])
+
+        now_verified = set(applications.fully_verified().values_list('pk', flat=True)) if changed else already_verified
+
+    return Response({
+        'updated': len(changed),
+        'results': [{'id': pk, 'outcome': outcome} for pk, outcome in outcomes.items()],
+        'fully_verified': sorted(str(pk) for pk in now_verified - already_verified),
+    })
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([permissions.IsAuthenticated])
+def merit_ranking(request, program_id):
+    """Rank a program's applicants by merit (Admin only).
+    GET previews the ranking (?limit=<n>, default 100); POST applies the shortlist.
+    Optional payload/query: { "factor": 1.5, "reason": "optional text" }
+    """
+    if request.user.role != 'admin':
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+    try:
+        program = Program.objects.get(pk=program_id)
+    except Program.DoesNotExist:
+        return Response({'error': 'Program not found'}, status=404)
+
+    params = request.data if request.method == 'POST' else request.query_params
+    try:
+        factor = float(params['factor']) if params.get('factor') not in (None, '') else None
+        limit = int(request.query_params.get('limit', 100))
+    except (TypeError, ValueError):
+        return Response({'error': 'factor and limit must be numbers'}, status=400)
+    if factor is not None and not (math.isfinite(factor) and factor >= 0):
+        return Response({'error': 'factor must be a non-negative number'}, status=400)
+    if limit < 1:
+        return Response({'error': 'limit must be at least 1'}, status=400)
+
+    ranking = merit.rank_program(program, factor=factor)
+    payload = {
+        'program': program.id,
+        'pool_size': len(ranking.ids),
+        'shortlist_size': ranking.shortlist_size,
+    }
+
+    if request.method == 'POST':
+        changed = merit.apply_shortlist(
+            ranking, request.user, params.get('reason') or 'Shortlisted by merit ranking'
+        )
+        payload['shortlisted'] = len(changed)
+        return Response(payload)
+
+    payload['ranking'] = [
+        {'rank': position + 1, 'id': str(pk), 'score': round(float(score), 4)}
+        for position, (pk, score) in enumerate(zip(ranking.ids[:limit], ranking.scores[:limit]))
+    ]
+    return Response(payload)
@@ -5,10 +5,11 @@ from django.contrib.auth import get_user_model
 from django.db.models import Q
 from .models import User, UserProfile
 from .serializers import UserSerializer, UserRegistrationSerializer
+from college_portal.pagination import CursorPaginationMixin
 
 User = get_user_model()
 
-class UserListView(generics.ListAPIView):
+class UserListView(CursorPaginationMixin, generics.ListAPIView):
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
     
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 from decouple import config
 from datetime import timedelta
@@ -58,6 +59,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'dashboard.middleware.RequestMetricsMiddleware',
      'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -162,6 +164,51 @@ REST_FRAMEWORK = {
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5 * 1024 * 1024  # 5 MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5 * 1024 * 1024  # 5 MB
 
+# Chunked (resumable) document uploads: partial files are appended here until completed
+CHUNKED_UPLOAD_DIR = config('CHUNKED_UPLOAD_DIR', default=os.path.join(tempfile.gettempdir(), 'college_portal_uploads'))
+CHUNKED_UPLOAD_CHUNK_SIZE = 1 * 1024 * 1024  # suggested to clients, 1 MB
+CHUNKED_UPLOAD_MAX_CHUNK_SIZE = 8 * 1024 * 1024  # 8 MB
+
+# Post-upload document processing (type sniffing, page count, recompression, thumbnails).
+# Runs in a process pool after the upload commits; EAGER runs it inline instead.
+DOCUMENT_PIPELINE_ENABLED = config('DOCUMENT_PIPELINE_ENABLED', default=True, cast=bool)
+DOCUMENT_PIPELINE_EAGER = config('DOCUMENT_PIPELINE_EAGER', default=False, cast=bool)
+DOCUMENT_PIPELINE_WORKERS = config('DOCUMENT_PIPELINE_WORKERS', default=2, cast=int)
+DOCUMENT_RECOMPRESS_THRESHOLD = 1536 * 1024  # images above 1.5 MB are re-encoded
+DOCUMENT_MAX_IMAGE_DIMENSION = 2480  # A4 at 300 dpi
+DOCUMENT_THUMBNAIL_SIZE = 256
+
+# Authenticated downloads. Set the backend to 'nginx' (X-Accel-Redirect to an internal
+# location serving MEDIA_ROOT at DOCUMENT_SENDFILE_URL) or 'sendfile' (X-Sendfile, Apache/
+# lighttpd) to let the front proxy do the transfer; empty streams from Django.
+DOCUMENT_SENDFILE_BACKEND = config('DOCUMENT_SENDFILE_BACKEND', default='')
+DOCUMENT_SENDFILE_URL = config('DOCUMENT_SENDFILE_URL', default='/protected-media/')
+DOCUMENT_DOWNLOAD_MAX_AGE = 3600  # seconds; responses are private to the requesting user
+
+# Shared by all workers of a host by default; point CACHE_BACKEND/CACHE_LOCATION at
+# Redis or memcached when the app runs on more than one host.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': config('CACHE_LOCATION', default=os.path.join(tempfile.gettempdir(), 'college_portal_cache')),
+    }
+}
+# Upper bound on how long a version of a public catalog response is kept (seconds)
+CATALOG_CACHE_TIMEOUT = 3600
+
+# Per-endpoint request metrics, shared by all workers of a host through a SQLite file and
+# exposed to admins at /api/dashboard/metrics/ in the Prometheus text format.
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_DB = config('METRICS_DB', default=os.path.join(tempfile.gettempdir(), 'college_portal_metrics.sqlite3'))
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=5.0, cast=float)  # seconds
+# Opt-in profiling: this fraction of requests runs under cProfile, and profiles of the
+# ones slower than METRICS_PROFILE_SLOW_MS are written to METRICS_PROFILE_DIR.
+METRICS_PROFILE_SAMPLE_RATE = config('METRICS_PROFILE_SAMPLE_RATE', default=0.0, cast=float)
+METRICS_PROFILE_SLOW_MS = config('METRICS_PROFILE_SLOW_MS', default=500, cast=int)
+METRICS_PROFILE_DIR = config('METRICS_PROFILE_DIR', default=os.path.join(tempfile.gettempdir(), 'college_portal_profiles'))
+
+TEST_RUNNER = 'college_portal.test_runner.TestRunner'
+
 
 # JWT Settings
 SIMPLE_JWT = {
@@ -0,0 +1,30 @@
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'college_portal_tests',
+    }
+}
+
+
+class TestRunner(DiscoverRunner):
+    """Keep test runs off the state a developer's server shares through the temp directory.
+
+    The default file-based cache would carry catalog entries from one run
+    into the next (and ``cache.clear()`` in a test would empty the server's),
+    so tests get a per-process LocMemCache. Request metrics are recorded (and
+    flushed at exit) to a SQLite file every worker of the host writes to;
+    tests that exercise them point ``METRICS_DB`` at a scratch file and turn
+    them back on.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._test_settings = override_settings(CACHES=TEST_CACHES, METRICS_ENABLED=False)
+        self._test_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._test_settings.disable()
+        super().teardown_test_environment(**kwargs)
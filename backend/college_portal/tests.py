@@ -0,0 +1,363 @@
+"""Per-endpoint SQL query budgets.
+
+Seeds a realistic dataset, calls every route of the applications, programs,
+messaging and authentication URLconfs as the role that uses it, and fails
+when an endpoint runs more queries (or spends more time in SQL) than its
+declared budget. List endpoints are exercised with many rows, so an N+1 in
+a serializer shows up as a blown budget rather than as a slow deploy.
+
+When an endpoint legitimately needs more queries, raise its budget in the
+same change and say why in review. New routes must declare a budget.
+"""
+import shutil
+from datetime import date, timedelta
+from typing import NamedTuple
+from unittest import mock
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, get_resolver, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from applications.models import Application, ApplicationDocument, ApplicationStatusHistory
+from authentication.models import OTP, User
+from messaging.models import Conversation, Message
+from programs.models import Department, Program, RequiredDocument
+
+TEST_MEDIA_ROOT = '/tmp/college_portal_test_media'
+PASSWORD = 'Budget-Passw0rd!'
+DEFAULT_SQL_MS = 250.0  # generous; catches pathological queries, not jitter
+BUDGETED_URLCONFS = ['applications.urls', 'programs.urls', 'messaging.urls', 'authentication.urls']
+
+
+class Budget(NamedTuple):
+    queries: int
+    sql_ms: float = DEFAULT_SQL_MS
+
+
+# (url name, method) -> budget. Counts include the savepoint/release pair
+# that atomic blocks issue inside a test transaction.
+BUDGETS = {
+    # authentication
+    ('register', 'POST'): Budget(4),
+    ('login', 'POST'): Budget(1),
+    ('verify-email', 'POST'): Budget(4),
+    ('resend-otp', 'POST'): Budget(2),
+    ('admin-login', 'POST'): Budget(1),
+    ('officer-login', 'POST'): Budget(1),
+    ('profile', 'GET'): Budget(0),
+    ('token_refresh', 'POST'): Budget(1),
+    ('admin-user-list', 'GET'): Budget(2),
+    ('admin-user-create', 'POST'): Budget(3),
+    ('admin-user-detail', 'GET'): Budget(1),
+    ('admin-user-toggle', 'POST'): Budget(5),
+    ('admin-user-verify', 'POST'): Budget(2),
+    ('admin-user-statistics', 'GET'): Budget(5),
+    # programs
+    # Catalog reads are measured on a cache miss, which adds the application-window lookup
+    ('department-list', 'GET'): Budget(3),
+    ('program-list', 'GET'): Budget(4),  # with ?search=, one extra query on the text index
+    ('program-autocomplete', 'GET'): Budget(2),
+    ('program-eligibility', 'GET'): Budget(1),  # builds the in-memory index; warm lookups run none
+    # Program and department writes also maintain the search index
+    ('program-create', 'POST'): Budget(9),
+    ('program-detail', 'GET'): Budget(4),
+    ('program-update', 'PATCH'): Budget(7),
+    ('program-delete', 'DELETE'): Budget(10),
+    ('program-documents', 'GET'): Budget(3),
+    ('document-requirement-create', 'POST'): Budget(3),
+    ('document-requirement-update', 'PATCH'): Budget(3),
+    ('admin-department-create', 'POST'): Budget(2),
+    ('admin-department-update', 'PATCH'): Budget(5),
+    ('admin-department-delete', 'DELETE'): Budget(4),
+    ('admin-department-statistics', 'GET'): Budget(1),
+    # applications
+    ('application-list', 'GET'): Budget(2),
+    ('application-search', 'GET'): Budget(3),
+    ('application-create', 'POST'): Budget(11),
+    ('application-detail', 'GET'): Budget(3),
+    ('application-submit', 'PATCH'): Budget(5),
+    ('application-status-update', 'POST'): Budget(8),
+    ('application-timeline', 'GET'): Budget(6),
+    ('application-status-bulk-update', 'POST'): Budget(8),
+    ('application-merit-ranking', 'GET'): Budget(2),
+    ('application-export', 'GET'): Budget(1),
+    ('document-upload', 'POST'): Budget(15),
+    ('document-upload-start', 'POST'): Budget(4),
+    ('document-upload-session', 'GET'): Budget(1),
+    ('document-upload-chunk', 'PUT'): Budget(4),
+    ('document-upload-complete', 'POST'): Budget(16),
+    ('document-verify', 'POST'): Budget(3),
+    ('document-verify-bulk', 'POST'): Budget(6),
+    ('application-has-applied', 'GET'): Budget(1),
+    # messaging
+    ('conversation-list-create', 'GET'): Budget(4),
+    ('conversation-list-create', 'POST'): Budget(4),
+    ('conversation-detail', 'GET'): Budget(4),
+    ('message-list-create', 'GET'): Budget(4),
+    ('message-list-create', 'POST'): Budget(3),
+    ('mark-message-read', 'POST'): Budget(2),
+    ('messaging-stats', 'GET'): Budget(1),
+    ('available-applicants', 'GET'): Budget(1),
+}
+
+
+def _url_names(urlconf):
+    return {pattern.name for pattern in get_resolver(urlconf).url_patterns if isinstance(pattern, URLPattern)}
+
+
+@override_settings(
+    MEDIA_ROOT=TEST_MEDIA_ROOT,
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    DOCUMENT_PIPELINE_ENABLED=False,
+)
+class QueryBudgetTests(TestCase):
+    APPLICANTS = 30
+    PROGRAMS_PER_DEPARTMENT = 3
+    DEPARTMENTS = 4
+    CONVERSATIONS = 8
+    MESSAGES_PER_CONVERSATION = 6
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        password = make_password(PASSWORD)
+
+        def user(username, role, **fields):
+            return User.objects.create(
+                username=username, password=password, role=role, email=f'{username}@example.com',
+                first_name=username.title(), last_name='Tester', is_verified=True, **fields
+            )
+
+        cls.admin = user('admin', 'admin')
+        cls.officer = user('officer', 'admission_officer')
+        cls.departments = [
+            Department.objects.create(name=f'Department {d}', code=f'D{d}') for d in range(cls.DEPARTMENTS)
+        ]
+        cls.programs = []
+        for department in cls.departments:
+            for p in range(cls.PROGRAMS_PER_DEPARTMENT):
+                program = Program.objects.create(
+                    name=f'{department.name} Programme {p}', code=f'{department.code}P{p}', department=department,
+                    program_type='undergraduate', duration_years=4, duration_semesters=8,
+                    description='Programme', intake_capacity=100, fees_per_semester=50000, min_percentage=50,
+                    eligibility_criteria='12th', application_start_date=now - timedelta(days=5),
+                    application_end_date=now + timedelta(days=5),
+                )
+                RequiredDocument.objects.bulk_create([
+                    RequiredDocument(program=program, document_name='Marksheet'),
+                    RequiredDocument(program=program, document_name='Photograph'),
+                    RequiredDocument(program=program, document_name='Resume', is_mandatory=False),
+                ])
+                cls.programs.append(program)
+        cls.program = cls.programs[0]
+
+        cls.applicants, cls.applications = [], []
+        for index in range(cls.APPLICANTS):
+            applicant = user(f'applicant{index}', 'applicant')
+            program = cls.programs[index % len(cls.programs)]
+            application = Application.objects.create(
+                user=applicant, program=program, date_of_birth=date(2005, 1, 1), gender='female',
+                permanent_address='Somewhere', emergency_contact_name='Parent',
+                emergency_contact_phone='9999999999', emergency_contact_relation='Mother',
+                tenth_percentage=60 + index, tenth_board='CBSE', tenth_year=2021,
+                twelfth_percentage=55 + index, twelfth_board='CBSE', twelfth_year=2023,
+                status='submitted' if index % 2 else 'draft',
+            )
+            for document_type in program.required_documents.all()[:2]:
+                ApplicationDocument.objects.create(
+                    application=application, document_type=document_type,
+                    file=f'applications/{applicant.pk}/{application.pk}/{document_type.pk}.pdf',
+                    original_filename='scan.pdf', file_size=1024,
+                )
+            ApplicationStatusHistory.objects.create(
+                application=application, previous_status='draft', new_status=application.status,
+                changed_by=applicant,
+            )
+            cls.applicants.append(applicant)
+            cls.applications.append(application)
+        Application.objects.refresh_document_counts()
+
+        cls.conversations = []
+        for index in range(cls.CONVERSATIONS):
+            conversation = Conversation.objects.create(
+                officer=cls.officer, applicant=cls.applicants[index], application=cls.applications[index]
+            )
+            Message.objects.bulk_create([
+                Message(conversation=conversation, sender=cls.officer if m % 2 else cls.applicants[index],
+                        content=f'Message {m}')
+                for m in range(cls.MESSAGES_PER_CONVERSATION)
+            ])
+            cls.conversations.append(conversation)
+
+    def setUp(self):
+        cache.clear()  # catalog responses are cached across requests
+        self.client = APIClient()
+        self.results = []
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEST_MEDIA_ROOT, ignore_errors=True)
+
+    def call(self, name, method, user=None, args=(), data=None, query='', format='json', expect=None, **extra):
+        """Call one route, check its status and record queries and SQL time against its budget."""
+        self.client.force_authenticate(user)
+        url = reverse(name, args=args) + (f'?{query}' if query else '')
+        with CaptureQueriesContext(connection) as captured:
+            response = getattr(self.client, method.lower())(url, data, format=format, **extra)
+            if getattr(response, 'streaming', False):
+                b''.join(response.streaming_content)
+        if expect is not None:
+            self.assertEqual(response.status_code, expect, f'{method} {name}: {getattr(response, "data", "")}')
+        else:
+            self.assertLess(response.status_code, 300, f'{method} {name}: {getattr(response, "data", "")}')
+        sql_ms = sum(float(query['time']) for query in captured.captured_queries) * 1000
+        self.results.append((name, method, len(captured), sql_ms))
+        return response
+
+    def assert_within_budgets(self):
+        failures = []
+        for name, method, queries, sql_ms in self.results:
+            budget = BUDGETS[(name, method)]
+            if queries > budget.queries or sql_ms > budget.sql_ms:
+                failures.append(
+                    f'{method} {name}: {queries} queries / {sql_ms:.1f} ms '
+                    f'(budget {budget.queries} / {budget.sql_ms:.0f} ms)'
+                )
+        self.assertFalse(failures, 'Query budget exceeded:\n  ' + '\n  '.join(failures))
+
+    def test_every_route_declares_a_budget(self):
+        declared = {name for name, _ in BUDGETS}
+        for urlconf in BUDGETED_URLCONFS:
+            missing = _url_names(urlconf) - declared
+            self.assertFalse(missing, f'{urlconf} routes without a query budget: {sorted(missing)}')
+
+    @mock.patch('authentication.views.send_verification_email')
+    def test_authentication_budgets(self, send_email):
+        applicant = self.applicants[0]
+        self.call('register', 'POST', data={
+            'username': 'newcomer', 'email': 'newcomer@example.com', 'first_name': 'New', 'last_name': 'Comer',
+            'password': PASSWORD, 'password_confirm': PASSWORD,
+        }, expect=201)
+        otp = OTP.objects.filter(user__username='newcomer').latest('created_at')
+        self.call('verify-email', 'POST', data={'email': 'newcomer@example.com', 'otp': otp.otp})
+        self.call('resend-otp', 'POST', data={'email': 'newcomer@example.com'})
+        self.call('login', 'POST', data={'username': applicant.username, 'password': PASSWORD})
+        self.call('admin-login', 'POST', data={'username': 'admin', 'password': PASSWORD})
+        self.call('officer-login', 'POST', data={'username': 'officer', 'password': PASSWORD})
+        self.call('token_refresh', 'POST', data={'refresh': str(RefreshToken.for_user(applicant))})
+        self.call('profile', 'GET', applicant)
+        self.call('admin-user-list', 'GET', self.admin)
+        self.call('admin-user-create', 'POST', self.admin, data={
+            'username': 'officer2', 'email': 'officer2@example.com', 'first_name': 'Second', 'last_name': 'Officer',
+            'password': PASSWORD, 'password_confirm': PASSWORD, 'role': 'admission_officer',
+        }, expect=201)
+        self.call('admin-user-detail', 'GET', self.admin, args=[applicant.pk])
+        self.call('admin-user-toggle', 'POST', self.admin, args=[applicant.pk])
+        self.call('admin-user-verify', 'POST', self.admin, args=[applicant.pk], data={'is_verified': True})
+        self.call('admin-user-statistics', 'GET', self.admin)
+        self.assert_within_budgets()
+
+    def test_program_budgets(self):
+        department = self.departments[0]
+        self.call('department-list', 'GET')
+        self.call('program-list', 'GET')
+        self.call('program-list', 'GET', query='search=programme')
+        self.call('program-autocomplete', 'GET', query='q=depart')
+        self.call('program-eligibility', 'GET', query='twelfth=70')
+        self.call('program-detail', 'GET', args=[self.program.pk])
+        self.call('program-documents', 'GET', args=[self.program.pk])
+        response = self.call('program-create', 'POST', self.admin, data={
+            'name': 'New Programme', 'code': 'NEW1', 'department_id': department.pk,
+            'program_type': 'undergraduate', 'duration_years': 3, 'duration_semesters': 6,
+            'description': 'New', 'intake_capacity': 30, 'fees_per_semester': 1000, 'min_percentage': 40,
+            'eligibility_criteria': 'Any', 'application_start_date': timezone.now().isoformat(),
+            'application_end_date': (timezone.now() + timedelta(days=3)).isoformat(),
+        }, expect=201)
+        new_program = response.data['id']
+        self.call('program-update', 'PATCH', self.admin, args=[new_program], data={'intake_capacity': 40})
+        response = self.call('document-requirement-create', 'POST', self.admin, data={
+            'program': new_program, 'document_name': 'Transcript',
+        }, expect=201)
+        self.call('document-requirement-update', 'PATCH', self.admin, args=[response.data['id']], data={
+            'is_mandatory': False,
+        })
+        self.call('program-delete', 'DELETE', self.admin, args=[new_program])
+        response = self.call('admin-department-create', 'POST', self.admin, data={'name': 'Physics', 'code': 'PHY'})
+        self.call('admin-department-update', 'PATCH', self.admin, args=[response.data['id']], data={'name': 'Physics!'})
+        self.call('admin-department-delete', 'DELETE', self.admin, args=[response.data['id']])
+        self.call('admin-department-statistics', 'GET', self.admin)
+        self.assert_within_budgets()
+
+    def test_application_budgets(self):
+        draft = self.applications[0]
+        submitted = self.applications[1]
+        owner = draft.user
+        self.call('application-list', 'GET', self.officer)
+        self.call('application-search', 'GET', self.officer, query='q=applicant1')
+        self.call('application-detail', 'GET', self.officer, args=[submitted.pk])
+        self.call('application-timeline', 'GET', self.officer, args=[submitted.pk])
+        self.call('application-has-applied', 'GET', owner, args=[draft.program_id])
+        self.call('application-merit-ranking', 'GET', self.admin, args=[self.program.pk])
+        self.call('application-export', 'GET', self.admin, args=['csv'])
+        self.call('application-submit', 'PATCH', owner, args=[draft.pk])
+        self.call('application-status-update', 'POST', self.officer, args=[submitted.pk], data={
+            'status': 'under_review',
+        })
+        self.call('application-status-bulk-update', 'POST', self.officer, data={
+            'ids': [str(a.pk) for a in self.applications[1::2]], 'status': 'shortlisted',
+        })
+        documents = list(ApplicationDocument.objects.filter(application=submitted))
+        self.call('document-verify', 'POST', self.officer, args=[documents[0].pk], data={'verified': True})
+        self.call('document-verify-bulk', 'POST', self.officer, data={
+            'documents': [{'id': d.pk, 'verified': True} for d in ApplicationDocument.objects.all()[:50]],
+        })
+
+        newcomer = self.applicants[2]
+        newcomer.applications.all().delete()
+        response = self.call('application-create', 'POST', newcomer, data={
+            'program_id': self.program.pk, 'date_of_birth': '2005-01-01', 'gender': 'male',
+            'permanent_address': 'Here', 'emergency_contact_name': 'Parent',
+            'emergency_contact_phone': '9999999999', 'emergency_contact_relation': 'Father',
+            'tenth_percentage': 80, 'tenth_board': 'CBSE', 'tenth_year': 2021,
+        }, expect=201)
+        application_id = response.data['id']
+        marksheet, photo = self.program.required_documents.filter(is_mandatory=True)
+        self.call('document-upload', 'POST', newcomer, data={
+            'application': application_id, 'document_type': marksheet.pk,
+            'file': SimpleUploadedFile('marks.pdf', b'%PDF-1.4 marks'),
+        }, format='multipart', expect=201)
+        response = self.call('document-upload-start', 'POST', newcomer, data={
+            'application': application_id, 'document_type': photo.pk, 'filename': 'photo.pdf', 'size': 12,
+        }, expect=201)
+        session = response.data['id']
+        self.call('document-upload-chunk', 'PUT', newcomer, args=[session], data=b'%PDF-1.4 pic',
+                  format=None, content_type='application/octet-stream', query='offset=0')
+        self.call('document-upload-session', 'GET', newcomer, args=[session])
+        self.call('document-upload-complete', 'POST', newcomer, args=[session], expect=201)
+        self.assert_within_budgets()
+
+    def test_messaging_budgets(self):
+        conversation = self.conversations[0]
+        applicant = conversation.applicant
+        message = conversation.messages.filter(sender=self.officer).first()
+        self.call('conversation-list-create', 'GET', self.officer)
+        self.call('conversation-list-create', 'GET', applicant)
+        self.call('conversation-detail', 'GET', self.officer, args=[conversation.pk])
+        self.call('message-list-create', 'GET', applicant, args=[conversation.pk])
+        self.call('message-list-create', 'POST', applicant, args=[conversation.pk], data={'content': 'Thanks'},
+                  expect=201)
+        self.call('mark-message-read', 'POST', applicant, args=[message.pk])
+        self.call('messaging-stats', 'GET', self.officer)
+        self.call('available-applicants', 'GET', self.officer)
+        self.call('conversation-list-create', 'POST', self.officer, data={
+            'applicant_id': self.applicants[-1].pk, 'subject': 'Documents', 'initial_message': 'Hello',
+        }, expect=201)
+        self.assert_within_budgets()
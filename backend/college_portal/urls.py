@@ -25,4 +25,7 @@ urlpatterns = [
     path('api/programs/', include('programs.urls')),
     path('api/applications/', include('applications.urls')),
     path('api/messaging/', include('messaging.urls')),
+    path('api/dashboard/', include('dashboard.urls')),
+    # Authenticated downloads; the static() route below is only active with DEBUG
+    path('api/documents/', include('documents.urls')),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
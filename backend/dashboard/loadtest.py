@@ -0,0 +1,379 @@
+"""Deadline-rush load test for the admissions API.
+
+Virtual users are asyncio tasks, each holding one keep-alive HTTP/1.1
+connection to a running server (runserver, gunicorn, ...) and walking a
+scripted journey through the real URL routes:
+
+    applicant  login -> browse programs -> create application -> upload every
+               required document -> submit -> check own applications
+    officer    login, then loop: submitted queue -> search -> detail ->
+               timeline -> bulk-verify the documents
+    admin      login, then loop: merit preview -> CSV export -> statistics
+
+Latencies are recorded per (method, route pattern) and summarised as
+p50/p95/p99 and requests per second. Accounts and the program are seeded
+through the ORM (registration is not part of the measured journey), so the command must use the same database settings as the
+server under test (e.g. both with ``college_portal.production_settings`` and a
+Postgres ``DATABASE_URL``).
+"""
+import asyncio
+import json
+import math
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from urllib.parse import urlencode, urlsplit
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+
+from applications.models import Application
+from authentication.models import User
+from programs.models import Department, Program, RequiredDocument
+
+USER_PREFIX = 'loadtest-'
+PROGRAM_CODE = 'LOADTEST'
+PASSWORD = 'loadtest-password'
+
+
+class HttpError(Exception):
+    pass
+
+
+class Recorder:
+    """Latency samples and status codes per endpoint."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def record(self, endpoint, status, seconds):
+        self.latencies[endpoint].append(seconds)
+        self.statuses[endpoint][status] += 1
+
+    def summary(self):
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        rows = []
+        for endpoint, samples in sorted(self.latencies.items()):
+            samples = sorted(samples)
+            statuses = self.statuses[endpoint]
+            rows.append({
+                'endpoint': endpoint,
+                'requests': len(samples),
+                'errors': sum(count for status, count in statuses.items() if status >= 400),
+                'p50_ms': percentile(samples, 50) * 1000,
+                'p95_ms': percentile(samples, 95) * 1000,
+                'p99_ms': percentile(samples, 99) * 1000,
+                'max_ms': samples[-1] * 1000,
+                'rps': len(samples) / elapsed if elapsed else 0.0,
+                'statuses': dict(statuses),
+            })
+        return {'elapsed_s': elapsed, 'endpoints': rows}
+
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_samples)), 1)
+    return sorted_samples[rank - 1]
+
+
+def endpoint_label(method, path):
+    """``GET api/applications/<uuid:pk>/`` rather than one row per concrete id."""
+    try:
+        route = resolve(urlsplit(path).path).route
+    except Resolver404:
+        route = urlsplit(path).path
+    return f'{method} {route}'
+
+
+class HttpClient:
+    """Minimal keep-alive HTTP/1.1 client on asyncio streams."""
+
+    def __init__(self, host, port, recorder, timeout):
+        self.host, self.port = host, port
+        self.recorder = recorder
+        self.timeout = timeout
+        self.reader = self.writer = None
+        self.token = None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+            self.reader = self.writer = None
+
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def _read_response(self):
+        head = await self.reader.readuntil(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        status = int(lines[0].split(' ', 2)[1])
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = bytearray()
+            while True:
+                size = int((await self.reader.readuntil(b'\r\n')).split(b';')[0], 16)
+                if size == 0:
+                    await self.reader.readuntil(b'\r\n')
+                    break
+                body += await self.reader.readexactly(size)
+                await self.reader.readexactly(2)
+            body = bytes(body)
+        elif 'content-length' in headers:
+            body = await self.reader.readexactly(int(headers['content-length']))
+        elif status in (204, 304):
+            body = b''
+        else:
+            body = await self.reader.read()
+            headers['connection'] = 'close'
+
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, headers, body
+
+    async def request(self, method, path, body=b'', content_type=None, expect=(200, 201)):
+        headers = [f'{method} {path} HTTP/1.1', f'Host: {self.host}:{self.port}', f'Content-Length: {len(body)}']
+        if content_type:
+            headers.append(f'Content-Type: {content_type}')
+        if self.token:
+            headers.append(f'Authorization: Bearer {self.token}')
+        payload = ('\r\n'.join(headers) + '\r\n\r\n').encode() + body
+
+        started = time.perf_counter()
+        for attempt in (1, 2):
+            reused = self.writer is not None
+            if not reused:
+                await self._connect()
+            try:
+                self.writer.write(payload)
+                await self.writer.drain()
+                status, response_headers, data = await asyncio.wait_for(self._read_response(), self.timeout)
+                break
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await self.close()
+                if not reused or attempt == 2:  # a stale keep-alive connection gets one retry
+                    raise
+        self.recorder.record(endpoint_label(method, path), status, time.perf_counter() - started)
+
+        if status not in expect:
+            raise HttpError(f'{method} {path} -> {status}: {data[:200]!r}')
+        if response_headers.get('content-type', '').startswith('application/json') and data:
+            return json.loads(data)
+        return data
+
+    async def get(self, path, params=None, **kwargs):
+        return await self.request('GET', f'{path}?{urlencode(params)}' if params else path, **kwargs)
+
+    async def post_json(self, path, data, **kwargs):
+        return await self.request('POST', path, json.dumps(data).encode(), 'application/json', **kwargs)
+
+    async def post_multipart(self, path, fields, files, **kwargs):
+        boundary = uuid.uuid4().hex
+        parts = []
+        for name, value in fields.items():
+            parts.append(
+                f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+            )
+        for name, (filename, content, mime) in files.items():
+            parts.append(
+                f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                f'Content-Type: {mime}\r\n\r\n'.encode() + content + b'\r\n'
+            )
+        parts.append(f'--{boundary}--\r\n'.encode())
+        return await self.request('POST', path, b''.join(parts), f'multipart/form-data; boundary={boundary}', **kwargs)
+
+    async def login(self, path, username):
+        data = await self.post_json(path, {'username': username, 'password': PASSWORD})
+        self.token = data['access']
+
+
+def seed(applicants, officers, admins, documents=2):
+    """Create (or reuse) the load-test program and verified accounts."""
+    now = timezone.now()
+    with transaction.atomic():
+        department, _ = Department.objects.get_or_create(code='LT', defaults={'name': 'Load Test'})
+        program, created = Program.objects.get_or_create(code=PROGRAM_CODE, defaults={
+            'name': 'Load Test Programme',
+            'department': department,
+            'program_type': 'undergraduate',
+            'duration_years': 4,
+            'duration_semesters': 8,
+            'description': 'Synthetic programme used by manage.py loadtest',
+            'intake_capacity': applicants * 2,
+            'fees_per_semester': 1000,
+            'min_percentage': 0,
+            'eligibility_criteria': 'None',
+            'application_start_date': now - timedelta(days=1),
+            'application_end_date': now + timedelta(days=30),
+        })
+        if created:
+            RequiredDocument.objects.bulk_create(
+                RequiredDocument(program=program, document_name=f'Document {index + 1}')
+                for index in range(documents)
+            )
+        else:
+            Program.objects.filter(pk=program.pk).update(
+                intake_capacity=max(program.intake_capacity, program.occupied_seats + applicants * 2),
+                application_end_date=now + timedelta(days=30),
+            )
+
+        # Each run starts from fresh drafts; the seat counter follows via signals
+        Application.objects.filter(user__username__startswith=USER_PREFIX).delete()
+
+        # Hash once; every seeded account shares the password
+        password = make_password(PASSWORD)
+        existing = set(User.objects.filter(username__startswith=USER_PREFIX).values_list('username', flat=True))
+        accounts = (
+            [(f'{USER_PREFIX}applicant-{i}', 'applicant') for i in range(applicants)]
+            + [(f'{USER_PREFIX}officer-{i}', 'admission_officer') for i in range(officers)]
+            + [(f'{USER_PREFIX}admin-{i}', 'admin') for i in range(admins)]
+        )
+        User.objects.bulk_create(
+            [
+                User(username=username, password=password, role=role, is_verified=True,
+                     email=f'{username}@example.com', first_name='Load', last_name=username.rsplit('-', 1)[-1])
+                for username, role in accounts if username not in existing
+            ],
+            batch_size=1000,
+        )
+    return program
+
+
+def cleanup():
+    """Remove every seeded account (cascading to their applications) and the program."""
+    users, _ = User.objects.filter(username__startswith=USER_PREFIX).delete()
+    Program.objects.filter(code=PROGRAM_CODE).delete()
+    return users
+
+
+def sample_pdf(size):
+    """A syntactically plausible PDF of roughly ``size`` bytes."""
+    return b'%PDF-1.4\n' + b'0' * max(size - 14, 0) + b'\n%%EOF'
+
+
+APPLICATION_FORM = {
+    'date_of_birth': date(2006, 5, 17).isoformat(),
+    'gender': 'female',
+    'permanent_address': '12 Example Street, Example City',
+    'emergency_contact_name': 'Parent',
+    'emergency_contact_phone': '9999999999',
+    'emergency_contact_relation': 'Mother',
+    'tenth_board': 'CBSE',
+    'tenth_year': 2022,
+    'twelfth_board': 'CBSE',
+    'twelfth_year': 2024,
+}
+
+
+async def applicant_journey(client, index, program_id, document_bytes):
+    await client.login('/api/auth/login/', f'{USER_PREFIX}applicant-{index}')
+    await client.get('/api/programs/', {'search': 'Load'})
+    required = await client.get(f'/api/programs/{program_id}/documents/')
+    application = await client.post_json('/api/applications/create/', {
+        **APPLICATION_FORM,
+        'program_id': program_id,
+        'tenth_percentage': 60 + index % 40,
+        'twelfth_percentage': 55 + (index * 7) % 45,
+    })
+    application_id = application['id']
+    for document in required:
+        await client.post_multipart(
+            '/api/applications/documents/upload/',
+            {'application': application_id, 'document_type': document['id']},
+            {'file': (f'document-{document["id"]}.pdf', document_bytes, 'application/pdf')},
+        )
+    await client.request('PATCH', f'/api/applications/{application_id}/submit/')
+    await client.get('/api/applications/')
+    await client.get(f'/api/applications/{application_id}/')
+
+
+async def officer_loop(client, index, done, failures):
+    await client.login('/api/auth/officer/login/', f'{USER_PREFIX}officer-{index}')
+    backoff = 0.2
+    while not done.is_set():
+        try:
+            page = await client.get('/api/applications/', {'status': 'submitted', 'pagination': 'cursor'})
+            await client.get('/api/applications/search/', {'q': 'Load'})
+            results = page.get('results', [])
+            if not results:
+                await asyncio.sleep(0.2)
+                continue
+            application_id = results[index % len(results)]['id']
+            detail = await client.get(f'/api/applications/{application_id}/')
+            await client.get(f'/api/applications/{application_id}/timeline/')
+            documents = [{'id': document['id'], 'verified': True} for document in detail.get('documents', [])]
+            if documents:
+                await client.post_json('/api/applications/documents/verify/bulk/', {'documents': documents})
+            backoff = 0.2
+        except HttpError:
+            failures['officer_loop: HttpError'] += 1  # recorded per endpoint too; keep reviewing
+            # Back off rather than hammer a server that is already failing
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 5.0)
+
+
+async def admin_loop(client, index, done, failures, program_id):
+    await client.login('/api/auth/admin/login/', f'{USER_PREFIX}admin-{index}')
+    while not done.is_set():
+        try:
+            await client.get(f'/api/applications/merit/{program_id}/', {'limit': 50})
+            await client.get('/api/applications/export/csv/', {'program': program_id})
+            await client.get('/api/auth/admin/users/statistics/')
+            await client.get('/api/programs/departments/statistics/')
+        except HttpError:
+            failures['admin_loop: HttpError'] += 1
+        await asyncio.sleep(0.5)
+
+
+async def run(base_url, applicants, officers, admins, concurrency, document_bytes, timeout, program_id):
+    parts = urlsplit(base_url)
+    host, port = parts.hostname or '127.0.0.1', parts.port or 80
+    recorder = Recorder()
+    failures = Counter()
+    done = asyncio.Event()
+    slots = asyncio.Semaphore(concurrency)
+
+    async def guarded(coroutine, label):
+        try:
+            await coroutine
+        except (HttpError, OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as exc:
+            failures[f'{label}: {type(exc).__name__}'] += 1
+
+    async def applicant(index):
+        async with slots:
+            client = HttpClient(host, port, recorder, timeout)
+            try:
+                await guarded(applicant_journey(client, index, program_id, document_bytes), 'applicant')
+            finally:
+                await client.close()
+
+    async def background(loop, index, *args):
+        client = HttpClient(host, port, recorder, timeout)
+        try:
+            await guarded(loop(client, index, done, failures, *args), loop.__name__)
+        finally:
+            await client.close()
+
+    staff = [asyncio.create_task(background(officer_loop, i)) for i in range(officers)]
+    staff += [asyncio.create_task(background(admin_loop, i, program_id)) for i in range(admins)]
+    await asyncio.gather(*(applicant(i) for i in range(applicants)))
+    done.set()
+    await asyncio.gather(*staff)
+    recorder.finished = time.perf_counter()
+    return recorder, failures
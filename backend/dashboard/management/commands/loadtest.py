@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from dashboard import loadtest
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive applicant, officer and admin journeys against a running server and report '
+        'p50/p95/p99 latency and throughput per endpoint. Applicant, officer and admin accounts '
+        'are seeded through the ORM, so registration is not measured; run it with the same '
+        'database settings as the server (SQLite by default, Postgres via production_settings).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='Server under test')
+        parser.add_argument('--applicants', type=int, default=200, help='Applicant journeys to run')
+        parser.add_argument('--officers', type=int, default=5, help='Officers reviewing while applicants submit')
+        parser.add_argument('--admins', type=int, default=1)
+        parser.add_argument('--concurrency', type=int, default=50, help='Applicant journeys in flight at once')
+        parser.add_argument('--document-kb', type=int, default=200, help='Size of each uploaded document')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds')
+        parser.add_argument('--json', dest='json_path', help='Also write the summary to this file')
+        parser.add_argument('--cleanup', action='store_true', help='Delete the seeded accounts and program, then exit')
+
+    def handle(self, *args, **options):
+        if options['cleanup']:
+            deleted = loadtest.cleanup()
+            self.stdout.write(self.style.SUCCESS(f'Removed {deleted} load-test rows'))
+            return
+        if options['applicants'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--applicants and --concurrency must be positive')
+
+        program = loadtest.seed(options['applicants'], options['officers'], options['admins'])
+        self.stdout.write(
+            f"Seeded program {program.code} and {options['applicants']} applicants on {connection.vendor}; "
+            f"target {options['base_url']}"
+        )
+
+        recorder, failures = asyncio.run(loadtest.run(
+            options['base_url'],
+            options['applicants'],
+            options['officers'],
+            options['admins'],
+            options['concurrency'],
+            loadtest.sample_pdf(options['document_kb'] * 1024),
+            options['timeout'],
+            program.pk,
+        ))
+        summary = recorder.summary()
+        summary.update({'database': connection.vendor, 'failures': dict(failures), 'options': {
+            key: options[key] for key in ('applicants', 'officers', 'admins', 'concurrency', 'document_kb')
+        }})
+
+        self.stdout.write(f"\n{'endpoint':<58} {'reqs':>6} {'err':>5} {'p50':>8} {'p95':>8} {'p99':>8} {'rps':>8}")
+        for row in summary['endpoints']:
+            self.stdout.write(
+                f"{row['endpoint'][:58]:<58} {row['requests']:>6} {row['errors']:>5} "
+                f"{row['p50_ms']:>7.1f}ms {row['p95_ms']:>6.1f}ms {row['p99_ms']:>6.1f}ms {row['rps']:>8.1f}"
+            )
+        total = sum(row['requests'] for row in summary['endpoints'])
+        self.stdout.write(f"\n{total} requests in {summary['elapsed_s']:.1f}s ({total / summary['elapsed_s']:.1f} req/s)")
+        for failure, count in failures.most_common():
+            self.stderr.write(f'  failed journeys: {failure} x{count}')
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as handle:
+                json.dump(summary, handle, indent=2, default=str)
+        self.stdout.write(self.style.SUCCESS('Run `manage.py loadtest --cleanup` to remove the seeded data.'))
@@ -0,0 +1,174 @@
+"""Request metrics shared across worker processes.
+
+Each process aggregates counters and histogram buckets in memory and every
+``METRICS_FLUSH_INTERVAL`` seconds adds its deltas to a small SQLite file
+with one upsert per series, so all gunicorn workers of a host (and restarts
+of them) report into the same totals. The exposition reads that file back in
+the Prometheus text format; counters only ever grow, which is what Prometheus
+expects from a long-lived target.
+"""
+import atexit
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'college_portal_'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# name -> (type, help, buckets)
+FAMILIES = {
+    'http_requests_total': ('counter', 'Requests by URL name, method and status.', None),
+    'http_request_duration_seconds': ('histogram', 'Time spent in the Django stack per request.', LATENCY_BUCKETS),
+    'http_request_db_queries': ('histogram', 'Database queries run per request.', QUERY_BUCKETS),
+    'http_request_db_duration_seconds': ('histogram', 'Time spent in database queries per request.', LATENCY_BUCKETS),
+    'http_response_size_bytes': ('histogram', 'Response body size.', SIZE_BUCKETS),
+}
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels):
+    return ','.join(f'{key}="{_escape(value)}"' for key, value in labels)
+
+
+def _format_bound(bound):
+    return '+Inf' if bound == math.inf else repr(float(bound))
+
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class MetricsStore:
+    def __init__(self, path, flush_interval=5.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._connection = None
+        self._pid = None
+
+    def _connect(self):
+        # A connection must not cross a fork, so reopen in each worker
+        if self._connection is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS metrics ('
+                'name TEXT NOT NULL, labels TEXT NOT NULL, value REAL NOT NULL, '
+                'PRIMARY KEY (name, labels)) WITHOUT ROWID'
+            )
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    def _add(self, name, labels, value):
+        key = (name, format_labels(labels))
+        self._pending[key] = self._pending.get(key, 0) + value
+
+    def _observe(self, name, labels, value, buckets):
+        # Every bound gets a series, even at zero; buckets are cumulative
+        for bound in (*buckets, math.inf):
+            self._add(f'{name}_bucket', (*labels, ('le', _format_bound(bound))), 1 if value <= bound else 0)
+        self._add(f'{name}_sum', labels, value)
+        self._add(f'{name}_count', labels, 1)
+
+    def record(self, view, method, status, duration, queries, query_seconds, size=None):
+        labels = (('view', view), ('method', method))
+        with self._lock:
+            self._add('http_requests_total', (*labels, ('status', status)), 1)
+            self._observe('http_request_duration_seconds', labels, duration, LATENCY_BUCKETS)
+            self._observe('http_request_db_queries', labels, queries, QUERY_BUCKETS)
+            self._observe('http_request_db_duration_seconds', labels, query_seconds, LATENCY_BUCKETS)
+            if size is not None:
+                self._observe('http_response_size_bytes', labels, size, SIZE_BUCKETS)
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+            if not pending:
+                return
+            try:
+                connection = self._connect()
+                connection.execute('BEGIN IMMEDIATE')
+                connection.executemany(
+                    'INSERT INTO metrics (name, labels, value) VALUES (?, ?, ?) '
+                    'ON CONFLICT (name, labels) DO UPDATE SET value = value + excluded.value',
+                    [(name, labels, value) for (name, labels), value in pending.items()],
+                )
+                connection.execute('COMMIT')
+            except sqlite3.Error:
+                logger.warning('Could not flush request metrics to %s', self.path, exc_info=True)
+                if self._connection is not None and self._connection.in_transaction:
+                    self._connection.execute('ROLLBACK')
+                # Keep the deltas for the next attempt
+                for key, value in pending.items():
+                    self._pending[key] = self._pending.get(key, 0) + value
+
+    def rows(self):
+        self.flush()
+        with self._lock:
+            return self._connect().execute('SELECT name, labels, value FROM metrics').fetchall()
+
+    def render(self):
+        """All series in the Prometheus text exposition format (0.0.4)."""
+        series = {}
+        for name, labels, value in self.rows():
+            series.setdefault(name, []).append((labels, value))
+        lines = []
+        for family, (kind, help_text, buckets) in FAMILIES.items():
+            names = [family] if buckets is None else [f'{family}_bucket', f'{family}_sum', f'{family}_count']
+            if not any(name in series for name in names):
+                continue
+            lines.append(f'# HELP {PREFIX}{family} {help_text}')
+            lines.append(f'# TYPE {PREFIX}{family} {kind}')
+            for name in names:
+                for labels, value in sorted(series.get(name, ()), key=_sort_key):
+                    lines.append(f'{PREFIX}{name}{{{labels}}} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def _sort_key(row):
+    # Buckets of one series sort by their numeric bound, not as strings
+    labels, _ = row
+    head, sep, bound = labels.rpartition(',le="')
+    if not sep:
+        return labels, 0.0
+    return head, float(bound.rstrip('"').replace('+Inf', 'inf'))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """The process-wide store for ``settings.METRICS_DB``, flushed when the process exits."""
+    global _store
+    path = settings.METRICS_DB
+    if _store is None or _store.path != path:
+        with _store_lock:
+            if _store is None or _store.path != path:
+                if _store is not None:
+                    atexit.unregister(_store.flush)
+                _store = MetricsStore(path, settings.METRICS_FLUSH_INTERVAL)
+                # Otherwise a worker that exits or is recycled loses what it buffered
+                atexit.register(_store.flush)
+    return _store
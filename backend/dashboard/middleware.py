@@ -0,0 +1,94 @@
+import cProfile
+import logging
+import os
+import random
+import re
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .metrics import get_store
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCounter:
+    """``execute_wrapper`` hook counting queries and their time, without DEBUG's query log."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+def _response_size(response):
+    if not response.streaming:
+        return len(response.content)
+    length = response.get('Content-Length')
+    return int(length) if length and length.isdigit() else None
+
+
+class RequestMetricsMiddleware:
+    """Record latency, database work and response size per resolved URL name.
+
+    With ``METRICS_PROFILE_SAMPLE_RATE`` above zero, that fraction of requests
+    runs under cProfile and the profile of any that took longer than
+    ``METRICS_PROFILE_SLOW_MS`` is written to ``METRICS_PROFILE_DIR``
+    (inspect it with ``python -m pstats`` or snakeviz).
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        profiler = None
+        if settings.METRICS_PROFILE_SAMPLE_RATE and random.random() < settings.METRICS_PROFILE_SAMPLE_RATE:
+            profiler = cProfile.Profile()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            if profiler is not None:
+                profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+        duration = time.perf_counter() - started
+
+        match = request.resolver_match
+        # Unmatched paths share one label so scanners cannot blow up cardinality
+        view = match.view_name if match else 'unresolved'
+        get_store().record(
+            view, request.method, response.status_code, duration,
+            counter.count, counter.seconds, _response_size(response),
+        )
+        if profiler is not None and duration * 1000 >= settings.METRICS_PROFILE_SLOW_MS:
+            self.dump_profile(profiler, view, duration)
+        return response
+
+    def dump_profile(self, profiler, view, duration):
+        directory = settings.METRICS_PROFILE_DIR
+        try:
+            os.makedirs(directory, exist_ok=True)
+            name = f"{int(time.time() * 1000)}-{os.getpid()}-{re.sub(r'[^A-Za-z0-9_.-]', '_', view)}.prof"
+            path = os.path.join(directory, name)
+            profiler.dump_stats(path)
+        except OSError:
+            logger.warning('Could not write request profile to %s', directory, exc_info=True)
+            return
+        logger.info('Slow request to %s took %.0f ms; profile written to %s', view, duration * 1000, path)
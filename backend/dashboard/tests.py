@@ -1,3 +1,85 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from authentication.models import User
+from .metrics import MetricsStore, get_store
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        # A fresh file per test, so each starts from empty totals
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.enterContext(override_settings(
+            METRICS_ENABLED=True,
+            METRICS_DB=os.path.join(self.directory, 'metrics.sqlite3'),
+            METRICS_FLUSH_INTERVAL=3600,
+            METRICS_PROFILE_DIR=os.path.join(self.directory, 'profiles'),
+        ))
+        # Store what is still buffered before the directory goes, not at exit
+        self.addCleanup(lambda: get_store().flush())
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='admin', email='admin@example.com', role='admin')
+
+    def scrape(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return response.content.decode()
+
+    def test_requests_are_exposed_per_url_name(self):
+        self.client.force_authenticate(self.admin)
+        for _ in range(2):
+            self.client.get(reverse('application-list'))
+        self.client.force_authenticate(None)
+        self.client.get('/api/no-such-route/')
+
+        body = self.scrape()
+        self.assertIn('# TYPE college_portal_http_request_duration_seconds histogram', body)
+        self.assertIn('college_portal_http_requests_total{view="application-list",method="GET",status="200"} 2', body)
+        self.assertIn('college_portal_http_requests_total{view="unresolved",method="GET",status="404"} 1', body)
+        self.assertIn('college_portal_http_request_duration_seconds_count{view="application-list",method="GET"} 2', body)
+        self.assertIn('college_portal_http_request_duration_seconds_bucket{view="application-list",method="GET",le="+Inf"} 2', body)
+        self.assertIn('college_portal_http_request_db_queries_bucket{view="application-list",method="GET",le="0.0"} 0', body)
+        self.assertIn('college_portal_http_request_db_queries_count{view="application-list",method="GET"} 2', body)
+        self.assertIn('college_portal_http_response_size_bytes_count{view="application-list",method="GET"} 2', body)
+        buckets = [line for line in body.splitlines()
+                   if line.startswith('college_portal_http_request_db_queries_bucket{view="application-list"')]
+        counts = [int(line.rsplit(' ', 1)[1]) for line in buckets]
+        self.assertEqual(counts, sorted(counts))  # cumulative, in bound order
+
+    def test_metrics_are_admin_only(self):
+        applicant = User.objects.create_user(username='applicant', email='a@example.com', role='applicant')
+        self.client.force_authenticate(applicant)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+
+    @override_settings(METRICS_PROFILE_SAMPLE_RATE=1.0, METRICS_PROFILE_SLOW_MS=0)
+    def test_slow_requests_are_profiled_when_sampled(self):
+        self.client.force_authenticate(self.admin)
+        self.client.get(reverse('application-list'))
+        profiles = os.listdir(os.path.join(self.directory, 'profiles'))
+        self.assertEqual(len(profiles), 1)
+        self.assertTrue(profiles[0].endswith('-application-list.prof'))
+
+    def test_buffered_deltas_are_flushed_at_exit(self):
+        with mock.patch('dashboard.metrics.atexit') as exit_hooks:
+            with override_settings(METRICS_DB=os.path.join(self.directory, 'exit.sqlite3')):
+                store = get_store()
+            exit_hooks.register.assert_called_once_with(store.flush)
+
+        store.record('application-list', 'GET', 200, 0.01, 1, 0.001)
+        self.assertEqual(MetricsStore(store.path).rows(), [])
+        store.flush()  # what the exit hook runs
+        self.assertIn(
+            ('http_requests_total', 'view="application-list",method="GET",status="200"', 1.0),
+            MetricsStore(store.path).rows(),
+        )
@@ -1,3 +1,15 @@
-from django.shortcuts import render
+from django.http import HttpResponse
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
 
-# Create your views here.
+from .metrics import get_store
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def metrics(request):
+    """Request metrics of every worker in the Prometheus text format (admin only)"""
+    if request.user.role != 'admin':
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    return HttpResponse(get_store().render(), content_type='text/plain; version=0.0.4; charset=utf-8')
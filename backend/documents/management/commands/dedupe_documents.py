@@ -0,0 +1,60 @@
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from applications.models import ApplicationDocument
+from documents.models import DocumentBlob, file_sha256
+
+
+class Command(BaseCommand):
+    help = 'Move legacy application documents onto content-addressed blobs, deleting duplicate files in place'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be reclaimed without changing anything')
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        seen = {}  # sha256 -> file name, for dry runs
+        adopted = duplicates = missing = reclaimed = 0
+
+        legacy = ApplicationDocument.objects.filter(blob__isnull=True).order_by('pk')
+        for document in legacy.iterator(chunk_size=options['chunk_size']):
+            storage, name = document.file.storage, document.file.name
+            if not name or not storage.exists(name):
+                missing += 1
+                continue
+            with storage.open(name, 'rb') as handle:
+                sha256 = file_sha256(File(handle))
+            size = storage.size(name)
+
+            if dry_run:
+                existing = seen.get(sha256) or DocumentBlob.objects.filter(sha256=sha256).values_list('file', flat=True).first()
+                if existing and existing != name:
+                    duplicates += 1
+                    reclaimed += size
+                else:
+                    adopted += 1
+                    seen[sha256] = name
+                continue
+
+            with transaction.atomic():
+                blob = DocumentBlob.objects.select_for_update().filter(sha256=sha256).first()
+                if blob is None:
+                    # First copy of this content: the existing file becomes the blob, no copying
+                    blob = DocumentBlob.objects.create(sha256=sha256, file=name, size=size, ref_count=1)
+                    adopted += 1
+                else:
+                    DocumentBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+                    if blob.file.name != name:
+                        duplicates += 1
+                        reclaimed += size
+                        transaction.on_commit(lambda name=name: storage.delete(name))
+                ApplicationDocument.objects.filter(pk=document.pk).update(blob=blob, file=blob.file.name)
+
+        prefix = 'Would reclaim' if dry_run else 'Reclaimed'
+        self.stdout.write(
+            f'{adopted} files adopted as blobs, {duplicates} duplicates, {missing} documents with missing files'
+        )
+        self.stdout.write(self.style.SUCCESS(f'{prefix} {reclaimed / (1024 * 1024):.1f} MB'))
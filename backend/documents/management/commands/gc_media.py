@@ -0,0 +1,140 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
+
+
+def _scan_directory(path, cutoff):
+    """List one directory: (subdirectories, [(path, size) of files older than cutoff], skipped young files)."""
+    subdirs, files, young = [], [], 0
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                stat = entry.stat(follow_symlinks=False)
+                if stat.st_mtime < cutoff:
+                    files.append((entry.path, stat.st_size))
+                else:
+                    young += 1
+    return subdirs, files, young
+
+
+class Command(BaseCommand):
+    help = 'Find (and optionally delete) files under MEDIA_ROOT that no database row refers to'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--delete', action='store_true', help='Delete orphans (default only reports them)')
+        parser.add_argument('--dry-run', action='store_true', help='Report only; overrides --delete')
+        parser.add_argument('--workers', type=int, default=8, help='Threads walking the media tree')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows per query when loading and re-checking references')
+        parser.add_argument(
+            '--min-age', type=int, default=60,
+            help='Ignore files modified in the last N minutes (uploads whose row is not committed yet)',
+        )
+        parser.add_argument('--verbose-orphans', action='store_true', help='Print every orphan path')
+
+    def handle(self, *args, **options):
+        media_root = settings.MEDIA_ROOT
+        if not media_root or not os.path.isdir(media_root):
+            # An unset MEDIA_ROOT means the working directory, i.e. the source tree
+            raise CommandError('MEDIA_ROOT must point at an existing media directory')
+        media_root = os.path.abspath(media_root)
+        delete = options['delete'] and not options['dry_run']
+        started = time.monotonic()
+
+        referenced = self.load_references(options['chunk_size'])
+        loaded = time.monotonic()
+        self.stdout.write(f'Loaded {len(referenced)} referenced files in {loaded - started:.1f}s')
+
+        skip = {os.path.abspath(settings.CHUNKED_UPLOAD_DIR)}
+        cutoff = time.time() - options['min_age'] * 60
+        dirs = files = young = scanned_bytes = orphan_count = orphan_bytes = failed = 0
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            pending = {pool.submit(_scan_directory, media_root, cutoff)}
+            candidates = []
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    subdirs, found, skipped = future.result()
+                    dirs += 1
+                    young += skipped
+                    for subdir in subdirs:
+                        if subdir not in skip:
+                            pending.add(pool.submit(_scan_directory, subdir, cutoff))
+                    for path, size in found:
+                        files += 1
+                        scanned_bytes += size
+                        name = os.path.relpath(path, media_root)
+                        if name not in referenced:
+                            candidates.append((name, path, size))
+
+            # The reference set predates the walk: a row committed since then
+            # (e.g. a chunked upload renamed into place with its original
+            # mtime) must not lose its file, so look every candidate up again
+            for start in range(0, len(candidates), options['chunk_size']):
+                batch = candidates[start:start + options['chunk_size']]
+                claimed = self.referenced_among([name for name, _path, _size in batch])
+                removals = []
+                for name, path, size in batch:
+                    if name in claimed:
+                        continue
+                    orphan_count += 1
+                    orphan_bytes += size
+                    if options['verbose_orphans']:
+                        self.stdout.write(f'  orphan: {path} ({size} bytes)')
+                    if delete:
+                        removals.append(pool.submit(os.remove, path))
+                for removal in removals:
+                    try:
+                        removal.result()
+                    except OSError as exc:
+                        failed += 1
+                        self.stderr.write(f'Could not delete: {exc}')
+
+        elapsed = time.monotonic() - started
+        walk = max(elapsed - (loaded - started), 1e-9)
+        self.stdout.write(
+            f'Scanned {files} files ({scanned_bytes / 1024 / 1024:.1f} MB) in {dirs} directories '
+            f'in {walk:.1f}s ({files / walk:.0f} files/s); skipped {young} recent files'
+        )
+        action = 'Deleted' if delete else 'Found'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} {orphan_count - failed} orphaned files ({orphan_bytes / 1024 / 1024:.1f} MB) in {elapsed:.1f}s'
+        ))
+        if orphan_count and not delete:
+            self.stdout.write('Re-run with --delete to remove them.')
+
+    def file_fields(self):
+        for model in apps.get_models():
+            for field in model._meta.concrete_fields:
+                if isinstance(field, models.FileField):
+                    yield model, field
+
+    def referenced_among(self, names):
+        """The subset of ``names`` some FileField refers to right now."""
+        claimed = set()
+        for model, field in self.file_fields():
+            claimed.update(
+                os.path.normpath(name) for name in
+                model._default_manager.filter(**{f'{field.attname}__in': names}).values_list(field.attname, flat=True)
+            )
+        return claimed
+
+    def load_references(self, chunk_size):
+        """Every stored name held by any FileField, as a path relative to MEDIA_ROOT."""
+        referenced = set()
+        for model, field in self.file_fields():
+            names = (
+                model._default_manager.exclude(**{field.attname: ''})
+                .exclude(**{f'{field.attname}__isnull': True})
+                .values_list(field.attname, flat=True)
+            )
+            for name in names.iterator(chunk_size=chunk_size):
+                referenced.add(os.path.normpath(name))
+        return referenced
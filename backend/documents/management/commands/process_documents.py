@@ -0,0 +1,47 @@
+from concurrent.futures import as_completed
+
+from django.core.management.base import BaseCommand
+
+from applications.models import ApplicationDocument
+from documents import pipeline
+from documents.processing import process_file
+
+
+class Command(BaseCommand):
+    help = 'Run the post-upload pipeline for documents it has not handled (e.g. queued when the server stopped)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--status', nargs='+', default=['pending', 'failed'],
+            help='Processing statuses to (re)process (default: pending failed)',
+        )
+        parser.add_argument('--inline', action='store_true', help='Process in this process instead of the pool')
+
+    def handle(self, *args, **options):
+        documents = ApplicationDocument.objects.filter(processing_status__in=options['status']).order_by('pk')
+        jobs = {}
+        results = {'processed': 0, 'rejected': 0, 'failed': 0}
+
+        for document in documents.iterator():
+            args = pipeline.job_args(document)
+            if options['inline']:
+                self._apply(document.pk, lambda: process_file(*args), results)
+            else:
+                jobs[pipeline.get_executor().submit(process_file, *args)] = document.pk
+
+        for future in as_completed(jobs):
+            self._apply(jobs[future], future.result, results)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {results['processed']}, rejected {results['rejected']}, failed {results['failed']}"
+        ))
+
+    def _apply(self, document_id, run, results):
+        try:
+            document = pipeline.apply_result(document_id, run())
+        except Exception as exc:
+            pipeline.mark_failed(document_id, exc)
+            results['failed'] += 1
+            return
+        if document is not None:
+            results[document.processing_status] += 1
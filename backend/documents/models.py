@@ -1,3 +1,91 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+import hashlib
+import os
+import weakref
 
-# Create your models here.
+
+def blob_path(instance, filename):
+    """Content-addressed path: blobs/ab/cd/<sha256>.<ext>"""
+    ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else 'bin'
+    return f"blobs/{instance.sha256[:2]}/{instance.sha256[2:4]}/{instance.sha256}.{ext}"
+
+
+def file_sha256(content):
+    """SHA-256 of a Django File, read in chunks; the file is rewound afterwards."""
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest()
+
+
+def delete_on_rollback(storage, name):
+    """Delete the just-written file ``name`` unless the current transaction commits.
+
+    Django has no rollback hook, but a transaction (or savepoint) that rolls
+    back drops its on_commit callbacks unrun. The callback registered here
+    only records the commit; when it is dropped without having run, its
+    finalizer removes the file.
+    """
+    state = {'committed': False}
+
+    def committed():
+        state['committed'] = True
+
+    weakref.finalize(committed, lambda: state['committed'] or storage.delete(name))
+    transaction.on_commit(committed)
+
+
+class DocumentBlobQuerySet(models.QuerySet):
+    def store(self, content, sha256=None):
+        """Return the blob holding ``content``, taking one reference to it.
+
+        Identical bytes are written to storage once; every later upload of the
+        same content only increments ``ref_count``.
+        """
+        sha256 = sha256 or file_sha256(content)
+        with transaction.atomic():
+            if self.filter(sha256=sha256).update(ref_count=F('ref_count') + 1):
+                return self.get(sha256=sha256)
+
+            blob = self.model(sha256=sha256, size=content.size, ref_count=1)
+            blob.file.save(os.path.basename(content.name or ''), content, save=False)
+            try:
+                with transaction.atomic():
+                    blob.save(force_insert=True)
+            except IntegrityError:
+                # Another request stored the same content first; use theirs
+                blob.file.storage.delete(blob.file.name)
+                self.filter(sha256=sha256).update(ref_count=F('ref_count') + 1)
+                return self.get(sha256=sha256)
+            # The row is only there if the caller's transaction commits
+            delete_on_rollback(blob.file.storage, blob.file.name)
+            return blob
+
+    def release(self, sha256):
+        """Drop one reference; the blob and its file go away with the last one."""
+        with transaction.atomic():
+            self.filter(sha256=sha256, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+            orphan = self.select_for_update().filter(sha256=sha256, ref_count=0).first()
+            if orphan is not None:
+                name, storage = orphan.file.name, orphan.file.storage
+                orphan.delete()
+                transaction.on_commit(lambda: storage.delete(name))
+
+
+class DocumentBlob(models.Model):
+    """A stored file shared by every document row with the same content."""
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    file = models.FileField(upload_to=blob_path, max_length=255)
+    size = models.PositiveBigIntegerField()  # in bytes
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = DocumentBlobQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count} refs)"
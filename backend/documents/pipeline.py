@@ -0,0 +1,157 @@
+"""Post-upload processing of application documents.
+
+Uploads return as soon as the file is stored. ``schedule()`` queues the
+document once the upload transaction commits; the CPU work in
+``processing.process_file`` then runs in a process pool, and the results are
+written back to the ApplicationDocument row from the parent process by a
+dedicated writer thread.
+
+Only images get a thumbnail: rendering a PDF page needs a rasteriser, which
+the worker (plain Python + Pillow) does not have.
+"""
+import logging
+import os
+import queue
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files import File
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import DocumentBlob
+from .processing import process_file
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+# (document id, finished future) handed from the pool to the writer thread
+_results = queue.SimpleQueue()
+
+
+def get_executor():
+    """The per-process worker pool and its writer thread, created on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=settings.DOCUMENT_PIPELINE_WORKERS)
+            threading.Thread(target=_write_results, name='document-pipeline-writer', daemon=True).start()
+    return _executor
+
+
+def job_args(document):
+    """Arguments for ``process_file`` — plain values, so they can cross the process boundary."""
+    name = document.original_filename
+    extension = name.rsplit('.', 1)[-1] if '.' in name else ''
+    return (
+        document.file.path,
+        extension,
+        settings.DOCUMENT_RECOMPRESS_THRESHOLD,
+        settings.DOCUMENT_MAX_IMAGE_DIMENSION,
+        settings.DOCUMENT_THUMBNAIL_SIZE,
+    )
+
+
+def schedule(document):
+    """Process ``document`` once the current transaction commits."""
+    if not settings.DOCUMENT_PIPELINE_ENABLED:
+        return
+    args = job_args(document)
+    transaction.on_commit(lambda: submit(document.pk, args))
+
+
+def submit(document_id, args):
+    if settings.DOCUMENT_PIPELINE_EAGER:
+        apply_result(document_id, process_file(*args))
+        return None
+    future = get_executor().submit(process_file, *args)
+    # The callback runs on the pool's management thread (or on this one if
+    # the job already finished), so it only queues the result
+    future.add_done_callback(lambda done: _results.put((document_id, done)))
+    return future
+
+
+def _write_results():
+    """Store finished jobs, one at a time, for the life of the process.
+
+    Each job is treated like a request: stale connections are dropped before
+    it runs and closed (subject to CONN_MAX_AGE) once it is stored.
+    """
+    while True:
+        document_id, future = _results.get()
+        close_old_connections()
+        try:
+            _finish(document_id, future)
+        finally:
+            close_old_connections()
+
+
+def _finish(document_id, future):
+    try:
+        exc = future.exception()
+        if exc is None:
+            apply_result(document_id, future.result())
+        else:
+            mark_failed(document_id, exc)
+    except Exception:
+        logger.exception("Storing processing results for document %s failed", document_id)
+
+
+def mark_failed(document_id, exc):
+    from applications.models import ApplicationDocument
+
+    logger.error("Processing document %s failed: %s", document_id, exc)
+    ApplicationDocument.objects.filter(pk=document_id).update(
+        processing_status='failed', processing_error=str(exc), processed_at=timezone.now()
+    )
+
+
+def apply_result(document_id, result):
+    """Store the worker's findings on the document and move derived files into storage."""
+    from applications.models import ApplicationDocument, remove_file
+
+    try:
+        with transaction.atomic():
+            document = ApplicationDocument.objects.select_for_update().filter(pk=document_id).first()
+            if document is None:
+                return None  # deleted while it was being processed
+
+            document.detected_content_type = result['content_type']
+            document.page_count = result['page_count']
+            document.processing_error = result['error']
+            document.processing_status = 'processed' if result['valid'] else 'rejected'
+            document.processed_at = timezone.now()
+            fields = [
+                'detected_content_type', 'page_count', 'processing_error',
+                'processing_status', 'processed_at',
+            ]
+
+            if result['thumbnail_path']:
+                if document.thumbnail:
+                    old_thumbnail = document.thumbnail.path
+                    transaction.on_commit(lambda: remove_file(old_thumbnail))
+                with open(result['thumbnail_path'], 'rb') as handle:
+                    document.thumbnail.save('thumbnail.jpg', File(handle), save=False)
+                fields.append('thumbnail')
+
+            if result['recompressed_path']:
+                old_blob_id = document.blob_id
+                old_path = document.file.path if old_blob_id is None else None
+                with open(result['recompressed_path'], 'rb') as handle:
+                    blob = DocumentBlob.objects.store(File(handle, name=os.path.basename(document.file.name)))
+                document.blob, document.file, document.file_size = blob, blob.file.name, blob.size
+                fields += ['blob', 'file', 'file_size']
+                document.save(update_fields=fields)
+                if old_blob_id:
+                    DocumentBlob.objects.release(old_blob_id)
+                else:
+                    transaction.on_commit(lambda: remove_file(old_path))
+            else:
+                document.save(update_fields=fields)
+        return document
+    finally:
+        if result.get('work_dir'):
+            shutil.rmtree(result['work_dir'], ignore_errors=True)
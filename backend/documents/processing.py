@@ -0,0 +1,114 @@
+"""CPU-bound document processing steps.
+
+Everything here is plain Python + Pillow with no Django imports, so it can
+run inside a ProcessPoolExecutor worker. The worker reads the stored file,
+writes any derived files to a scratch directory and returns a dict of
+results; the parent process (see ``pipeline.py``) owns the database and
+storage side.
+"""
+import os
+import re
+import tempfile
+
+from PIL import Image, UnidentifiedImageError
+
+# Leading bytes of every format we accept -> (MIME type, canonical extension)
+MAGIC_NUMBERS = [
+    (b'%PDF-', ('application/pdf', 'pdf')),
+    (b'\x89PNG\r\n\x1a\n', ('image/png', 'png')),
+    (b'\xff\xd8\xff', ('image/jpeg', 'jpg')),
+]
+
+EXTENSION_ALIASES = {'jpeg': 'jpg'}
+
+_PDF_PAGE = re.compile(rb'/Type\s*/Page(?![a-zA-Z])')
+_PDF_COUNT = re.compile(rb'/Type\s*/Pages\b.{0,200}?/Count\s+(\d+)|/Count\s+(\d+).{0,200}?/Type\s*/Pages\b', re.S)
+
+
+def sniff(path):
+    """Return (mime type, extension) from the file's magic bytes, or (None, None)."""
+    with open(path, 'rb') as handle:
+        head = handle.read(16)
+    for magic, detected in MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return detected
+    return None, None
+
+
+def pdf_page_count(path):
+    """Count pages without a PDF library.
+
+    Page objects are counted directly; when they are hidden in compressed
+    object streams the largest /Count of a /Pages node is used instead.
+    """
+    with open(path, 'rb') as handle:
+        data = handle.read()
+    pages = len(_PDF_PAGE.findall(data))
+    if pages:
+        return pages
+    counts = [int(a or b) for a, b in _PDF_COUNT.findall(data)]
+    return max(counts) if counts else None
+
+
+def recompress_image(path, extension, work_dir, threshold_bytes, max_dimension):
+    """Downscale/re-encode an oversized scan. Returns the new path, or None if not worthwhile."""
+    original_size = os.path.getsize(path)
+    with Image.open(path) as image:
+        if original_size <= threshold_bytes and max(image.size) <= max_dimension:
+            return None
+        image.thumbnail((max_dimension, max_dimension))
+        target = os.path.join(work_dir, f'recompressed.{extension}')
+        if extension == 'png':
+            image.save(target, 'PNG', optimize=True)
+        else:
+            image.convert('RGB').save(target, 'JPEG', quality=85, optimize=True, progressive=True)
+    if os.path.getsize(target) >= original_size:
+        os.remove(target)
+        return None
+    return target
+
+
+def make_thumbnail(path, work_dir, size):
+    with Image.open(path) as image:
+        image.thumbnail((size, size))
+        target = os.path.join(work_dir, 'thumbnail.jpg')
+        image.convert('RGB').save(target, 'JPEG', quality=80)
+    return target
+
+
+def process_file(path, declared_extension, threshold_bytes, max_dimension, thumbnail_size):
+    """Run every step for one stored file. Executed in a worker process."""
+    result = {
+        'content_type': '',
+        'valid': False,
+        'page_count': None,
+        'recompressed_path': None,
+        'thumbnail_path': None,
+        'work_dir': None,
+        'error': '',
+    }
+    content_type, extension = sniff(path)
+    declared = EXTENSION_ALIASES.get(declared_extension.lower(), declared_extension.lower())
+    result['content_type'] = content_type or ''
+    if content_type is None:
+        result['error'] = 'Unrecognised file type'
+        return result
+    if extension != declared:
+        result['error'] = f'File content is {extension.upper()} but the name says .{declared_extension}'
+        return result
+    result['valid'] = True
+
+    if extension == 'pdf':
+        result['page_count'] = pdf_page_count(path)
+        return result
+
+    work_dir = tempfile.mkdtemp(prefix='docproc-')
+    result['work_dir'] = work_dir
+    try:
+        result['page_count'] = 1
+        result['recompressed_path'] = recompress_image(path, extension, work_dir, threshold_bytes, max_dimension)
+        result['thumbnail_path'] = make_thumbnail(path, work_dir, thumbnail_size)
+    except (UnidentifiedImageError, OSError) as exc:
+        result['valid'] = False
+        result['error'] = f'Unreadable image: {exc}'
+    return result
@@ -0,0 +1,130 @@
+"""Sending stored files to authorised users.
+
+Views check access, then call ``serve_file``. When a front proxy is configured
+(``DOCUMENT_SENDFILE_BACKEND``) the transfer is handed to it with
+``X-Accel-Redirect`` (nginx) or ``X-Sendfile`` (Apache/lighttpd) and the proxy
+handles ranges itself; otherwise Django streams the file with a
+``FileResponse``, which servers such as gunicorn send with ``sendfile()``.
+Both paths answer ``If-None-Match`` from the ETag without touching the file.
+"""
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import content_disposition_header, parse_etags, quote_etag
+
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class FileRange:
+    """Read-only view of ``length`` bytes of an open file starting at ``start``.
+
+    Keeps ``fileno()`` so a WSGI file wrapper can still use sendfile(); the
+    server limits the transfer to the Content-Length we set.
+    """
+
+    def __init__(self, handle, start, length):
+        handle.seek(start)
+        self.handle = handle
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.handle.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.handle.fileno()
+
+    def close(self):
+        self.handle.close()
+
+
+def parse_range(header, size):
+    """Return (start, end) inclusive for a single-range header, None to send
+    the whole file, or False if the range cannot be satisfied.
+
+    Multi-range requests are answered with the whole file, which RFC 9110 allows.
+    """
+    match = _RANGE.match(header.replace(' ', ''))
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:  # suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def _etag_matches(header, etag):
+    tags = parse_etags(header)
+    # If-None-Match uses weak comparison
+    return '*' in tags or any(tag.removeprefix('W/') == etag for tag in tags)
+
+
+def serve_file(request, field_file, filename, etag, content_type=None, as_attachment=False):
+    """Respond with ``field_file`` honouring If-None-Match, Range and If-Range."""
+    etag = quote_etag(etag)
+    content_type = content_type or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    headers = {
+        'ETag': etag,
+        'Cache-Control': f'private, max-age={settings.DOCUMENT_DOWNLOAD_MAX_AGE}',
+        'Accept-Ranges': 'bytes',
+    }
+
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return HttpResponseNotModified(headers=headers)
+
+    backend = settings.DOCUMENT_SENDFILE_BACKEND
+    if backend:
+        response = HttpResponse(content_type=content_type, headers=headers)
+        response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+        if backend == 'nginx':
+            response['X-Accel-Redirect'] = settings.DOCUMENT_SENDFILE_URL.rstrip('/') + '/' + field_file.name
+        else:
+            response['X-Sendfile'] = field_file.path
+        return response
+
+    try:
+        handle = field_file.storage.open(field_file.name, 'rb')
+    except FileNotFoundError:
+        return HttpResponse(status=404)
+    size = os.fstat(handle.fileno()).st_size
+
+    byte_range = None
+    range_header = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    if range_header and (not if_range or if_range == etag):
+        byte_range = parse_range(range_header, size)
+    if byte_range is False:
+        handle.close()
+        headers['Content-Range'] = f'bytes */{size}'
+        return HttpResponse(status=416, headers=headers)
+
+    if byte_range is None:
+        response = FileResponse(
+            handle, as_attachment=as_attachment, filename=filename, content_type=content_type, headers=headers
+        )
+    else:
+        start, end = byte_range
+        response = FileResponse(
+            FileRange(handle, start, end - start + 1), as_attachment=as_attachment, filename=filename,
+            content_type=content_type, status=206, headers=headers,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    return response
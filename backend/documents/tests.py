@@ -1,3 +1,264 @@
-from django.test import TestCase
+import gc
+import os
+import shutil
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from applications.models import ApplicationDocument
+from authentication.models import User
+from messaging.models import Conversation, Message, MessageAttachment
+from applications.tests import ApplicationTestMixin
+from .management.commands import gc_media
+from .models import DocumentBlob
+
+TEST_MEDIA_ROOT = '/tmp/college_portal_test_media'
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT)
+class DocumentBlobTests(ApplicationTestMixin, TestCase):
+    def tearDown(self):
+        shutil.rmtree(TEST_MEDIA_ROOT, ignore_errors=True)
+
+    def test_identical_uploads_share_one_file(self):
+        content = b'%PDF-1.4 same marksheet'
+        first, second = self.create_application(1), self.create_application(2)
+        documents = []
+        for application in (first, second):
+            blob = DocumentBlob.objects.store(SimpleUploadedFile('marks.pdf', content))
+            documents.append(ApplicationDocument.objects.create(
+                application=application, document_type=self.marksheet, file=blob.file.name,
+                blob=blob, original_filename='marks.pdf', file_size=len(content),
+            ))
+
+        blob = DocumentBlob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(documents[0].file.name, documents[1].file.name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            documents[0].delete()
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 1)
+        self.assertTrue(blob.file.storage.exists(blob.file.name))
+
+        # Cascading from the application releases the last reference too
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(DocumentBlob.objects.exists())
+        self.assertFalse(blob.file.storage.exists(blob.file.name))
+
+    def test_rolled_back_store_leaves_no_file(self):
+        application = self.create_application(1)
+        self.attach_document(application, self.marksheet)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            blob = DocumentBlob.objects.store(SimpleUploadedFile('marks.pdf', b'%PDF-1.4 second copy'))
+            self.assertTrue(blob.file.storage.exists(blob.file.name))
+            # The unique (application, document_type) pair is already taken
+            ApplicationDocument.objects.create(
+                application=application, document_type=self.marksheet, file=blob.file.name,
+                blob=blob, original_filename='marks.pdf', file_size=blob.size,
+            )
+        self.assertFalse(DocumentBlob.objects.exists())
+        self.assertFalse(blob.file.storage.exists(blob.file.name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            kept = DocumentBlob.objects.store(SimpleUploadedFile('marks.pdf', b'%PDF-1.4 committed'))
+        gc.collect()
+        self.assertTrue(kept.file.storage.exists(kept.file.name))
+
+    def test_dedupe_command_adopts_legacy_files_in_place(self):
+        content = b'%PDF-1.4 legacy'
+        legacy = []
+        for index in range(3):
+            application = self.create_application(index)
+            legacy.append(ApplicationDocument.objects.create(
+                application=application, document_type=self.marksheet,
+                file=SimpleUploadedFile('marks.pdf', content), original_filename='marks.pdf', file_size=len(content),
+            ))
+        original_name = legacy[0].file.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('dedupe_documents', stdout=StringIO())
+
+        blob = DocumentBlob.objects.get()
+        self.assertEqual(blob.ref_count, 3)
+        self.assertEqual(blob.file.name, original_name)
+        self.assertEqual(set(ApplicationDocument.objects.values_list('file', flat=True)), {original_name})
+        for document in legacy[1:]:
+            self.assertFalse(document.file.storage.exists(document.file.name))
+
+    def test_gc_media_removes_only_old_unreferenced_files(self):
+        content = b'%PDF-1.4 kept'
+        blob = DocumentBlob.objects.store(SimpleUploadedFile('marks.pdf', content))
+        kept = os.path.join(TEST_MEDIA_ROOT, blob.file.name)
+        old_orphan = os.path.join(TEST_MEDIA_ROOT, 'applications', '7', 'gone', 'old.pdf')
+        new_orphan = os.path.join(TEST_MEDIA_ROOT, 'applications', '7', 'gone', 'new.pdf')
+        os.makedirs(os.path.dirname(old_orphan))
+        for path in (old_orphan, new_orphan):
+            with open(path, 'wb') as handle:
+                handle.write(b'orphan')
+        os.utime(old_orphan, (0, 0))
+        os.utime(kept, (0, 0))
+
+        call_command('gc_media', '--delete', '--dry-run', stdout=StringIO())
+        self.assertTrue(os.path.exists(old_orphan))
+
+        out = StringIO()
+        call_command('gc_media', '--delete', stdout=out)
+        self.assertIn('Deleted 1 orphaned files', out.getvalue())
+        self.assertFalse(os.path.exists(old_orphan))
+        self.assertTrue(os.path.exists(new_orphan))
+        self.assertTrue(os.path.exists(kept))
+
+
+    def test_gc_media_keeps_files_referenced_after_the_initial_load(self):
+        blob = DocumentBlob.objects.store(SimpleUploadedFile('marks.pdf', b'%PDF-1.4 late'))
+        kept = os.path.join(TEST_MEDIA_ROOT, blob.file.name)
+        os.utime(kept, (0, 0))
+
+        # The row appears between loading the reference set and the walk
+        with mock.patch.object(gc_media.Command, 'load_references', return_value=set()):
+            out = StringIO()
+            call_command('gc_media', '--delete', stdout=out)
+        self.assertIn('Deleted 0 orphaned files', out.getvalue())
+        self.assertTrue(os.path.exists(kept))
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT, DOCUMENT_PIPELINE_EAGER=True, DOCUMENT_MAX_IMAGE_DIMENSION=400)
+class DocumentPipelineTests(ApplicationTestMixin, TestCase):
+    def setUp(self):
+        self.application = self.create_application(1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.application.user)
+
+    def tearDown(self):
+        shutil.rmtree(TEST_MEDIA_ROOT, ignore_errors=True)
+
+    def upload(self, name, content):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('document-upload'), {
+                'application': str(self.application.id),
+                'document_type': self.photo.id,
+                'file': SimpleUploadedFile(name, content),
+            }, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        return ApplicationDocument.objects.get(pk=response.data['id'])
+
+    def test_oversized_scan_is_recompressed_and_thumbnailed(self):
+        buffer = BytesIO()
+        Image.frombytes('RGB', (800, 200), os.urandom(800 * 200 * 3)).save(buffer, 'PNG')
+        original = buffer.getvalue()
+
+        document = self.upload('photo.png', original)
+
+        self.assertEqual(document.processing_status, 'processed')
+        self.assertEqual(document.detected_content_type, 'image/png')
+        self.assertEqual(document.page_count, 1)
+        self.assertLess(document.file_size, len(original))
+        with document.file.open('rb') as handle, Image.open(handle) as image:
+            self.assertEqual(image.size, (400, 100))
+        # The original blob was only referenced by this upload
+        self.assertEqual(DocumentBlob.objects.get().pk, document.blob_id)
+        with document.thumbnail.open('rb') as handle, Image.open(handle) as image:
+            self.assertLessEqual(max(image.size), 256)
+
+    def test_pdf_pages_counted_and_mislabelled_files_rejected(self):
+        pdf = (b'%PDF-1.4\n1 0 obj << /Type /Pages /Kids [2 0 R 3 0 R] /Count 2 >> endobj\n'
+               b'2 0 obj << /Type /Page /Parent 1 0 R >> endobj\n3 0 obj << /Type /Page >> endobj\n%%EOF')
+        document = self.upload('marks.pdf', pdf)
+        self.assertEqual(document.processing_status, 'processed')
+        self.assertEqual(document.page_count, 2)
+        self.assertFalse(document.thumbnail)
+
+        document.delete()
+        document = self.upload('photo.jpg', pdf)
+        self.assertEqual(document.processing_status, 'rejected')
+        self.assertEqual(document.detected_content_type, 'application/pdf')
+        self.assertIn('PDF', document.processing_error)
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT)
+class DocumentDownloadTests(ApplicationTestMixin, TestCase):
+    content = b'%PDF-1.4 0123456789'
+
+    def setUp(self):
+        self.application = self.create_application(1)
+        blob = DocumentBlob.objects.store(SimpleUploadedFile('marks.pdf', self.content))
+        self.document = ApplicationDocument.objects.create(
+            application=self.application, document_type=self.marksheet, file=blob.file.name,
+            blob=blob, original_filename='marks.pdf', file_size=len(self.content),
+        )
+        self.url = reverse('application-document-download', args=[self.document.pk])
+        self.client = APIClient()
+        self.client.force_authenticate(self.application.user)
+
+    def tearDown(self):
+        shutil.rmtree(TEST_MEDIA_ROOT, ignore_errors=True)
+
+    def test_full_conditional_and_range_requests(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['ETag'], f'"{self.document.blob_id}"')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=9-12')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 9-12/{len(self.content)}')
+        self.assertEqual(b''.join(response.streaming_content), b'0123')
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-3')
+        self.assertEqual(b''.join(response.streaming_content), b'789')
+
+        # A stale If-Range gets the whole, current file
+        response = self.client.get(self.url, HTTP_RANGE='bytes=9-12', HTTP_IF_RANGE='"old"')
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=500-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+
+    def test_access_is_limited_to_owner_and_staff(self):
+        self.client.force_authenticate(self.create_application(2).user)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+        self.client.force_authenticate(self.officer)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+    @override_settings(DOCUMENT_SENDFILE_BACKEND='nginx')
+    def test_transfer_is_offloaded_to_the_proxy(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.document.file.name}')
+        self.assertEqual(response.content, b'')
+
+    def test_message_attachment_only_for_participants(self):
+        conversation = Conversation.objects.create(
+            officer=self.officer, applicant=self.application.user, application=self.application
+        )
+        message = Message.objects.create(conversation=conversation, sender=self.officer, content='See attached')
+        attachment = MessageAttachment.objects.create(
+            message=message, file=SimpleUploadedFile('offer.pdf', self.content), filename='offer.pdf',
+            file_size=len(self.content),
+        )
+        url = reverse('message-attachment-download', args=[attachment.pk])
+
+        response = self.client.get(url, {'download': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('attachment; filename="offer.pdf"', response['Content-Disposition'])
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+
+        self.client.force_authenticate(User.objects.create_user(username='other', role='admission_officer'))
+        self.assertEqual(self.client.get(url).status_code, 404)
@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('applications/<int:pk>/', views.application_document_download, name='application-document-download'),
+    path('applications/<int:pk>/thumbnail/', views.application_document_thumbnail, name='application-document-thumbnail'),
+    path('attachments/<int:pk>/', views.message_attachment_download, name='message-attachment-download'),
+]
@@ -1,3 +1,80 @@
-from django.shortcuts import render
+import os
 
-# Create your views here.
+from django.db.models import Q
+from rest_framework import permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from applications.models import ApplicationDocument
+from messaging.models import MessageAttachment
+from .serving import serve_file
+
+STAFF_ROLES = ['admin', 'admission_officer']
+
+
+def _stat_etag(field_file):
+    """Validator for files that are not content-addressed: size and mtime."""
+    stat = os.stat(field_file.path)
+    return f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+
+def _wants_attachment(request):
+    return request.query_params.get('download') in ['1', 'true', 'yes']
+
+
+def _get_application_document(request, pk):
+    documents = ApplicationDocument.objects.select_related('application').only(
+        'file', 'blob_id', 'original_filename', 'detected_content_type', 'thumbnail', 'application__user_id'
+    )
+    # Applicants may only fetch their own uploads; officers and admins see all
+    if request.user.role not in STAFF_ROLES:
+        documents = documents.filter(application__user=request.user)
+    return documents.filter(pk=pk).first()
+
+
+@api_view(['GET', 'HEAD'])
+@permission_classes([permissions.IsAuthenticated])
+def application_document_download(request, pk: int):
+    """Serve an uploaded application document to its applicant or to staff."""
+    document = _get_application_document(request, pk)
+    if document is None or not document.file:
+        return Response({'error': 'Document not found'}, status=404)
+    try:
+        etag = document.blob_id or _stat_etag(document.file)
+    except FileNotFoundError:
+        return Response({'error': 'Document not found'}, status=404)
+    return serve_file(
+        request, document.file, document.original_filename, etag,
+        content_type=document.detected_content_type or None, as_attachment=_wants_attachment(request),
+    )
+
+
+@api_view(['GET', 'HEAD'])
+@permission_classes([permissions.IsAuthenticated])
+def application_document_thumbnail(request, pk: int):
+    """Serve the preview generated by the processing pipeline."""
+    document = _get_application_document(request, pk)
+    if document is None or not document.thumbnail:
+        return Response({'error': 'Thumbnail not found'}, status=404)
+    try:
+        etag = _stat_etag(document.thumbnail)
+    except FileNotFoundError:
+        return Response({'error': 'Thumbnail not found'}, status=404)
+    return serve_file(request, document.thumbnail, 'thumbnail.jpg', etag, content_type='image/jpeg')
+
+
+@api_view(['GET', 'HEAD'])
+@permission_classes([permissions.IsAuthenticated])
+def message_attachment_download(request, pk: int):
+    """Serve a message attachment to the two participants of its conversation."""
+    user = request.user
+    attachment = MessageAttachment.objects.filter(
+        Q(message__conversation__officer=user) | Q(message__conversation__applicant=user), pk=pk
+    ).only('file', 'filename').first()
+    if attachment is None or not attachment.file:
+        return Response({'error': 'Attachment not found'}, status=404)
+    try:
+        etag = _stat_etag(attachment.file)
+    except FileNotFoundError:
+        return Response({'error': 'Attachment not found'}, status=404)
+    return serve_file(request, attachment.file, attachment.filename, etag, as_attachment=_wants_attachment(request))
@@ -1,8 +1,26 @@
 from django.db import models
+from django.db.models import Count, F, Prefetch, Q
 from django.conf import settings
 from django.utils import timezone
 
 
+class ConversationQuerySet(models.QuerySet):
+    def with_summary(self, user):
+        """Participants, message totals, unread count for ``user`` and the latest message, in three queries."""
+        unread_sender = 'applicant' if user.role == 'admission_officer' else 'officer'
+        # Meta.ordering is not applied to aggregating queries, so restate it
+        return self.select_related('officer', 'applicant').order_by('-updated_at').annotate(
+            messages_total=Count('messages'),
+            unread_messages=Count(
+                'messages', filter=Q(messages__is_read=False, messages__sender=F(unread_sender))
+            ),
+        ).prefetch_related(Prefetch(
+            'messages',
+            queryset=Message.objects.select_related('sender').prefetch_related('attachments')[:1],
+            to_attr='latest_messages',
+        ))
+
+
 class Conversation(models.Model):
     """
     Represents a conversation between an officer and an applicant
@@ -30,6 +48,8 @@ class Conversation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+
+    objects = ConversationQuerySet.as_manager()
     
     class Meta:
         unique_together = ['officer', 'applicant', 'application']
@@ -40,6 +60,8 @@ class Conversation(models.Model):
     
     @property
     def last_message(self):
+        if hasattr(self, 'latest_messages'):
+            return self.latest_messages[0] if self.latest_messages else None
         return self.messages.first()
     
     @property
@@ -72,6 +94,10 @@ class Message(models.Model):
     
     class Meta:
         ordering = ['-sent_at']
+        indexes = [
+            # Keyset for cursor pagination of a conversation's messages
+            models.Index(fields=['conversation', 'sent_at', 'id'], name='message_conv_sent_id_idx'),
+        ]
     
     def __str__(self):
         return f"Message from {self.sender.username} at {self.sent_at}"
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.urls import reverse
 from .models import Conversation, Message, MessageAttachment
 
 User = get_user_model()
@@ -18,9 +19,14 @@ class UserBasicSerializer(serializers.ModelSerializer):
 
 
 class MessageAttachmentSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
     class Meta:
         model = MessageAttachment
-        fields = ['id', 'filename', 'file', 'file_size', 'uploaded_at']
+        fields = ['id', 'filename', 'file', 'file_size', 'uploaded_at', 'download_url']
+
+    def get_download_url(self, obj):
+        return reverse('message-attachment-download', args=[obj.pk])
 
 
 class MessageSerializer(serializers.ModelSerializer):
@@ -56,6 +62,8 @@ class ConversationSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at']
     
     def get_unread_count(self, obj):
+        if hasattr(obj, 'unread_messages'):
+            return obj.unread_messages
         request = self.context.get('request')
         if not request or not request.user:
             return 0
@@ -67,6 +75,8 @@ class ConversationSerializer(serializers.ModelSerializer):
         return 0
     
     def get_messages_count(self, obj):
+        if hasattr(obj, 'messages_total'):
+            return obj.messages_total
         return obj.messages.count()
 
 
@@ -2,9 +2,10 @@ from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.db.models import Count, F, Prefetch, Q, prefetch_related_objects
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from college_portal.pagination import CursorPaginationMixin, SentAtCursorPagination
 from .models import Conversation, Message
 from .serializers import (
     ConversationSerializer, ConversationCreateSerializer, ConversationDetailSerializer,
@@ -29,9 +30,9 @@ class ConversationListCreateView(generics.ListCreateAPIView):
     def get_queryset(self):
         user = self.request.user
         if user.role == 'admission_officer':
-            return Conversation.objects.filter(officer=user, is_active=True)
+            return Conversation.objects.filter(officer=user, is_active=True).with_summary(user)
         elif user.role == 'applicant':
-            return Conversation.objects.filter(applicant=user, is_active=True)
+            return Conversation.objects.filter(applicant=user, is_active=True).with_summary(user)
         return Conversation.objects.none()
     
     def perform_create(self, serializer):
@@ -53,9 +54,9 @@ class ConversationDetailView(generics.RetrieveUpdateAPIView):
     def get_queryset(self):
         user = self.request.user
         if user.role == 'admission_officer':
-            return Conversation.objects.filter(officer=user)
+            return Conversation.objects.filter(officer=user).select_related('officer', 'applicant')
         elif user.role == 'applicant':
-            return Conversation.objects.filter(applicant=user)
+            return Conversation.objects.filter(applicant=user).select_related('officer', 'applicant')
         return Conversation.objects.none()
     
     def retrieve(self, request, *args, **kwargs):
@@ -77,14 +78,19 @@ class ConversationDetailView(generics.RetrieveUpdateAPIView):
                 is_read=False
             ).update(is_read=True, read_at=timezone.now())
         
-        return super().retrieve(request, *args, **kwargs)
+        # Load the thread after marking it read so the response reflects the update
+        prefetch_related_objects([conversation], Prefetch(
+            'messages', queryset=Message.objects.select_related('sender').prefetch_related('attachments')
+        ))
+        return Response(self.get_serializer(conversation).data)
 
 
-class MessageListCreateView(generics.ListCreateAPIView):
+class MessageListCreateView(CursorPaginationMixin, generics.ListCreateAPIView):
     """
     List messages in a conversation or send a new message
     """
     permission_classes = [permissions.IsAuthenticated]
+    cursor_pagination_class = SentAtCursorPagination
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -97,11 +103,16 @@ class MessageListCreateView(generics.ListCreateAPIView):
         
         # Check if user is part of this conversation
         user = self.request.user
-        if user not in [conversation.officer, conversation.applicant]:
+        if user.pk not in (conversation.officer_id, conversation.applicant_id):
             from rest_framework.exceptions import PermissionDenied
             raise PermissionDenied("You don't have access to this conversation")
         
-        return Message.objects.filter(conversation=conversation).order_by('-sent_at')
+        return (
+            Message.objects.filter(conversation=conversation)
+            .select_related('sender')
+            .prefetch_related('attachments')
+            .order_by('-sent_at')
+        )
     
     def perform_create(self, serializer):
         conversation_id = self.kwargs['conversation_id']
@@ -109,7 +120,7 @@ class MessageListCreateView(generics.ListCreateAPIView):
         
         # Check if user is part of this conversation
         user = self.request.user
-        if user not in [conversation.officer, conversation.applicant]:
+        if user.pk not in (conversation.officer_id, conversation.applicant_id):
             from rest_framework.exceptions import PermissionDenied
             raise PermissionDenied("You don't have access to this conversation")
         
@@ -127,20 +138,20 @@ class MessageListCreateView(generics.ListCreateAPIView):
 @permission_classes([permissions.IsAuthenticated])
 def mark_message_read(request, message_id):
     """Mark a specific message as read"""
-    message = get_object_or_404(Message, id=message_id)
+    message = get_object_or_404(Message.objects.select_related('conversation'), id=message_id)
     
     # Check if user is the recipient of this message
     conversation = message.conversation
     user = request.user
     
-    if user not in [conversation.officer, conversation.applicant]:
+    if user.pk not in (conversation.officer_id, conversation.applicant_id):
         return Response(
             {'error': 'You don\'t have access to this message'}, 
             status=status.HTTP_403_FORBIDDEN
         )
     
     # Only mark as read if the user is not the sender
-    if message.sender != user:
+    if message.sender_id != user.pk:
         message.mark_as_read()
         return Response({'message': 'Message marked as read'})
     
@@ -155,18 +166,18 @@ def conversation_stats(request):
     
     if user.role == 'admission_officer':
         conversations = Conversation.objects.filter(officer=user, is_active=True)
-        unread_count = sum(conv.unread_count_for_officer for conv in conversations)
+        unread_sender = 'applicant'
     elif user.role == 'applicant':
         conversations = Conversation.objects.filter(applicant=user, is_active=True)
-        unread_count = sum(conv.unread_count_for_applicant for conv in conversations)
+        unread_sender = 'officer'
     else:
-        conversations = Conversation.objects.none()
-        unread_count = 0
+        return Response({'total_conversations': 0, 'unread_messages': 0})
     
-    return Response({
-        'total_conversations': conversations.count(),
-        'unread_messages': unread_count,
-    })
+    stats = conversations.aggregate(
+        total_conversations=Count('id', distinct=True),
+        unread_messages=Count('messages', filter=Q(messages__is_read=False, messages__sender=F(unread_sender))),
+    )
+    return Response(stats)
 
 
 @api_view(['GET'])
@@ -1,6 +1,12 @@
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from applications.models import Application
+from .catalog import applications_version, catalog_version, seats_version
 from .models import Department, Program
 from .serializers import DepartmentSerializer
 
@@ -48,21 +54,51 @@ def department_statistics(request):
     """Get department statistics"""
     if request.user.role != 'admin':
         return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
-    
-    departments = Department.objects.all()
+
+    # Valid until the catalog, seats or any application change
+    key = f'department-statistics:{catalog_version()}:{seats_version()}:{applications_version()}'
+    stats = cache.get(key)
+    if stats is None:
+        stats = _department_statistics()
+        cache.set(key, stats, settings.CATALOG_CACHE_TIMEOUT)
+    return Response(stats)
+
+
+def _department_statistics():
+    """Programs, applications per status and seat fill of every department, in one query."""
+    def program_total(field):
+        total = Program.objects.filter(department=OuterRef('pk')).values('department').annotate(
+            total=Sum(field)
+        ).values('total')
+        return Coalesce(Subquery(total), 0)
+
+    statuses = [value for value, _ in Application.APPLICATION_STATUS]
+    departments = Department.objects.annotate(
+        total_programs=Count('programs', distinct=True),
+        active_programs=Count('programs', filter=Q(programs__status='active'), distinct=True),
+        total_applications=Count('programs__applications'),
+        # Seat totals come from subqueries: summed over the application join they would be multiplied
+        intake_capacity=program_total('intake_capacity'),
+        occupied_seats=program_total('occupied_seats'),
+        **{
+            f'applications_{value}': Count('programs__applications', filter=Q(programs__applications__status=value))
+            for value in statuses
+        },
+    ).order_by('name', 'id')
+
     stats = []
-    
     for dept in departments:
-        program_count = dept.programs.count()
-        active_programs = dept.programs.filter(status='active').count()
-        
         stats.append({
             'id': dept.id,
             'name': dept.name,
             'code': dept.code,
-            'total_programs': program_count,
-            'active_programs': active_programs,
+            'total_programs': dept.total_programs,
+            'active_programs': dept.active_programs,
+            'total_applications': dept.total_applications,
+            'applications_by_status': {value: getattr(dept, f'applications_{value}') for value in statuses},
+            'intake_capacity': dept.intake_capacity,
+            'occupied_seats': dept.occupied_seats,
+            'seat_fill_rate': round(100 * dept.occupied_seats / dept.intake_capacity, 1) if dept.intake_capacity else 0.0,
             'created_at': dept.created_at
         })
-    
-    return Response(stats)
+    return stats
@@ -0,0 +1,158 @@
+"""Versioned response cache for the public program catalog.
+
+Every catalog response is cached under the current catalog version, which
+is bumped (after commit) whenever a program, department or required
+document is saved or deleted. A bump makes every older entry unreachable,
+so nothing has to be invalidated key by key. Seats move with every submit
+and status change, so they have a version of their own: only the views
+that show ``available_seats`` key on it as well.
+
+Entries are keyed on the path and only the query parameters the view reads,
+in a fixed order, so unknown or reordered parameters reuse one entry instead
+of filling the cache. Entries carry a strong ETag (a hash of the body). The wrapper runs before
+DRF dispatch, so a matching ``If-None-Match`` is answered with a 304 from a
+cache read alone, without authentication or ORM work.
+"""
+import hashlib
+import time
+from functools import partial, wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Min, Q
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, urlencode
+
+VERSION_KEY = 'catalog:version'
+# Moves whenever applications change; reads that aggregate them key on both
+APPLICATIONS_VERSION_KEY = 'applications:version'
+# Moves whenever a program's occupied seat counter does
+SEATS_VERSION_KEY = 'seats:version'
+# Read by DRF for every view (content negotiation)
+COMMON_PARAMS = ('format',)
+
+
+def _version(key):
+    version = cache.get(key)
+    if version is None:
+        # Start from the clock rather than 1, so an emptied cache never
+        # reissues a version (and ETags) that clients may still hold
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def catalog_version():
+    return _version(VERSION_KEY)
+
+
+def applications_version():
+    return _version(APPLICATIONS_VERSION_KEY)
+
+
+def seats_version():
+    return _version(SEATS_VERSION_KEY)
+
+
+def bump_catalog_version():
+    """Invalidate every cached catalog response once the current transaction commits.
+
+    Bumping before the commit would let a concurrent request cache the old
+    rows under the new version.
+    """
+    transaction.on_commit(partial(_bump, VERSION_KEY))
+
+
+def bump_applications_version():
+    """Invalidate cached application rollups once the current transaction commits."""
+    transaction.on_commit(partial(_bump, APPLICATIONS_VERSION_KEY))
+
+
+def bump_seats_version():
+    """Invalidate cached seat availability once the current transaction commits."""
+    transaction.on_commit(partial(_bump, SEATS_VERSION_KEY))
+
+
+def _entry_timeout():
+    """Seconds an entry may live: never past the next application window opening or closing."""
+    from .models import Program
+    now = timezone.now()
+    upcoming = Program.objects.aggregate(
+        start=Min('application_start_date', filter=Q(application_start_date__gt=now)),
+        end=Min('application_end_date', filter=Q(application_end_date__gt=now)),
+    )
+    timeout = settings.CATALOG_CACHE_TIMEOUT
+    for moment in upcoming.values():
+        if moment is not None:
+            timeout = min(timeout, max(1, int((moment - now).total_seconds())))
+    return timeout
+
+
+def _etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    return bool(header) and (etag in parse_etags(header) or header.strip() == '*')
+
+
+def _finish(response, etag):
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'  # clients may keep it, but must revalidate
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def _cache_key(request, params, seats):
+    query = urlencode([
+        (name, value) for name in sorted({*params, *COMMON_PARAMS}) for value in request.GET.getlist(name)
+    ])
+    # Hashed, so a long search string cannot exceed a backend's key length limit
+    digest = hashlib.sha256(query.encode()).hexdigest()[:32]
+    version = f'{catalog_version()}:{seats_version()}' if seats else catalog_version()
+    return f'catalog:{version}:{request.path}:{digest}'
+
+
+def catalog_cache(*params, seats=False):
+    """Serve JSON GET responses of the decorated view from the versioned catalog cache.
+
+    ``params`` names every query parameter the view's response depends on;
+    any other parameter is left out of the cache key. Views whose response
+    shows seat availability pass ``seats=True`` to also key on the seats version.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            # The browsable API (HTML) and writes go straight to the view
+            if request.method not in ('GET', 'HEAD') or 'text/html' in request.META.get('HTTP_ACCEPT', ''):
+                return view(request, *args, **kwargs)
+
+            key = _cache_key(request, params, seats)
+            entry = cache.get(key)
+            if entry is not None:
+                etag, content_type, body = entry
+                if _etag_matches(request, etag):
+                    return _finish(HttpResponseNotModified(), etag)
+                return _finish(HttpResponse(body, content_type=content_type), etag)
+
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            if hasattr(response, 'render'):
+                response.render()  # DRF sets the content type while rendering
+            if not response.get('Content-Type', '').startswith('application/json'):
+                return response
+            etag = f'"{hashlib.sha256(response.content).hexdigest()[:32]}"'
+            cache.set(key, (etag, response['Content-Type'], response.content), _entry_timeout())
+            if _etag_matches(request, etag):
+                return _finish(HttpResponseNotModified(), etag)
+            return _finish(response, etag)
+        return wrapper
+    return decorator
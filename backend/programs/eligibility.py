@@ -0,0 +1,101 @@
+"""In-memory index answering "which open programs do my marks qualify me for?".
+
+Active programs are grouped by type and sorted by ``min_percentage``, so the
+programs an applicant qualifies for are a prefix of each list, found with
+``bisect``. The index is rebuilt in each process when the catalog version
+moves (any program or department change); when only seats moved, just the
+seat counts are reloaded. A lookup touches no table.
+"""
+import threading
+from bisect import bisect_right
+from collections import defaultdict
+
+from django.utils import timezone
+
+from .catalog import catalog_version, seats_version
+from .models import Program
+
+# Which mark each program type's ``min_percentage`` applies to
+QUALIFYING_LEVEL = {
+    'undergraduate': 'twelfth',
+    'postgraduate': 'graduation',
+    'diploma': 'tenth',
+    'certificate': 'tenth',
+}
+LEVELS = ('tenth', 'twelfth', 'graduation')
+
+
+class EligibilityIndex:
+    def __init__(self, programs):
+        by_type, self.seats = defaultdict(list), {}
+        for program in programs:
+            by_type[program.program_type].append(program)
+            self.seats[program.id] = program.available_seats
+        self.keys, self.programs = {}, {}
+        for program_type, group in by_type.items():
+            group.sort(key=lambda program: program.min_percentage)
+            self.keys[program_type] = [program.min_percentage for program in group]
+            self.programs[program_type] = [
+                {
+                    'id': program.id,
+                    'name': program.name,
+                    'code': program.code,
+                    'department_name': program.department.name,
+                    'program_type': program.program_type,
+                    'qualifying_level': QUALIFYING_LEVEL.get(program.program_type),
+                    'min_percentage': program.min_percentage,
+                    'application_start_date': program.application_start_date,
+                    'application_end_date': program.application_end_date,
+                }
+                for program in group
+            ]
+
+    @classmethod
+    def build(cls):
+        return cls(Program.objects.filter(status='active').select_related('department'))
+
+    def refresh_seats(self):
+        """Reload only the seat counts, for a seat move that left the catalog as it was."""
+        self.seats = {
+            pk: max(0, capacity - occupied)
+            for pk, capacity, occupied in Program.objects.filter(pk__in=self.seats).values_list(
+                'pk', 'intake_capacity', 'occupied_seats'
+            )
+        }
+
+    def eligible(self, percentages, now=None):
+        """Programs open at ``now`` whose minimum the matching mark in ``percentages`` meets."""
+        now = now or timezone.now()
+        seats = self.seats
+        results = []
+        for program_type, level in QUALIFYING_LEVEL.items():
+            percentage = percentages.get(level)
+            if percentage is None or program_type not in self.keys:
+                continue
+            qualified = self.programs[program_type][:bisect_right(self.keys[program_type], percentage)]
+            results.extend(
+                {**program, 'available_seats': seats.get(program['id'], 0)} for program in qualified
+                if program['application_start_date'] <= now <= program['application_end_date']
+            )
+        results.sort(key=lambda program: (program['name'], program['id']))
+        return results
+
+
+_index = None  # (catalog version, seats version, EligibilityIndex)
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """This process's index, rebuilt if the catalog changed since it was built."""
+    global _index
+    versions = (catalog_version(), seats_version())
+    current = _index
+    if current is None or current[:2] != versions:
+        with _index_lock:
+            current = _index
+            if current is None or current[0] != versions[0]:
+                current = _index = (*versions, EligibilityIndex.build())
+            elif current[1] != versions[1]:
+                current[2].refresh_seats()
+                current = _index = (*versions, current[2])
+    return current[2]
@@ -0,0 +1,57 @@
+import django_filters
+from django.db.models import Case, FloatField, Q, Value, When
+from rest_framework import filters
+
+from . import search
+from .models import Program
+
+
+class ProgramFilter(django_filters.FilterSet):
+    """Program list filters; ``available_seats`` and ``is_open`` need ``with_availability()``."""
+    available_seats = django_filters.RangeFilter(field_name='seats_left')
+    is_open = django_filters.BooleanFilter()
+
+    class Meta:
+        model = Program
+        fields = ['program_type', 'department', 'status']
+
+
+class ProgramSearchFilter(filters.BaseFilterBackend):
+    """``?search=``: typo-tolerant ranked search over the catalog index.
+
+    Hits are annotated with ``search_rank``. Databases without an index fall
+    back to ``icontains`` over the view's ``search_fields``.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        hits = search.ranked_program_ids(query)
+        if hits is None:
+            condition = Q()
+            for field in getattr(view, 'search_fields', []):
+                condition |= Q(**{f'{field}__icontains': query})
+            return queryset.filter(condition)
+        if not hits:
+            return queryset.none()
+        rank = Case(*(When(pk=pk, then=Value(float(score))) for pk, score in hits), output_field=FloatField())
+        return queryset.filter(pk__in=[pk for pk, _ in hits]).annotate(search_rank=rank)
+
+
+class ProgramOrderingFilter(filters.OrderingFilter):
+    """Best search matches first unless the client asks for another ordering."""
+    # Public ordering names of annotations stored under another name
+    aliases = {'available_seats': 'seats_left'}
+
+    def get_ordering(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param) and 'search_rank' in queryset.query.annotations:
+            return ['-search_rank', 'name']
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering is None:
+            return None
+        return [
+            ('-' if term.startswith('-') else '') + self.aliases.get(term.lstrip('-'), term.lstrip('-'))
+            for term in ordering
+        ]
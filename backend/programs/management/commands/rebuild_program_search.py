@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from programs.search import get_backend, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the search index over the program catalog'
+
+    def handle(self, *args, **options):
+        if get_backend() is None:
+            self.stdout.write(self.style.WARNING('This database has no program search index; nothing to rebuild'))
+            return
+        with transaction.atomic():
+            total = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} programs'))
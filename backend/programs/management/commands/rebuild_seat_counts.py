@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from programs.models import Program
+
+
+class Command(BaseCommand):
+    help = 'Recompute the occupied seat counter on programs from their applications'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--program', type=int, help='Only rebuild this program id')
+
+    def handle(self, *args, **options):
+        programs = Program.objects.all()
+        if options['program']:
+            programs = programs.filter(pk=options['program'])
+        total = programs.refresh_seat_counts()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt seat counts for {total} programs'))
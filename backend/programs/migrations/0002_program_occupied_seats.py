@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:04
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+SEAT_HOLDING_STATUSES = ['submitted', 'under_review', 'shortlisted', 'admitted']
+
+
+def backfill_occupied_seats(apps, schema_editor):
+    Program = apps.get_model('programs', 'Program')
+    Application = apps.get_model('applications', 'Application')
+    occupied = Application.objects.filter(
+        program=OuterRef('pk'), status__in=SEAT_HOLDING_STATUSES
+    ).values('program').annotate(total=Count('pk')).values('total')
+    Program.objects.update(occupied_seats=Coalesce(Subquery(occupied), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('programs', '0001_initial'),
+        ('applications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='program',
+            name='occupied_seats',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_occupied_seats, migrations.RunPython.noop),
+    ]
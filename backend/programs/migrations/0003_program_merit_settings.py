@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:06
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('programs', '0002_program_occupied_seats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='program',
+            name='merit_weight_graduation',
+            field=models.FloatField(default=0.3, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.AddField(
+            model_name='program',
+            name='merit_weight_tenth',
+            field=models.FloatField(default=0.2, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.AddField(
+            model_name='program',
+            name='merit_weight_twelfth',
+            field=models.FloatField(default=0.5, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.AddField(
+            model_name='program',
+            name='shortlist_factor',
+            field=models.FloatField(default=1.5, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+    ]
@@ -0,0 +1,60 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.execute(
+            'CREATE TABLE programs_program_search ('
+            ' program_id bigint PRIMARY KEY'
+            ' REFERENCES programs_program (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,'
+            ' names text NOT NULL,'
+            ' document tsvector NOT NULL)'
+        )
+        schema_editor.execute(
+            'CREATE INDEX programs_program_search_gin ON programs_program_search USING GIN (document)'
+        )
+        schema_editor.execute(
+            'CREATE INDEX programs_program_search_trgm ON programs_program_search USING GIN (names gin_trgm_ops)'
+        )
+        schema_editor.execute(
+            'CREATE INDEX programs_program_name_trgm ON programs_program USING GIN (name gin_trgm_ops)'
+        )
+        schema_editor.execute(
+            "INSERT INTO programs_program_search (program_id, names, document) "
+            "SELECT p.id, p.name || ' ' || p.code || ' ' || d.name, "
+            " setweight(to_tsvector('english', p.name), 'A') || setweight(to_tsvector('simple', p.code), 'A')"
+            " || setweight(to_tsvector('english', d.name), 'B') || setweight(to_tsvector('english', p.description), 'C') "
+            "FROM programs_program p JOIN programs_department d ON d.id = p.department_id"
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE programs_program_fts USING fts5('
+            " name, code, department, description, tokenize='trigram')"
+        )
+        schema_editor.execute(
+            'INSERT INTO programs_program_fts (rowid, name, code, department, description) '
+            'SELECT p.id, p.name, p.code, d.name, p.description '
+            'FROM programs_program p JOIN programs_department d ON d.id = p.department_id'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS programs_program_name_trgm')
+        schema_editor.execute('DROP TABLE IF EXISTS programs_program_search')
+    elif vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS programs_program_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('programs', '0003_program_merit_settings'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -1,6 +1,10 @@
 from django.db import models
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce, Greatest, Now
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+from .catalog import bump_seats_version
+
 class Department(models.Model):
     name = models.CharField(max_length=200)
     code = models.CharField(max_length=10, unique=True)
@@ -11,6 +15,45 @@ class Department(models.Model):
     def __str__(self):
         return f"{self.name} ({self.code})"
 
+class ProgramQuerySet(models.QuerySet):
+    def reserve_seat(self):
+        """Atomically take one seat if the program still has capacity.
+
+        The capacity check and the increment are a single conditional UPDATE,
+        so concurrent submissions cannot overbook. Returns True on success.
+        """
+        reserved = self.filter(occupied_seats__lt=F('intake_capacity')).update(
+            occupied_seats=F('occupied_seats') + 1
+        ) > 0
+        if reserved:
+            bump_seats_version()
+        return reserved
+
+    def adjust_occupied_seats(self, delta):
+        """Shift the seat counter by ``delta`` without reading it first."""
+        if delta and self.update(occupied_seats=Greatest(F('occupied_seats') + delta, 0)):
+            bump_seats_version()
+
+    def with_availability(self):
+        """Annotate ``seats_left`` and ``is_open`` in SQL so they can be filtered and ordered on."""
+        return self.annotate(
+            seats_left=Greatest(F('intake_capacity') - F('occupied_seats'), Value(0)),
+            is_open=models.ExpressionWrapper(
+                Q(status='active', application_start_date__lte=Now(), application_end_date__gte=Now()),
+                output_field=models.BooleanField(),
+            ),
+        )
+
+    def refresh_seat_counts(self):
+        """Recompute the seat counter from the applications table."""
+        from applications.models import Application
+        occupied = Application.objects.filter(
+            program=models.OuterRef('pk'), status__in=Program.SEAT_HOLDING_STATUSES
+        ).values('program').annotate(total=models.Count('pk')).values('total')
+        updated = self.update(occupied_seats=Coalesce(models.Subquery(occupied), 0))
+        bump_seats_version()
+        return updated
+
 class Program(models.Model):
     PROGRAM_TYPES = [
         ('undergraduate', 'Undergraduate'),
@@ -25,6 +68,9 @@ class Program(models.Model):
         ('closed', 'Closed'),
     ]
 
+    # Application statuses that occupy one of the program's seats
+    SEAT_HOLDING_STATUSES = ['submitted', 'under_review', 'shortlisted', 'admitted']
+
     name = models.CharField(max_length=200)
     code = models.CharField(max_length=20, unique=True)
     department = models.ForeignKey(Department, on_delete=models.CASCADE, related_name='programs')
@@ -44,23 +90,47 @@ class Program(models.Model):
         help_text="Minimum percentage required"
     )
     eligibility_criteria = models.TextField()
+
+    # Merit ranking: weights of each academic percentage in the composite score,
+    # and how many candidates to shortlist per seat
+    merit_weight_tenth = models.FloatField(default=0.2, validators=[MinValueValidator(0)])
+    merit_weight_twelfth = models.FloatField(default=0.5, validators=[MinValueValidator(0)])
+    merit_weight_graduation = models.FloatField(default=0.3, validators=[MinValueValidator(0)])
+    shortlist_factor = models.FloatField(default=1.5, validators=[MinValueValidator(0)])
     
     # Application dates
     application_start_date = models.DateTimeField()
     application_end_date = models.DateTimeField()
     
     status = models.CharField(max_length=20, choices=PROGRAM_STATUS, default='active')
+    # Number of applications in SEAT_HOLDING_STATUSES, maintained on every status transition
+    occupied_seats = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ProgramQuerySet.as_manager()
+
     class Meta:
         ordering = ['name']
 
     def __str__(self):
         return f"{self.name} - {self.department.name}"
 
+    def save(self, *args, **kwargs):
+        # occupied_seats only moves through the queryset's conditional UPDATEs
+        # (or an F() expression assigned here); writing back the value an
+        # instance was loaded with would undo seats reserved since then
+        if not self._state.adding and not isinstance(self.occupied_seats, models.expressions.Combinable):
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None:
+                update_fields = [field.name for field in self._meta.concrete_fields if not field.primary_key]
+            kwargs['update_fields'] = [name for name in update_fields if name != 'occupied_seats']
+        super().save(*args, **kwargs)
+
     @property
     def is_application_open(self):
+        if hasattr(self, 'is_open'):  # annotated by with_availability()
+            return self.is_open
         from django.utils import timezone
         now = timezone.now()
         return (self.application_start_date <= now <= self.application_end_date 
@@ -68,8 +138,14 @@ class Program(models.Model):
 
     @property
     def available_seats(self):
-        applied_count = self.applications.filter(status__in=['submitted', 'under_review', 'shortlisted', 'admitted']).count()
-        return max(0, self.intake_capacity - applied_count)
+        if hasattr(self, 'seats_left'):
+            return self.seats_left
+        return max(0, self.intake_capacity - self.occupied_seats)
+
+    @classmethod
+    def seat_delta(cls, old_status, new_status):
+        """How the seat counter moves when an application changes status."""
+        return (new_status in cls.SEAT_HOLDING_STATUSES) - (old_status in cls.SEAT_HOLDING_STATUSES)
 
 class RequiredDocument(models.Model):
     program = models.ForeignKey(Program, on_delete=models.CASCADE, related_name='required_documents')
@@ -0,0 +1,238 @@
+"""Typo-tolerant, ranked search and prefix autocomplete over the program catalog.
+
+As with application search, the index lives outside the ORM:
+
+* PostgreSQL: ``programs_program_search`` holds a weighted ``tsvector``
+  (GIN) and the searchable names (GIN ``gin_trgm_ops``) per program. A
+  program matches on the text query or on ``pg_trgm`` word similarity, and
+  the two scores are added for ranking. Autocomplete uses a trigram index
+  on ``programs_program.name``, which serves ``ILIKE`` patterns.
+* SQLite: ``programs_program_fts`` is an FTS5 table with the ``trigram``
+  tokenizer, keyed by program id. A query matches any trigram of its words
+  and is ranked with ``bm25``; hits sharing fewer than
+  ``SIMILARITY_THRESHOLD`` of the query's trigrams are dropped, which is
+  the pg_trgm notion of similarity. The same table serves ``LIKE`` for
+  autocomplete.
+
+The tables are created (and filled) by migration 0004 and kept current by
+``signals.py``; ``manage.py rebuild_program_search`` rebuilds them.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Program
+
+POSTGRES_TABLE = 'programs_program_search'
+SQLITE_TABLE = 'programs_program_fts'
+
+# Upper bound on the hits of one search; the catalog is small
+MAX_RESULTS = 200
+# Share of the query's trigrams a hit must contain (pg_trgm's default threshold)
+SIMILARITY_THRESHOLD = 0.3
+
+DOCUMENT_FIELDS = ['name', 'code', 'department__name', 'description']
+
+
+def _documents(queryset):
+    """Yield (program id, name, code, department name, description) for every program."""
+    yield from queryset.values_list('id', *DOCUMENT_FIELDS).iterator()
+
+
+def trigrams(text):
+    """pg_trgm-style trigrams: lower-cased words padded with two leading spaces and one trailing."""
+    grams = set()
+    for word in re.findall(r'\w+', text.lower()):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _like_prefix(prefix):
+    # LIKE wildcards in user input are dropped rather than escaped: the
+    # SQLite trigram index cannot serve LIKE ... ESCAPE
+    return re.sub(r'[%_\\]', '', prefix).strip()
+
+
+class PostgresSearchBackend:
+    def index(self, cursor, documents):
+        for program_id, name, code, department, description in documents:
+            cursor.execute(
+                f"""
+                INSERT INTO {POSTGRES_TABLE} (program_id, names, document)
+                VALUES (%s, %s, setweight(to_tsvector('english', %s), 'A')
+                                || setweight(to_tsvector('simple', %s), 'A')
+                                || setweight(to_tsvector('english', %s), 'B')
+                                || setweight(to_tsvector('english', %s), 'C'))
+                ON CONFLICT (program_id) DO UPDATE SET names = EXCLUDED.names, document = EXCLUDED.document
+                """,
+                [program_id, f'{name} {code} {department}', name, code, department, description],
+            )
+
+    def remove(self, cursor, program_ids):
+        cursor.execute(f'DELETE FROM {POSTGRES_TABLE} WHERE program_id = ANY(%s)', [list(program_ids)])
+
+    def clear(self, cursor):
+        cursor.execute(f'TRUNCATE {POSTGRES_TABLE}')
+
+    def ranked_ids(self, cursor, query, limit):
+        cursor.execute(
+            f"""
+            SELECT program_id, ts_rank_cd(document, q) + word_similarity(%s, names) AS rank
+            FROM {POSTGRES_TABLE}, websearch_to_tsquery('english', %s) AS q
+            WHERE document @@ q OR %s <%% names
+            ORDER BY rank DESC, program_id
+            LIMIT %s
+            """,
+            [query, query, query, limit],
+        )
+        return cursor.fetchall()
+
+    def autocomplete(self, cursor, prefix, limit):
+        cursor.execute(
+            """
+            SELECT id, name, code FROM programs_program
+            WHERE status = 'active' AND name ILIKE %s AND (name ILIKE %s OR name ILIKE %s)
+            ORDER BY name ILIKE %s DESC, length(name), name
+            LIMIT %s
+            """,
+            [f'%{prefix}%', f'{prefix}%', f'% {prefix}%', f'{prefix}%', limit],
+        )
+        return cursor.fetchall()
+
+
+class SQLiteSearchBackend:
+    # bm25() column weights: name, code, department, description
+    RANK = f'bm25({SQLITE_TABLE}, 10.0, 8.0, 3.0, 1.0)'
+
+    def index(self, cursor, documents):
+        rows = list(documents)
+        cursor.executemany(f'DELETE FROM {SQLITE_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+        cursor.executemany(
+            f'INSERT INTO {SQLITE_TABLE} (rowid, name, code, department, description) VALUES (%s, %s, %s, %s, %s)',
+            rows,
+        )
+
+    def remove(self, cursor, program_ids):
+        cursor.executemany(f'DELETE FROM {SQLITE_TABLE} WHERE rowid = %s', [(pk,) for pk in program_ids])
+
+    def clear(self, cursor):
+        cursor.execute(f'DELETE FROM {SQLITE_TABLE}')
+
+    @staticmethod
+    def match_expression(grams):
+        """Any of the query's trigrams; the tokenizer works on raw characters, so padding is dropped."""
+        cores = {gram for gram in grams if ' ' not in gram}
+        return ' OR '.join('"' + gram.replace('"', '""') + '"' for gram in sorted(cores))
+
+    def ranked_ids(self, cursor, query, limit):
+        grams = trigrams(query)
+        expression = self.match_expression(grams)
+        if not expression:
+            # Words shorter than three characters have no trigram to match
+            prefix = _like_prefix(query)
+            if not prefix:
+                return []
+            cursor.execute(
+                f'SELECT rowid, 1.0 FROM {SQLITE_TABLE} WHERE name LIKE %s OR code LIKE %s LIMIT %s',
+                [f'{prefix}%', f'{prefix}%', limit],
+            )
+            return cursor.fetchall()
+        cursor.execute(
+            f"""
+            SELECT rowid, -{self.RANK}, name, code, department, description
+            FROM {SQLITE_TABLE}
+            WHERE {SQLITE_TABLE} MATCH %s
+            ORDER BY {self.RANK}
+            """,
+            [expression],
+        )
+        hits = []
+        for program_id, rank, *text in cursor:
+            similarity = len(grams & trigrams(' '.join(text))) / len(grams)
+            if similarity >= SIMILARITY_THRESHOLD:
+                hits.append((program_id, rank))
+                if len(hits) == limit:
+                    break
+        return hits
+
+    def autocomplete(self, cursor, prefix, limit):
+        cursor.execute(
+            f"""
+            SELECT p.id, p.name, p.code
+            FROM {SQLITE_TABLE} AS f JOIN programs_program AS p ON p.id = f.rowid
+            WHERE f.name LIKE %s AND (f.name LIKE %s OR f.name LIKE %s) AND p.status = 'active'
+            ORDER BY f.name LIKE %s DESC, length(p.name), p.name
+            LIMIT %s
+            """,
+            [f'%{prefix}%', f'{prefix}%', f'% {prefix}%', f'{prefix}%', limit],
+        )
+        return cursor.fetchall()
+
+
+BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SQLiteSearchBackend,
+}
+
+
+def get_backend():
+    backend_class = BACKENDS.get(connection.vendor)
+    return backend_class() if backend_class else None
+
+
+def index_programs(queryset):
+    backend = get_backend()
+    if backend is None:
+        return
+    with connection.cursor() as cursor:
+        backend.index(cursor, _documents(queryset))
+
+
+def remove_programs(program_ids):
+    backend = get_backend()
+    if backend is None or not program_ids:
+        return
+    with connection.cursor() as cursor:
+        backend.remove(cursor, program_ids)
+
+
+def rebuild_index():
+    """Drop every indexed program and re-index the catalog. Returns the count."""
+    backend = get_backend()
+    if backend is None:
+        return 0
+    documents = list(_documents(Program.objects.order_by()))
+    with connection.cursor() as cursor:
+        backend.clear(cursor)
+        backend.index(cursor, documents)
+    return len(documents)
+
+
+def ranked_program_ids(query, limit=MAX_RESULTS):
+    """[(program id, rank)] best first, or None when this database has no index."""
+    backend = get_backend()
+    if backend is None:
+        return None
+    with connection.cursor() as cursor:
+        return backend.ranked_ids(cursor, query, limit)
+
+
+def autocomplete(prefix, limit):
+    """Up to ``limit`` active programs with a word of their name starting with ``prefix``."""
+    prefix = _like_prefix(prefix)
+    if not prefix:
+        return []
+    backend = get_backend()
+    if backend is None:
+        programs = (
+            Program.objects.filter(status='active')
+            .filter(Q(name__istartswith=prefix) | Q(name__icontains=f' {prefix}'))
+            .order_by('name')
+            .values_list('id', 'name', 'code')[:limit]
+        )
+        return [{'id': pk, 'name': name, 'code': code} for pk, name, code in programs]
+    with connection.cursor() as cursor:
+        rows = backend.autocomplete(cursor, prefix, limit)
+    return [{'id': pk, 'name': name, 'code': code} for pk, name, code in rows]
@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import search
+from .catalog import bump_catalog_version
+from .models import Department, Program, RequiredDocument
+
+
+@receiver(post_save, sender=Program)
+@receiver(post_delete, sender=Program)
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+@receiver(post_save, sender=RequiredDocument)
+@receiver(post_delete, sender=RequiredDocument)
+def invalidate_catalog(sender, **kwargs):
+    """Any change to the catalog makes every cached catalog response stale."""
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=Program)
+def index_program(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_programs(Program.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Program)
+def unindex_program(sender, instance, **kwargs):
+    search.remove_programs([instance.pk])
+
+
+@receiver(post_save, sender=Department)
+def reindex_department_programs(sender, instance, created, raw=False, **kwargs):
+    """Department names are indexed with their programs."""
+    if not created and not raw:
+        search.index_programs(Program.objects.filter(department=instance))
@@ -1,3 +1,289 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from applications.models import Application
+from applications.tests import ApplicationTestMixin
+from authentication.models import User
+from .catalog import _entry_timeout
+from .models import Department, Program
+
+
+class CatalogCacheTests(ApplicationTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_repeat_requests_are_served_from_cache(self):
+        url = reverse('program-list')
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        etag = first['ETag']
+
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], etag)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        # Parameters the view reads make different entries; others are ignored
+        filtered = self.client.get(url, {'program_type': 'postgraduate'})
+        self.assertEqual(filtered.json()['count'], 0)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(f'{url}?utm_source=ad&program_type=postgraduate').json()['count'], 0)
+            self.assertEqual(self.client.get(url, {'junk': 'x'})['ETag'], etag)
+
+    def test_catalog_changes_invalidate_cached_responses(self):
+        url = reverse('program-detail', args=[self.program.pk])
+        etag = self.client.get(url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.program.name = 'B.Tech Computing'
+            self.program.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['name'], 'B.Tech Computing')
+        self.assertNotEqual(response['ETag'], etag)
+
+        documents = reverse('program-documents', args=[self.program.pk])
+        self.assertEqual(len(self.client.get(documents).json()), 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.marksheet.delete()
+        self.assertEqual(len(self.client.get(documents).json()), 2)
+
+    def test_seat_movement_invalidates_only_seat_responses(self):
+        url = reverse('program-detail', args=[self.program.pk])
+        documents = reverse('program-documents', args=[self.program.pk])
+        self.assertEqual(self.client.get(url).json()['available_seats'], 60)
+        self.client.get(documents)
+        with self.captureOnCommitCallbacks(execute=True):
+            Program.objects.filter(pk=self.program.pk).reserve_seat()
+        self.assertEqual(self.client.get(url).json()['available_seats'], 59)
+        # Responses without seat counts stay cached
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(documents).status_code, 200)
+
+    def test_entries_expire_when_an_application_window_opens(self):
+        Program.objects.filter(pk=self.program.pk).update(
+            application_start_date=timezone.now() + timedelta(seconds=90)
+        )
+        self.assertLessEqual(_entry_timeout(), 90)
+
+
+class ProgramAvailabilityTests(ApplicationTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        now = timezone.now()
+        cls.full = Program.objects.create(
+            name='M.Tech Data Science', code='MTDS', department=cls.department, program_type='postgraduate',
+            duration_years=2, duration_semesters=4, description='Postgraduate programme', intake_capacity=1,
+            occupied_seats=1, fees_per_semester=80000, min_percentage=60, eligibility_criteria='B.Tech',
+            application_start_date=now - timedelta(days=10), application_end_date=now + timedelta(days=10),
+        )
+        cls.upcoming = Program.objects.create(
+            name='Diploma in Robotics', code='DRB', department=cls.department, program_type='diploma',
+            duration_years=1, duration_semesters=2, description='Diploma', intake_capacity=30,
+            fees_per_semester=20000, min_percentage=50, eligibility_criteria='10th',
+            application_start_date=now + timedelta(days=5), application_end_date=now + timedelta(days=30),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def codes(self, **params):
+        response = self.client.get(reverse('program-list'), params)
+        self.assertEqual(response.status_code, 200)
+        return [program['code'] for program in response.json()['results']]
+
+    def test_availability_is_annotated_in_sql(self):
+        programs = {p.code: p for p in Program.objects.with_availability()}
+        with self.assertNumQueries(0):
+            self.assertEqual(programs['MTDS'].available_seats, 0)
+            self.assertEqual(programs['BTCS'].available_seats, 60)
+            self.assertEqual(programs['BTCS'].seats_left, 60)
+            self.assertTrue(programs['BTCS'].is_application_open)
+            self.assertFalse(programs['DRB'].is_application_open)
+
+    def test_filter_and_order_on_availability(self):
+        self.assertEqual(self.codes(is_open='true', ordering='name'), ['BTCS', 'MTDS'])
+        self.assertEqual(self.codes(is_open='false'), ['DRB'])
+        self.assertEqual(self.codes(available_seats_min=1, ordering='-available_seats'), ['BTCS', 'DRB'])
+        self.assertEqual(self.codes(ordering='available_seats'), ['MTDS', 'DRB', 'BTCS'])
+        self.assertEqual(self.codes(available_seats_max=0), ['MTDS'])
+        self.assertEqual(self.codes(ordering='-is_open,name'), ['BTCS', 'MTDS', 'DRB'])
+
+
+class ProgramSearchTests(ApplicationTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        now = timezone.now()
+        fields = dict(
+            department=cls.department, duration_years=2, duration_semesters=4, intake_capacity=30,
+            fees_per_semester=30000, min_percentage=50, eligibility_criteria='Graduate',
+            application_start_date=now - timedelta(days=1), application_end_date=now + timedelta(days=30),
+        )
+        cls.mba = Program.objects.create(
+            name='Master of Business Administration', code='MBA', program_type='postgraduate',
+            description='Management with electives in computer-aided finance', **fields
+        )
+        cls.archived = Program.objects.create(
+            name='Computer Applications Diploma', code='CAD', program_type='diploma',
+            description='Legacy programme', status='inactive', **fields
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def search(self, query, **params):
+        response = self.client.get(reverse('program-list'), {'search': query, 'status': 'active', **params})
+        self.assertEqual(response.status_code, 200)
+        return [program['code'] for program in response.json()['results']]
+
+    def test_search_tolerates_typos_and_ranks_names_first(self):
+        self.assertEqual(self.search('compter'), ['BTCS', 'MBA'])
+        self.assertEqual(self.search('busines administraton'), ['MBA'])
+        self.assertEqual(self.search('btcs'), ['BTCS'])
+        self.assertEqual(self.search('xylophone'), [])
+        self.assertEqual(self.search('compter', ordering='-name'), ['MBA', 'BTCS'])
+
+    def test_index_follows_catalog_changes(self):
+        self.department.name = 'Informatics'
+        self.department.save()
+        self.assertEqual(self.search('informatics'), ['BTCS', 'MBA'])
+        self.mba.delete()
+        self.assertEqual(self.search('business'), [])
+
+    def test_autocomplete_matches_word_prefixes_of_active_programs(self):
+        url = reverse('program-autocomplete')
+        names = [hit['name'] for hit in self.client.get(url, {'q': 'comp'}).json()]
+        self.assertEqual(names, ['B.Tech Computer Science'])
+        names = [hit['name'] for hit in self.client.get(url, {'q': 'ma'}).json()]
+        self.assertEqual(names, ['Master of Business Administration'])
+        self.assertEqual(len(self.client.get(url, {'q': 'b', 'limit': 1}).json()), 1)
+        self.assertEqual(self.client.get(url, {'q': '%'}).json(), [])
+        self.assertEqual(self.client.get(url, {'q': 'x', 'limit': 'ten'}).status_code, 400)
+        # Keystrokes do not take entries in the catalog cache
+        self.assertFalse(self.client.get(url, {'q': 'comp'}).has_header('ETag'))
+
+
+class DepartmentStatisticsTests(ApplicationTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='admin', role='admin'))
+        self.url = reverse('admin-department-statistics')
+
+    def test_statistics_are_one_query_and_cached_until_applications_change(self):
+        Department.objects.create(name='Physics', code='PHY')
+        applications = [self.create_application(index) for index in range(3)]
+        Application.objects.filter(pk=applications[0].pk).change_status('submitted', self.officer)
+
+        with self.assertNumQueries(1):
+            stats = {row['code']: row for row in self.client.get(self.url).json()}
+        cs = stats['CS']
+        self.assertEqual((cs['total_programs'], cs['active_programs'], cs['total_applications']), (1, 1, 3))
+        self.assertEqual(cs['applications_by_status']['draft'], 2)
+        self.assertEqual(cs['applications_by_status']['submitted'], 1)
+        self.assertEqual((cs['intake_capacity'], cs['occupied_seats'], cs['seat_fill_rate']), (60, 1, 1.7))
+        self.assertEqual(stats['PHY']['total_applications'], 0)
+        self.assertEqual(stats['PHY']['seat_fill_rate'], 0.0)
+
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        # A transition that moves no seat still refreshes the counts
+        with self.captureOnCommitCallbacks(execute=True):
+            Application.objects.filter(pk=applications[0].pk).change_status('under_review', self.officer)
+        cs = {row['code']: row for row in self.client.get(self.url).json()}['CS']
+        self.assertEqual(cs['applications_by_status']['submitted'], 0)
+        self.assertEqual(cs['applications_by_status']['under_review'], 1)
+
+    def test_statistics_are_admin_only(self):
+        self.client.force_authenticate(self.officer)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class EligibilityTests(ApplicationTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        now = timezone.now()
+        fields = dict(
+            department=cls.department, duration_years=2, duration_semesters=4, description='Programme',
+            intake_capacity=30, fees_per_semester=30000, eligibility_criteria='As listed',
+            application_start_date=now - timedelta(days=1), application_end_date=now + timedelta(days=30),
+        )
+        Program.objects.create(name='M.Tech AI', code='MTAI', program_type='postgraduate', min_percentage=70, **fields)
+        Program.objects.create(name='B.Sc Physics', code='BSP', program_type='undergraduate', min_percentage=75, **fields)
+        Program.objects.create(name='Diploma in IT', code='DIT', program_type='diploma', min_percentage=40, **fields)
+        fields['application_start_date'] = now + timedelta(days=3)
+        Program.objects.create(name='B.Com', code='BCOM', program_type='undergraduate', min_percentage=30, **fields)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('program-eligibility')
+
+    def codes(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [program['code'] for program in response.json()['results']]
+
+    def test_marks_select_open_programs_by_qualifying_level(self):
+        # The index is built once per catalog version, then lookups run no queries
+        self.codes(twelfth=0)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.codes(twelfth=60), ['BTCS'])
+        self.assertEqual(self.codes(twelfth=75, tenth=40), ['BSP', 'BTCS', 'DIT'])
+        self.assertEqual(self.codes(graduation=69.9), [])
+        self.assertEqual(self.codes(graduation=70), ['MTAI'])
+        self.assertEqual(self.client.get(self.url, {'tenth': 101}).status_code, 400)
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+
+    def test_catalog_changes_rebuild_the_index(self):
+        self.assertEqual(self.codes(twelfth=62), ['BTCS'])
+        with self.captureOnCommitCallbacks(execute=True):
+            program = Program.objects.get(code='BSP')
+            program.min_percentage = 62
+            program.save()
+        self.assertEqual(self.codes(twelfth=62), ['BSP', 'BTCS'])
+
+    def test_seat_movement_reloads_only_seat_counts(self):
+        self.assertEqual(self.client.get(self.url, {'twelfth': 60}).json()['results'][0]['available_seats'], 60)
+        with self.captureOnCommitCallbacks(execute=True):
+            Program.objects.filter(pk=self.program.pk).reserve_seat()
+        with mock.patch('programs.eligibility.EligibilityIndex.build') as build, self.assertNumQueries(1):
+            response = self.client.get(self.url, {'twelfth': 60})
+        build.assert_not_called()
+        self.assertEqual(response.json()['results'][0]['available_seats'], 59)
+
+    def test_marks_default_to_the_latest_application(self):
+        application = self.create_application(1, twelfth_percentage=80)
+        self.client.force_authenticate(application.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.json()['source'], 'application')
+        self.assertEqual([program['code'] for program in response.json()['results']], ['BSP', 'BTCS', 'DIT'])
 
-# Create your tests here.
+    def test_application_without_marks_gives_an_empty_result(self):
+        self.client.force_authenticate(User.objects.create_user(username='applicant', role='applicant'))
+        marks = dict.fromkeys(['tenth_percentage', 'twelfth_percentage', 'graduation_percentage'])
+        with mock.patch('programs.views.Application.objects') as applications:
+            applications.filter.return_value.order_by.return_value.values.return_value.first.return_value = marks
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['source'], 'application')
+        self.assertEqual(response.json()['results'], [])
+        self.assertIn('no marks', response.json()['detail'])
@@ -4,6 +4,8 @@ from . import views, admin_views
 urlpatterns = [
     path('departments/', views.DepartmentListView.as_view(), name='department-list'),
     path('', views.ProgramListView.as_view(), name='program-list'),
+    path('autocomplete/', views.program_autocomplete, name='program-autocomplete'),
+    path('eligible/', views.eligible_programs, name='program-eligibility'),
     path('create/', views.ProgramCreateView.as_view(), name='program-create'),
     path('<int:pk>/', views.ProgramDetailView.as_view(), name='program-detail'),
     path('<int:pk>/update/', views.ProgramUpdateView.as_view(), name='program-update'),
@@ -1,27 +1,42 @@
-from rest_framework import generics, permissions, filters, status
+from rest_framework import generics, permissions, status
 from rest_framework.exceptions import PermissionDenied, ValidationError
 
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from django.utils.decorators import method_decorator
+from applications.models import Application
+from .catalog import catalog_cache
+from .eligibility import LEVELS, get_index
+from .filters import ProgramFilter, ProgramOrderingFilter, ProgramSearchFilter
+from . import search
 from .models import Department, Program, RequiredDocument
 from .serializers import DepartmentSerializer, ProgramSerializer, ProgramListSerializer, RequiredDocumentSerializer
 
+# Query parameters the cached catalog views read
+PROGRAM_LIST_PARAMS = (
+    'page', 'program_type', 'department', 'status', 'available_seats_min', 'available_seats_max',
+    'is_open', 'search', 'ordering',
+)
+
+@method_decorator(catalog_cache('page'), name='dispatch')
 class DepartmentListView(generics.ListAPIView):
     queryset = Department.objects.all()
     serializer_class = DepartmentSerializer
     permission_classes = [permissions.AllowAny]
 
+@method_decorator(catalog_cache(*PROGRAM_LIST_PARAMS, seats=True), name='dispatch')
 class ProgramListView(generics.ListAPIView):
-    queryset = Program.objects.filter(status='active')
+    queryset = Program.objects.filter(status='active').select_related('department').with_availability()
     serializer_class = ProgramListSerializer
     permission_classes = [permissions.AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]  # Fixed this line
-    filterset_fields = ['program_type', 'department', 'status']
-    search_fields = ['name', 'code', 'description', 'department__name']
-    ordering_fields = ['name', 'fees_per_semester', 'application_end_date']
+    filter_backends = [DjangoFilterBackend, ProgramSearchFilter, ProgramOrderingFilter]
+    filterset_class = ProgramFilter
+    search_fields = ['name', 'code', 'description', 'department__name']  # used without a search index
+    ordering_fields = ['name', 'fees_per_semester', 'application_end_date', 'available_seats', 'is_open']
     ordering = ['name']
 
+@method_decorator(catalog_cache(seats=True), name='dispatch')
 class ProgramDetailView(generics.RetrieveAPIView):
     queryset = Program.objects.all()
     serializer_class = ProgramSerializer
@@ -56,6 +71,7 @@ class ProgramUpdateView(generics.UpdateAPIView):
             raise PermissionDenied("Only administrators can update programs")
         serializer.save()
 
+@catalog_cache()
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def program_required_documents(request, program_id):
@@ -69,6 +85,71 @@ def program_required_documents(request, program_id):
         return Response({'error': 'Program not found'}, status=404)
 
 
+AUTOCOMPLETE_LIMIT = 8
+AUTOCOMPLETE_MAX_LIMIT = 20
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def program_autocomplete(request):
+    """Active programs with a word of their name starting with ?q= (top ?limit=, default 8)
+    Not cached: one indexed query per keystroke is cheap, and an entry per prefix would evict the catalog's.
+    """
+    try:
+        limit = min(int(request.query_params.get('limit', AUTOCOMPLETE_LIMIT)), AUTOCOMPLETE_MAX_LIMIT)
+    except ValueError:
+        raise ValidationError({'limit': ['Must be an integer.']})
+    if limit < 1:
+        raise ValidationError({'limit': ['Must be at least 1.']})
+    return Response(search.autocomplete(request.query_params.get('q', ''), limit))
+
+
+def _percentages_from(params):
+    percentages = {}
+    for level in LEVELS:
+        value = params.get(level)
+        if value in (None, ''):
+            continue
+        try:
+            percentage = float(value)
+        except ValueError:
+            raise ValidationError({level: ['Must be a number.']})
+        if not 0 <= percentage <= 100:
+            raise ValidationError({level: ['Must be between 0 and 100.']})
+        percentages[level] = percentage
+    return percentages
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def eligible_programs(request):
+    """Open programs the given marks qualify for.
+    Query: ?tenth=&twelfth=&graduation=; without them, an applicant's latest application is used.
+    """
+    percentages = _percentages_from(request.query_params)
+    source = 'query'
+    if not percentages:
+        application = None
+        if request.user.is_authenticated:
+            application = Application.objects.filter(user=request.user).order_by('-created_at').values(
+                'tenth_percentage', 'twelfth_percentage', 'graduation_percentage'
+            ).first()
+        if application is None:
+            raise ValidationError({'detail': ['Provide tenth, twelfth or graduation percentages.']})
+        percentages = {
+            level: application[f'{level}_percentage']
+            for level in LEVELS if application[f'{level}_percentage'] is not None
+        }
+        source = 'application'
+    payload = {
+        'percentages': percentages,
+        'source': source,
+        'results': get_index().eligible(percentages),
+    }
+    if not percentages:
+        payload['detail'] = 'Your latest application has no marks recorded yet.'
+    return Response(payload)
+
 
 class ProgramDeleteView(generics.DestroyAPIView):
     queryset = Program.objects.all()